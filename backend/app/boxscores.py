@@ -0,0 +1,149 @@
+from sqlalchemy import delete, text
+from sqlmodel import Session, select
+
+from .models import BoxScore, Game, GameStatus
+
+# Counter columns filled straight from the grouped query.
+_COUNTERS = (
+    "total_shots",
+    "hits",
+    "misses",
+    "rims",
+    "elbow_violations",
+    "bounce_shots",
+    "bounce_total",
+    "normal_hits",
+    "normal_total",
+    "bounce_hits",
+    "trickshot_hits",
+    "trickshot_total",
+    "bounce_cups_removed",
+)
+
+
+# ---------------------------------------------------------------------------
+# Private helpers
+# ---------------------------------------------------------------------------
+
+
+def _longest_streaks(outcomes: list[bool]) -> tuple[int, int]:
+    """Longest hit and miss runs in a sequence of outcomes (RIM is a miss)."""
+    longest = {True: 0, False: 0}
+    run, previous = 0, None
+    for is_hit in outcomes:
+        run = run + 1 if is_hit == previous else 1
+        previous = is_hit
+        longest[is_hit] = max(longest[is_hit], run)
+    return longest[True], longest[False]
+
+
+def _recompute(session: Session, where: str, params: dict) -> list[BoxScore]:
+    """Build box score rows from the shot table for every game matching `where`.
+
+    Totals come from one grouped query; streaks need the ordered outcome
+    sequence, so those are replayed in Python.
+    """
+    totals = session.execute(
+        text(f"""
+            SELECT
+                s.game_id,
+                s.player_id,
+                g.tournament_id,
+                MAX(s.team_id)                                      AS team_id,
+                COUNT(*)                                            AS total_shots,
+                SUM(CASE WHEN s.outcome = 'HIT' THEN 1 ELSE 0 END) AS hits,
+                SUM(CASE WHEN s.outcome = 'MISS' THEN 1 ELSE 0 END) AS misses,
+                SUM(CASE WHEN s.outcome = 'RIM' THEN 1 ELSE 0 END) AS rims,
+                SUM(CASE WHEN s.elbow_violation = 1 THEN 1 ELSE 0 END) AS elbow_violations,
+                SUM(CASE WHEN s.shot_type = 'BOUNCE' THEN 1 ELSE 0 END) AS bounce_shots,
+                COALESCE(SUM(CASE WHEN s.shot_type = 'BOUNCE' THEN s.bounces ELSE 0 END), 0) AS bounce_total,
+                SUM(CASE WHEN s.shot_type = 'NORMAL' AND s.outcome = 'HIT' THEN 1 ELSE 0 END) AS normal_hits,
+                SUM(CASE WHEN s.shot_type = 'NORMAL' THEN 1 ELSE 0 END) AS normal_total,
+                SUM(CASE WHEN s.shot_type = 'BOUNCE' AND s.outcome = 'HIT' THEN 1 ELSE 0 END) AS bounce_hits,
+                SUM(CASE WHEN s.shot_type = 'TRICKSHOT' AND s.outcome = 'HIT' THEN 1 ELSE 0 END) AS trickshot_hits,
+                SUM(CASE WHEN s.shot_type = 'TRICKSHOT' THEN 1 ELSE 0 END) AS trickshot_total,
+                COALESCE(SUM(CASE WHEN s.shot_type = 'BOUNCE' AND s.outcome = 'HIT'
+                    THEN s.bounces + 1 ELSE 0 END), 0) AS bounce_cups_removed
+            FROM shot s
+            JOIN game g ON s.game_id = g.id
+            WHERE s.shot_type != 'RERACK' AND {where}
+            GROUP BY s.game_id, s.player_id
+        """),
+        params,
+    ).all()
+    outcomes: dict[tuple[int, int], list[bool]] = {}
+    for r in session.execute(
+        text(f"""
+            SELECT s.game_id, s.player_id, s.outcome = 'HIT' AS is_hit
+            FROM shot s
+            JOIN game g ON s.game_id = g.id
+            WHERE s.shot_type != 'RERACK' AND {where}
+            ORDER BY s.game_id, s.player_id, s.timestamp, s.id
+        """),
+        params,
+    ):
+        outcomes.setdefault((r.game_id, r.player_id), []).append(bool(r.is_hit))
+
+    rows = []
+    for r in totals:
+        hit_streak, miss_streak = _longest_streaks(outcomes[(r.game_id, r.player_id)])
+        counters = {c: getattr(r, c) or 0 for c in _COUNTERS}
+        rows.append(
+            BoxScore(
+                game_id=r.game_id,
+                player_id=r.player_id,
+                tournament_id=r.tournament_id,
+                team_id=r.team_id,
+                **counters,
+                cups_removed=counters["normal_hits"]
+                + counters["trickshot_hits"]
+                + counters["bounce_cups_removed"],
+                longest_hit_streak=hit_streak,
+                longest_miss_streak=miss_streak,
+            )
+        )
+    return rows
+
+
+# ---------------------------------------------------------------------------
+# Public functions — called from the write paths
+# ---------------------------------------------------------------------------
+
+
+def compute_game(session: Session, game_id: int) -> list[BoxScore]:
+    """A game's box score lines from its shots, without storing them."""
+    return _recompute(session, "s.game_id = :gid", {"gid": game_id})
+
+
+def refresh_game(session: Session, game: Game) -> None:
+    """Rewrite a game's box score: stored while it is COMPLETED, absent otherwise.
+
+    Called when a game is completed or reopened, and when a completed game's
+    shots change. Call after those changes have been flushed.
+    """
+    session.flush()
+    existing = {
+        row.player_id: row
+        for row in session.exec(select(BoxScore).where(BoxScore.game_id == game.id))
+    }
+    if game.status == GameStatus.COMPLETED:
+        for row in compute_game(session, game.id):
+            session.merge(row)
+            existing.pop(row.player_id, None)
+    for row in existing.values():
+        session.delete(row)
+
+
+def drop_game_boxscores(session: Session, game_id: int) -> None:
+    session.execute(delete(BoxScore).where(BoxScore.game_id == game_id))
+
+
+def drop_tournament_boxscores(session: Session, tournament_id: int) -> None:
+    session.execute(delete(BoxScore).where(BoxScore.tournament_id == tournament_id))
+
+
+def rebuild_boxscores(session: Session) -> None:
+    """Full compaction: rebuild every completed game's box score from shots."""
+    session.execute(delete(BoxScore))
+    session.add_all(_recompute(session, "g.status = 'COMPLETED'", {}))
+    session.commit()
@@ -0,0 +1,96 @@
+from datetime import datetime, timezone
+
+from sqlalchemy import delete
+from sqlmodel import Session, select
+
+from .models import BucketKind, Game, PerformanceBucket, Shot, ShotOutcome, ShotType
+
+BUCKET_SECONDS = 15 * 60
+
+
+# ---------------------------------------------------------------------------
+# Private helpers
+# ---------------------------------------------------------------------------
+
+
+def bucket_start(ts: datetime) -> int:
+    """Epoch second at which the time bucket containing `ts` starts."""
+    if ts.tzinfo is None:  # loaded back from SQLite
+        ts = ts.replace(tzinfo=timezone.utc)
+    seconds = int(ts.timestamp())
+    return seconds - seconds % BUCKET_SECONDS
+
+
+def _deltas(shot: Shot) -> dict[str, int]:
+    hit = shot.outcome == ShotOutcome.HIT
+    if not hit:
+        cups = 0
+    elif shot.shot_type == ShotType.BOUNCE:
+        # Matches the stats queries: an unrecorded bounce count removes nothing
+        cups = shot.bounces + 1 if shot.bounces is not None else 0
+    else:
+        cups = 1
+    return {"shots": 1, "hits": int(hit), "cups_removed": cups}
+
+
+def _keys(shot: Shot, tournament_id: int) -> list[dict]:
+    base = {"tournament_id": tournament_id, "player_id": shot.player_id}
+    return [
+        {**base, "kind": BucketKind.TIME, "bucket": bucket_start(shot.timestamp)},
+        {**base, "kind": BucketKind.GAME, "bucket": shot.game_id},
+    ]
+
+
+def _apply(session: Session, shot: Shot, tournament_id: int, sign: int) -> None:
+    if shot.shot_type == ShotType.RERACK:
+        return
+    deltas = _deltas(shot)
+    for key in _keys(shot, tournament_id):
+        row = session.get(PerformanceBucket, key) or PerformanceBucket(**key)
+        for column, delta in deltas.items():
+            setattr(row, column, getattr(row, column) + sign * delta)
+        if row.shots > 0:
+            session.add(row)
+        elif row in session:
+            session.delete(row)
+
+
+# ---------------------------------------------------------------------------
+# Public functions — called from the write paths
+# ---------------------------------------------------------------------------
+
+
+def record_shot(session: Session, shot: Shot, tournament_id: int) -> None:
+    _apply(session, shot, tournament_id, +1)
+
+
+def forget_shot(session: Session, shot: Shot, tournament_id: int) -> None:
+    """Subtract a shot that is about to be deleted from its buckets."""
+    _apply(session, shot, tournament_id, -1)
+
+
+def drop_tournament_buckets(session: Session, tournament_id: int) -> None:
+    session.execute(
+        delete(PerformanceBucket).where(
+            PerformanceBucket.tournament_id == tournament_id
+        )
+    )
+
+
+def rebuild_buckets(session: Session) -> None:
+    """Full compaction: rebuild every bucket from the shot table."""
+    session.execute(delete(PerformanceBucket))
+    rows: dict[tuple, PerformanceBucket] = {}
+    shots = session.exec(
+        select(Shot, Game.tournament_id)
+        .join(Game, Shot.game_id == Game.id)
+        .where(Shot.shot_type != ShotType.RERACK)
+    )
+    for shot, tournament_id in shots:
+        deltas = _deltas(shot)
+        for key in _keys(shot, tournament_id):
+            row = rows.setdefault(tuple(key.values()), PerformanceBucket(**key))
+            for column, delta in deltas.items():
+                setattr(row, column, getattr(row, column) + delta)
+    session.add_all(rows.values())
+    session.commit()
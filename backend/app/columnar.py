@@ -0,0 +1,451 @@
+"""Optional in-memory columnar cache of a tournament's shots and punishments.
+
+Enable with ``SUPER_PONG_COLUMNAR_CACHE=1``. SQLite stays the source of
+truth: a tournament is loaded on first read, then kept current by the write
+paths in writes.py, which patch it once their transaction has committed.
+The dashboard's shot and punishment sections are then NumPy reductions
+instead of SQL. ``check_consistency`` reloads from SQLite and diffs.
+"""
+
+import os
+import threading
+from collections import OrderedDict
+from datetime import datetime, timezone
+
+import numpy as np
+from sqlalchemy import event, text
+from sqlmodel import Session
+
+from .models import (
+    CupHeatmapEntry,
+    HotHandEntry,
+    PlayerEntry,
+    PunishmentBong,
+    PunishmentCount,
+    RecentPunishment,
+    Shot,
+    ShotOutcome,
+    ShotType,
+)
+
+COLUMNAR_CACHE = os.environ.get("SUPER_PONG_COLUMNAR_CACHE") == "1"
+MAX_CACHED_TOURNAMENTS = 4
+INITIAL_CAPACITY = 1024
+
+# Enums are held as small integer codes. SQLite stores the enum names.
+TYPE_CODES = {t.name: i for i, t in enumerate(ShotType)}
+OUTCOME_CODES = {o.name: i for i, o in enumerate(ShotOutcome)}
+NORMAL, BOUNCE, TRICKSHOT, RERACK = (TYPE_CODES[t.name] for t in ShotType)
+MISS, HIT, RIM, NONE = (OUTCOME_CODES[o.name] for o in ShotOutcome)
+
+SHOT_COLUMNS = {
+    "shot_id": np.int64,
+    "game_id": np.int64,
+    "player_id": np.int64,
+    "team_id": np.int64,
+    "shot_type": np.int8,
+    "outcome": np.int8,
+    "bounces": np.int16,  # -1 when unset
+    "cup": np.int16,  # -1 when unset
+    "elbow": np.bool_,
+    "timestamp": np.int64,  # microseconds since epoch, UTC
+}
+PUNISHMENT_COLUMNS = {
+    "bong_id": np.int64,
+    "player_id": np.int64,
+    "timestamp": np.int64,
+}
+
+
+# ---------------------------------------------------------------------------
+# Row conversion
+# ---------------------------------------------------------------------------
+
+
+def _micros(ts: datetime | str) -> int:
+    if isinstance(ts, str):  # raw SQL returns SQLite's text format
+        ts = datetime.fromisoformat(ts)
+    if ts.tzinfo is None:
+        ts = ts.replace(tzinfo=timezone.utc)
+    return int(ts.timestamp() * 1_000_000)
+
+
+def _from_micros(us: int) -> datetime:
+    return datetime.fromtimestamp(us / 1_000_000, timezone.utc)
+
+
+def _shot_row(
+    shot_id,
+    game_id,
+    player_id,
+    team_id,
+    shot_type,
+    outcome,
+    bounces,
+    cup,
+    elbow,
+    timestamp,
+) -> dict:
+    return {
+        "shot_id": shot_id,
+        "game_id": game_id,
+        "player_id": player_id,
+        "team_id": team_id,
+        "shot_type": TYPE_CODES[shot_type],
+        "outcome": OUTCOME_CODES[outcome],
+        "bounces": -1 if bounces is None else bounces,
+        "cup": -1 if cup is None else cup,
+        "elbow": bool(elbow),
+        "timestamp": _micros(timestamp),
+    }
+
+
+def shot_row(shot: Shot) -> dict:
+    """Column values for one shot. Call after flush, so the id is set."""
+    return _shot_row(
+        shot.id,
+        shot.game_id,
+        shot.player_id,
+        shot.team_id,
+        shot.shot_type.name,
+        shot.outcome.name,
+        shot.bounces,
+        shot.cup_position,
+        shot.elbow_violation,
+        shot.timestamp,
+    )
+
+
+def punishment_row(pb: PunishmentBong) -> dict:
+    return {
+        "bong_id": pb.id,
+        "player_id": pb.player_id,
+        "timestamp": _micros(pb.timestamp),
+        "note": pb.note,
+    }
+
+
+# ---------------------------------------------------------------------------
+# Storage
+# ---------------------------------------------------------------------------
+
+
+class ColumnTable:
+    """Growable set of equal-length NumPy columns keyed by the first column.
+
+    Appends amortize to O(1) by doubling capacity; removals compact in place.
+    Rows keep insertion order, which is timestamp order for shots and bongs.
+    """
+
+    def __init__(self, dtypes: dict):
+        self.dtypes = dtypes
+        self.id_column = next(iter(dtypes))
+        self.size = 0
+        self.notes: list[str | None] = []
+        self._data = {
+            name: np.empty(INITIAL_CAPACITY, dtype) for name, dtype in dtypes.items()
+        }
+        self._ids: set[int] = set()
+
+    def column(self, name: str) -> np.ndarray:
+        return self._data[name][: self.size]
+
+    def append(self, row: dict) -> None:
+        row_id = row[self.id_column]
+        if row_id in self._ids:  # already picked up by a concurrent load
+            return
+        if self.size == len(self._data[self.id_column]):
+            for name, data in self._data.items():
+                grown = np.empty(len(data) * 2, data.dtype)
+                grown[: self.size] = data[: self.size]
+                self._data[name] = grown
+        for name, data in self._data.items():
+            data[self.size] = row[name]
+        self.notes.append(row.get("note"))
+        self._ids.add(row_id)
+        self.size += 1
+
+    def remove(self, mask: np.ndarray) -> None:
+        """Drop the rows selected by a boolean mask over the live rows."""
+        if not mask.any():
+            return
+        keep = ~mask
+        self._ids.difference_update(self.column(self.id_column)[mask].tolist())
+        kept = int(keep.sum())
+        for data in self._data.values():
+            data[:kept] = data[: self.size][keep]
+        self.notes = [n for n, k in zip(self.notes, keep) if k]
+        self.size = kept
+
+    def remove_id(self, row_id: int) -> None:
+        if row_id in self._ids:
+            self.remove(self.column(self.id_column) == row_id)
+
+    def update_id(self, row_id: int, values: dict) -> None:
+        """Overwrite some columns of one row in place."""
+        if row_id in self._ids:
+            index = self.column(self.id_column) == row_id
+            for name, value in values.items():
+                self._data[name][: self.size][index] = value
+
+
+class TournamentColumns:
+    def __init__(self, tournament_id: int):
+        self.tournament_id = tournament_id
+        self.shots = ColumnTable(SHOT_COLUMNS)
+        self.punishments = ColumnTable(PUNISHMENT_COLUMNS)
+
+    @classmethod
+    def load(cls, session: Session, tournament_id: int) -> "TournamentColumns":
+        store = cls(tournament_id)
+        shots = session.execute(
+            text("""
+                SELECT s.id, s.game_id, s.player_id, s.team_id, s.shot_type,
+                       s.outcome, s.bounces, s.cup_position, s.elbow_violation,
+                       s.timestamp
+                FROM shot s
+                JOIN game g ON s.game_id = g.id
+                WHERE g.tournament_id = :tid
+                ORDER BY s.timestamp, s.id
+            """),
+            {"tid": tournament_id},
+        ).all()
+        for r in shots:
+            store.shots.append(_shot_row(*r))
+        bongs = session.execute(
+            text("""
+                SELECT id, player_id, timestamp, note
+                FROM punishmentbong
+                WHERE tournament_id = :tid
+                ORDER BY timestamp, id
+            """),
+            {"tid": tournament_id},
+        ).all()
+        for r in bongs:
+            store.punishments.append(
+                {
+                    "bong_id": r.id,
+                    "player_id": r.player_id,
+                    "timestamp": _micros(r.timestamp),
+                    "note": r.note,
+                }
+            )
+        return store
+
+    # --- Vectorized stats sections -----------------------------------------
+
+    def player_leaderboard(self, roster: dict[int, str]) -> list[PlayerEntry]:
+        """Same rows and order as stats._player_leaderboard."""
+        if not roster:
+            return []
+        ids = np.array(sorted(roster), dtype=np.int64)
+        shots = self.shots
+        player = shots.column("player_id")
+        idx = np.minimum(np.searchsorted(ids, player), len(ids) - 1)
+        counted = (shots.column("shot_type") != RERACK) & (ids[idx] == player)
+        idx = idx[counted]
+        shot_type = shots.column("shot_type")[counted]
+        outcome = shots.column("outcome")[counted]
+        raw_bounces = shots.column("bounces")[counted].astype(np.int64)
+        bounces = np.maximum(raw_bounces, 0)
+        hit = outcome == HIT
+
+        def count(weights=None):
+            return np.bincount(idx, weights=weights, minlength=len(ids)).astype(
+                np.int64
+            )
+
+        totals = {
+            "total_shots": count(),
+            "hits": count(hit),
+            "misses": count(outcome == MISS),
+            "rims": count(outcome == RIM),
+            "elbow_violations": count(shots.column("elbow")[counted]),
+            "bounce_shots": count(shot_type == BOUNCE),
+            "bounce_total": count(np.where(shot_type == BOUNCE, bounces, 0)),
+            "normal_hits": count((shot_type == NORMAL) & hit),
+            "normal_total": count(shot_type == NORMAL),
+            "bounce_hits": count((shot_type == BOUNCE) & hit),
+            "trickshot_hits": count((shot_type == TRICKSHOT) & hit),
+            "trickshot_total": count(shot_type == TRICKSHOT),
+            # Like the SQL, a bounce hit with no bounce count removes nothing
+            "bounce_cups_removed": count(
+                np.where(
+                    (shot_type == BOUNCE) & hit & (raw_bounces >= 0), bounces + 1, 0
+                )
+            ),
+        }
+        entries = [
+            PlayerEntry(
+                player_id=int(pid),
+                player_name=roster[int(pid)],
+                hit_percentage=round(
+                    totals["hits"][i] / totals["total_shots"][i] * 100, 1
+                )
+                if totals["total_shots"][i] > 0
+                else 0.0,
+                **{name: int(values[i]) for name, values in totals.items()},
+            )
+            for i, pid in enumerate(ids)
+        ]
+        entries.sort(key=lambda e: (-e.hits, e.total_shots, e.player_name))
+        return entries
+
+    def cup_heatmap(self) -> list[CupHeatmapEntry]:
+        shots = self.shots
+        mask = (shots.column("outcome") == HIT) & (shots.column("cup") >= 0)
+        pairs = np.stack(
+            [
+                shots.column("player_id")[mask],
+                shots.column("cup")[mask].astype(np.int64),
+            ],
+            axis=1,
+        )
+        keys, counts = np.unique(pairs, axis=0, return_counts=True)
+        return [
+            CupHeatmapEntry(player_id=int(p), cup_position=int(c), hits=int(n))
+            for (p, c), n in zip(keys, counts)
+        ]
+
+    def hot_hand_streaks(self) -> list[HotHandEntry]:
+        """Longest hit and miss run per player via run-length encoding.
+
+        Rows are in (timestamp, id) order already, so a stable sort by
+        player keeps each player's shots chronological.
+        """
+        shots = self.shots
+        counted = shots.column("shot_type") != RERACK
+        player = shots.column("player_id")[counted]
+        if len(player) == 0:
+            return []
+        is_hit = shots.column("outcome")[counted] == HIT
+        order = np.argsort(player, kind="stable")
+        player, is_hit = player[order], is_hit[order]
+
+        starts = np.flatnonzero(
+            np.r_[True, (player[1:] != player[:-1]) | (is_hit[1:] != is_hit[:-1])]
+        )
+        lengths = np.diff(np.r_[starts, len(player)])
+        run_player, run_hit = player[starts], is_hit[starts]
+
+        players, run_idx = np.unique(run_player, return_inverse=True)
+        longest_hit = np.zeros(len(players), dtype=np.int64)
+        longest_miss = np.zeros(len(players), dtype=np.int64)
+        np.maximum.at(longest_hit, run_idx[run_hit], lengths[run_hit])
+        np.maximum.at(longest_miss, run_idx[~run_hit], lengths[~run_hit])
+        return [
+            HotHandEntry(
+                player_id=int(p),
+                longest_hit_streak=int(h),
+                longest_miss_streak=int(m),
+            )
+            for p, h, m in zip(players, longest_hit, longest_miss)
+        ]
+
+    def total_punishments(self) -> int:
+        return self.punishments.size
+
+    def punishment_counts(self, names: dict[int, str]) -> list[PunishmentCount]:
+        players, counts = np.unique(
+            self.punishments.column("player_id"), return_counts=True
+        )
+        entries = [
+            PunishmentCount(player_id=int(p), player_name=names[int(p)], count=int(n))
+            for p, n in zip(players, counts)
+        ]
+        entries.sort(key=lambda e: (-e.count, e.player_name))
+        return entries[:10]
+
+    def recent_punishments(self, names: dict[int, str]) -> list[RecentPunishment]:
+        bongs = self.punishments
+        latest = np.argsort(bongs.column("timestamp"), kind="stable")[::-1][:6]
+        return [
+            RecentPunishment(
+                player_name=names[int(bongs.column("player_id")[i])],
+                note=bongs.notes[i],
+                timestamp=_from_micros(int(bongs.column("timestamp")[i])),
+            )
+            for i in latest
+        ]
+
+
+# ---------------------------------------------------------------------------
+# Cache registry
+# ---------------------------------------------------------------------------
+
+_lock = threading.Lock()
+_stores: OrderedDict[int, TournamentColumns] = OrderedDict()
+
+
+def get_store(session: Session, tournament_id: int) -> TournamentColumns:
+    """Return the cached tournament, loading it from SQLite on first use."""
+    with _lock:
+        store = _stores.get(tournament_id)
+        if store is None:
+            store = TournamentColumns.load(session, tournament_id)
+            _stores[tournament_id] = store
+            if len(_stores) > MAX_CACHED_TOURNAMENTS:
+                _stores.popitem(last=False)
+        _stores.move_to_end(tournament_id)
+        return store
+
+
+def after_commit(session: Session, tournament_id: int, patch) -> None:
+    """Run `patch(store)` once the session commits, if the tournament is cached.
+
+    Patches are dropped on rollback. Tournaments that aren't cached yet are
+    skipped; they will be loaded with the committed data on first read.
+    """
+    if not COLUMNAR_CACHE:
+        return
+    session.info.setdefault("columnar_patches", []).append((tournament_id, patch))
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_patches(session):
+    patches = session.info.pop("columnar_patches", [])
+    with _lock:
+        for tournament_id, patch in patches:
+            store = _stores.get(tournament_id)
+            if store is not None:
+                patch(store)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_patches(session):
+    session.info.pop("columnar_patches", None)
+
+
+def evict(tournament_id: int) -> None:
+    with _lock:
+        _stores.pop(tournament_id, None)
+
+
+def check_consistency(session: Session, tournament_id: int) -> list[str]:
+    """Compare the cached tournament with a fresh load from SQLite.
+
+    Returns a list of human-readable mismatches; empty means consistent.
+    """
+    fresh = TournamentColumns.load(session, tournament_id)
+    with _lock:
+        cached = _stores.get(tournament_id)
+        if cached is None:
+            return []
+        problems = []
+        for table in ("shots", "punishments"):
+            mine, theirs = getattr(cached, table), getattr(fresh, table)
+            mine_order = np.argsort(mine.column(mine.id_column))
+            theirs_order = np.argsort(theirs.column(theirs.id_column))
+            if mine.size != theirs.size:
+                problems.append(
+                    f"{table}: {mine.size} cached rows, {theirs.size} in SQLite"
+                )
+                continue
+            for name in mine.dtypes:
+                a = mine.column(name)[mine_order]
+                b = theirs.column(name)[theirs_order]
+                if not np.array_equal(a, b):
+                    problems.append(
+                        f"{table}.{name}: {int((a != b).sum())} rows differ"
+                    )
+        return problems
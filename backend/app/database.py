@@ -1,13 +1,185 @@
+import os
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+
+from fastapi import HTTPException
+from sqlalchemy import Engine, event, text
 from sqlmodel import Session, SQLModel, create_engine
 
 sqlite_url = "sqlite:///super_pong.db"
 engine = create_engine(sqlite_url, connect_args={"check_same_thread": False})
 
+# Sharding mode: every tournament's teams, games, shots, punishment bongs and
+# precomputed tables live in their own SQLite file, so tournaments no longer
+# share a writer lock. The main file only keeps players and the tournament
+# registry. Shard connections ATTACH the main file, so unqualified `player`
+# and `tournament` references in queries keep working unchanged.
+SHARDED = os.environ.get("SUPER_PONG_SHARDED") == "1"
+SHARD_DIR = Path("shards")
+# Row ids in tournament t's shard start at t * SHARD_ID_SPAN, so any team,
+# game, shot or bong id can be routed back to its shard.
+SHARD_ID_SPAN = 1_000_000_000
+GLOBAL_TABLES = ("player", "tournament")
+ID_TABLES = ("team", "game", "shot", "punishmentbong")
+
+_shard_engines: dict[int, Engine] = {}
+_shard_lock = threading.Lock()
+
+
+def _global_tables():
+    return [SQLModel.metadata.tables[name] for name in GLOBAL_TABLES]
+
+
+def _shard_tables():
+    return [
+        table
+        for name, table in SQLModel.metadata.tables.items()
+        if name not in GLOBAL_TABLES
+    ]
+
+
+def _shard_path(tournament_id: int) -> Path:
+    return SHARD_DIR / f"tournament_{tournament_id}.db"
+
+
+def _create_shard_engine(tournament_id: int) -> Engine:
+    SHARD_DIR.mkdir(exist_ok=True)
+    path = _shard_path(tournament_id)
+    is_new = not path.exists()
+    shard = create_engine(
+        f"sqlite:///{path}", connect_args={"check_same_thread": False}
+    )
+    main_db = engine.url.database
+
+    @event.listens_for(shard, "connect")
+    def _attach_main(dbapi_connection, _):
+        dbapi_connection.execute("PRAGMA journal_mode=WAL")
+        dbapi_connection.execute(f"ATTACH DATABASE '{main_db}' AS main_db")
+
+    SQLModel.metadata.create_all(shard, tables=_shard_tables())
+    if is_new:
+        # Seed AUTOINCREMENT counters so new ids land in this shard's range.
+        base = tournament_id * SHARD_ID_SPAN
+        with shard.begin() as conn:
+            for table in ID_TABLES:
+                conn.execute(
+                    text(
+                        "INSERT INTO sqlite_sequence (name, seq) VALUES (:name, :seq)"
+                    ),
+                    {"name": table, "seq": base},
+                )
+    return shard
+
+
+def _tournament_exists(tournament_id: int) -> bool:
+    with engine.connect() as conn:
+        row = conn.execute(
+            text("SELECT 1 FROM tournament WHERE id = :tid"), {"tid": tournament_id}
+        ).first()
+    return row is not None
+
+
+def shard_engine(tournament_id: int) -> Engine:
+    """Engine for a tournament's shard, creating the file on first use."""
+    with _shard_lock:
+        shard = _shard_engines.get(tournament_id)
+        if shard is None:
+            shard = _create_shard_engine(tournament_id)
+            _shard_engines[tournament_id] = shard
+        return shard
+
+
+def drop_shard(tournament_id: int) -> None:
+    """Delete a tournament's shard file. Call after its registry row is gone."""
+    with _shard_lock:
+        shard = _shard_engines.pop(tournament_id, None)
+        if shard is not None:
+            shard.dispose()
+        for suffix in ("", "-wal", "-shm"):
+            Path(f"{_shard_path(tournament_id)}{suffix}").unlink(missing_ok=True)
+
+
+def shard_ids() -> list[int]:
+    with engine.connect() as conn:
+        return list(
+            conn.execute(text("SELECT id FROM tournament ORDER BY id")).scalars()
+        )
+
 
 def create_db_and_tables():
-    SQLModel.metadata.create_all(engine)
+    if not SHARDED:
+        SQLModel.metadata.create_all(engine)
+        return
+    with engine.connect() as conn:
+        conn.execute(text("PRAGMA journal_mode=WAL"))
+    SQLModel.metadata.create_all(engine, tables=_global_tables())
+    for tournament_id in shard_ids():
+        shard_engine(tournament_id)
+
+
+@contextmanager
+def tournament_session(tournament_id: int):
+    """Session that can read and write one tournament's data."""
+    bind = shard_engine(tournament_id) if SHARDED else engine
+    with Session(bind) as session:
+        yield session
+
+
+@contextmanager
+def all_tournament_sessions():
+    """One session per shard (just the main session when not sharded)."""
+    if not SHARDED:
+        with Session(engine) as session:
+            yield [session]
+        return
+    sessions = [Session(shard_engine(tid)) for tid in shard_ids()]
+    try:
+        yield sessions
+    finally:
+        for session in sessions:
+            session.close()
+
+
+# ---------------------------------------------------------------------------
+# FastAPI dependencies — route each request to the right database
+# ---------------------------------------------------------------------------
 
 
 def get_session():
+    """Main database: players and the tournament registry."""
     with Session(engine) as session:
         yield session
+
+
+def _routed_session(tournament_id: int, resource: str):
+    known = tournament_id in _shard_engines
+    if SHARDED and not known and not _tournament_exists(tournament_id):
+        raise HTTPException(404, f"{resource} not found")
+    with tournament_session(tournament_id) as session:
+        yield session
+
+
+def get_tournament_session(tournament_id: int):
+    yield from _routed_session(tournament_id, "Tournament")
+
+
+def get_team_session(team_id: int):
+    yield from _routed_session(team_id // SHARD_ID_SPAN, "Team")
+
+
+def get_game_session(game_id: int):
+    yield from _routed_session(game_id // SHARD_ID_SPAN, "Game")
+
+
+def get_shot_session(shot_id: int):
+    yield from _routed_session(shot_id // SHARD_ID_SPAN, "Shot")
+
+
+def get_punishment_bong_session(punishment_bong_id: int):
+    yield from _routed_session(punishment_bong_id // SHARD_ID_SPAN, "Punishment bong")
+
+
+def get_all_sessions():
+    with all_tournament_sessions() as sessions:
+        yield sessions
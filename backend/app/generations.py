@@ -0,0 +1,64 @@
+"""Per-tournament write generations.
+
+A tournament's generation goes up by one with every committed transaction
+that adds or deletes one of its shots, or creates, changes or deletes one of
+its teams or games. Results derived from a whole tournament (simulate.py)
+are cached until the generation moves on. Changes are picked up from session
+events, so every write path is covered without having to call in. Like the
+columnar cache, the counters live in this process.
+"""
+
+import threading
+from collections import defaultdict
+
+from sqlalchemy import event
+from sqlmodel import Session
+
+from .models import Game, Shot, Team
+
+_lock = threading.Lock()
+_generations: defaultdict[int, int] = defaultdict(int)
+
+
+def current(tournament_id: int) -> int:
+    with _lock:
+        return _generations[tournament_id]
+
+
+def touch(session: Session, tournament_id: int) -> None:
+    """Bump the generation when `session` commits, for changes the events miss."""
+    session.info.setdefault("touched_tournaments", set()).add(tournament_id)
+
+
+def _tournament_of(session: Session, obj) -> int | None:
+    if isinstance(obj, (Team, Game)):
+        return obj.tournament_id
+    if isinstance(obj, Shot):
+        # A new shot only carries its game id; the game is in the identity map
+        game = session.get(Game, obj.game_id)
+        return game.tournament_id if game is not None else None
+    return None
+
+
+@event.listens_for(Session, "before_flush")
+def _collect(session, flush_context, instances):
+    changed = [*session.new, *session.deleted]
+    # Flagging a shot's elbow violation doesn't change anything derived here
+    changed += [obj for obj in session.dirty if isinstance(obj, (Team, Game))]
+    for obj in changed:
+        tournament_id = _tournament_of(session, obj)
+        if tournament_id is not None:
+            touch(session, tournament_id)
+
+
+@event.listens_for(Session, "after_commit")
+def _bump(session):
+    touched = session.info.pop("touched_tournaments", ())
+    with _lock:
+        for tournament_id in touched:
+            _generations[tournament_id] += 1
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard(session):
+    session.info.pop("touched_tournaments", None)
@@ -0,0 +1,120 @@
+"""Head-to-head matrices: every team's record against every other team.
+
+One grouped query builds a (team, opponent) row per pair that has met in a
+completed game, reading cups and shooting from the box scores
+(boxscores.py). The result is cached per tournament write generation
+(generations.py), so a TV polling the endpoint costs nothing until a game,
+team or shot changes.
+"""
+
+import threading
+from collections import OrderedDict
+
+from sqlalchemy import text
+from sqlmodel import Session
+
+from . import generations
+from .models import HeadToHead
+
+MAX_CACHED_TOURNAMENTS = 32
+
+_cache: OrderedDict[int, HeadToHead] = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def _pairs(session: Session, tid: int):
+    return session.execute(
+        text("""
+            WITH sides AS (
+                SELECT id AS game_id, team1_id AS team, team2_id AS opponent, winner_id
+                FROM game
+                WHERE tournament_id = :tid AND status = 'COMPLETED'
+                UNION ALL
+                SELECT id, team2_id, team1_id, winner_id
+                FROM game
+                WHERE tournament_id = :tid AND status = 'COMPLETED'
+            ),
+            lines AS (
+                SELECT
+                    game_id,
+                    team_id,
+                    SUM(cups_removed) AS cups,
+                    SUM(hits)         AS hits,
+                    SUM(total_shots)  AS shots
+                FROM boxscore
+                WHERE tournament_id = :tid
+                GROUP BY game_id, team_id
+            )
+            SELECT
+                sd.team,
+                sd.opponent,
+                COUNT(*)                                            AS games,
+                SUM(CASE WHEN sd.winner_id = sd.team THEN 1 ELSE 0 END) AS wins,
+                COALESCE(SUM(l.cups), 0)                            AS cups,
+                COALESCE(SUM(l.hits), 0)                            AS hits,
+                COALESCE(SUM(l.shots), 0)                           AS shots
+            FROM sides sd
+            LEFT JOIN lines l ON l.game_id = sd.game_id AND l.team_id = sd.team
+            GROUP BY sd.team, sd.opponent
+        """),
+        {"tid": tid},
+    ).all()
+
+
+def _build(session: Session, tid: int, generation: int) -> HeadToHead:
+    teams = session.execute(
+        text("""
+            SELECT id, name, "group"
+            FROM team
+            WHERE tournament_id = :tid
+            ORDER BY "group" IS NULL, "group", name, id
+        """),
+        {"tid": tid},
+    ).all()
+    index = {t.id: i for i, t in enumerate(teams)}
+    n = len(teams)
+    games = [[0] * n for _ in range(n)]
+    wins = [[0] * n for _ in range(n)]
+    cups = [[0] * n for _ in range(n)]
+    accuracy_against: list[list[float | None]] = [[None] * n for _ in range(n)]
+    for r in _pairs(session, tid):
+        i, j = index.get(r.team), index.get(r.opponent)
+        if i is None or j is None:
+            continue
+        games[i][j] = r.games
+        wins[i][j] = r.wins
+        cups[i][j] = r.cups
+        # Row i is the opponent whose accuracy this was against
+        if r.shots:
+            accuracy_against[j][i] = round(r.hits / r.shots * 100, 1)
+    return HeadToHead(
+        tournament_id=tid,
+        generation=generation,
+        team_ids=[t.id for t in teams],
+        team_names=[t.name for t in teams],
+        groups=[t.group for t in teams],
+        games=games,
+        wins=wins,
+        cup_differential=[
+            [cups[i][j] - cups[j][i] for j in range(n)] for i in range(n)
+        ],
+        accuracy_against=accuracy_against,
+    )
+
+
+def get_head_to_head(session: Session, tournament_id: int) -> HeadToHead:
+    generation = generations.current(tournament_id)
+    with _cache_lock:
+        cached = _cache.get(tournament_id)
+        if cached is not None and cached.generation == generation:
+            _cache.move_to_end(tournament_id)
+            return cached
+    # Tagged with the generation read before the queries: a write that lands
+    # meanwhile makes the next request rebuild.
+    result = _build(session, tournament_id, generation)
+    with _cache_lock:
+        _cache[tournament_id] = result
+        _cache.move_to_end(tournament_id)
+        if len(_cache) > MAX_CACHED_TOURNAMENTS:
+            _cache.popitem(last=False)
+    return result
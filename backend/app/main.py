@@ -3,14 +3,34 @@ from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
-from .database import create_db_and_tables
-from .routers import games, players, punishment_bongs, shots, teams, tournaments
+from . import ratings, simulate
+from .database import all_tournament_sessions, create_db_and_tables
+from .routers import (
+    elbow_violations,
+    games,
+    players,
+    punishment_bongs,
+    shots,
+    teams,
+    tournaments,
+)
+from .shot_writer import GROUP_COMMIT, writer
+from .writes import rebuild_aggregates
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     create_db_and_tables()
+    with all_tournament_sessions() as sessions:
+        for session in sessions:
+            rebuild_aggregates(session)
+        ratings.rebuild(sessions)
+    if GROUP_COMMIT:
+        writer.start()
+    simulate.warm_up()
     yield
+    writer.stop()
+    simulate.shutdown()
 
 
 app = FastAPI(title="Super Pong", lifespan=lifespan)
@@ -29,3 +49,4 @@ app.include_router(teams.router)
 app.include_router(games.router)
 app.include_router(shots.router)
 app.include_router(punishment_bongs.router)
+app.include_router(elbow_violations.router)
@@ -39,6 +39,36 @@ class GameStatus(str, Enum):
     COMPLETED = "completed"
 
 
+class Elbow(str, Enum):
+    LEFT = "left"
+    RIGHT = "right"
+    BOTH = "both"
+
+
+class ViolationEdge(str, Enum):
+    START = "start"
+    END = "end"
+
+
+class BucketKind(str, Enum):
+    TIME = "time"
+    GAME = "game"
+
+
+class LeaderboardSort(str, Enum):
+    HITS = "hits"
+    HIT_PERCENTAGE = "hit_percentage"
+    EV = "ev"
+    BOUNCE_CUPS_REMOVED = "bounce_cups_removed"
+
+
+class DurationSource(str, Enum):
+    QUERY = "query"  # given in the request
+    TOURNAMENT = "tournament"  # median of this tournament's completed games
+    HISTORY = "history"  # median of recent games across all tournaments
+    DEFAULT = "default"
+
+
 def _utcnow() -> datetime:
     return datetime.now(timezone.utc)
 
@@ -126,6 +156,8 @@ class TeamBase(SQLModel):
 
 
 class Team(TeamBase, table=True):
+    __table_args__ = {"sqlite_autoincrement": True}  # see database.SHARD_ID_SPAN
+
     id: int | None = Field(default=None, primary_key=True)
     tournament_id: int = Field(foreign_key="tournament.id", index=True)
 
@@ -176,6 +208,8 @@ class GameBase(SQLModel):
 
 
 class Game(GameBase, table=True):
+    __table_args__ = {"sqlite_autoincrement": True}  # see database.SHARD_ID_SPAN
+
     id: int | None = Field(default=None, primary_key=True)
     tournament_id: int = Field(foreign_key="tournament.id", index=True)
     winner_id: int | None = Field(default=None, foreign_key="team.id")
@@ -198,6 +232,9 @@ class Game(GameBase, table=True):
         back_populates="game",
         sa_relationship_kwargs={"cascade": "all, delete-orphan"},
     )
+    elbow_violations: list["ElbowViolation"] = Relationship(
+        sa_relationship_kwargs={"cascade": "all, delete-orphan"},
+    )
 
 
 class GameCreate(SQLModel):
@@ -239,6 +276,8 @@ class ShotBase(SQLModel):
 
 
 class Shot(ShotBase, table=True):
+    __table_args__ = {"sqlite_autoincrement": True}  # see database.SHARD_ID_SPAN
+
     id: int | None = Field(default=None, primary_key=True)
     game_id: int = Field(foreign_key="game.id", index=True)
     timestamp: UTCDatetime = Field(default_factory=_utcnow)
@@ -270,6 +309,50 @@ class ShotPublic(SQLModel):
     timestamp: UTCDatetime
 
 
+# ============================================================
+# Elbow violation (reported by the elbow tracker)
+# ============================================================
+
+
+class ElbowViolation(SQLModel, table=True):
+    id: int | None = Field(default=None, primary_key=True)
+    # Chosen by the tracker, so a batch it resends after a failure is a no-op
+    violation_id: str = Field(index=True, unique=True)
+    game_id: int = Field(foreign_key="game.id", index=True)
+    shot_id: int | None = Field(default=None, foreign_key="shot.id", index=True)
+    elbow: Elbow
+    camera: int | None = None
+    started_at: UTCDatetime
+    ended_at: UTCDatetime | None = None
+    clip: str | None = None  # MP4 file name in the tracker's clip directory
+
+
+class ElbowViolationEvent(SQLModel):
+    violation_id: str
+    edge: ViolationEdge
+    timestamp: UTCDatetime
+    elbow: Elbow
+    camera: int | None = None
+    clip: str | None = None
+
+
+class ElbowViolationBatch(SQLModel):
+    game_id: int | None = None  # defaults to the tournament's latest started game
+    events: list[ElbowViolationEvent]
+
+
+class ElbowViolationPublic(SQLModel):
+    id: int
+    violation_id: str
+    game_id: int
+    shot_id: int | None
+    elbow: Elbow
+    camera: int | None
+    started_at: UTCDatetime
+    ended_at: UTCDatetime | None
+    clip: str | None
+
+
 # ============================================================
 # Punishment Bong
 # ============================================================
@@ -281,6 +364,8 @@ class PunishmentBongBase(SQLModel):
 
 
 class PunishmentBong(PunishmentBongBase, table=True):
+    __table_args__ = {"sqlite_autoincrement": True}  # see database.SHARD_ID_SPAN
+
     id: int | None = Field(default=None, primary_key=True)
     tournament_id: int = Field(foreign_key="tournament.id", index=True)
     timestamp: UTCDatetime = Field(default_factory=_utcnow)
@@ -302,6 +387,83 @@ class PunishmentBongPublic(SQLModel):
     timestamp: UTCDatetime
 
 
+# ============================================================
+# Player rollup (precomputed, kept in sync by rollups.py)
+# ============================================================
+
+
+class PlayerTournamentRollup(SQLModel, table=True):
+    player_id: int = Field(foreign_key="player.id", primary_key=True)
+    tournament_id: int = Field(foreign_key="tournament.id", primary_key=True)
+    total_shots: int = 0
+    hits: int = 0
+    misses: int = 0
+    rims: int = 0
+    normal_hits: int = 0
+    normal_total: int = 0
+    bounce_hits: int = 0
+    bounce_total: int = 0
+    bounce_cups_removed: int = 0
+    trickshot_hits: int = 0
+    trickshot_total: int = 0
+    elbow_violations: int = 0
+    longest_hit_streak: int = 0
+    longest_miss_streak: int = 0
+    current_hit_streak: int = 0
+    current_miss_streak: int = 0
+
+
+# ============================================================
+# Performance buckets (precomputed, kept in sync by buckets.py)
+# ============================================================
+
+
+class PerformanceBucket(SQLModel, table=True):
+    """Shot totals for one player in one bucket of a tournament.
+
+    `bucket` is the bucket start in epoch seconds for TIME buckets, and the
+    game id for GAME buckets.
+    """
+
+    tournament_id: int = Field(foreign_key="tournament.id", primary_key=True)
+    player_id: int = Field(foreign_key="player.id", primary_key=True)
+    kind: BucketKind = Field(primary_key=True)
+    bucket: int = Field(primary_key=True)
+    shots: int = 0
+    hits: int = 0
+    cups_removed: int = 0
+
+
+# ============================================================
+# Box scores (precomputed, kept in sync by boxscores.py)
+# ============================================================
+
+
+class BoxScore(SQLModel, table=True):
+    """One player's line in a completed game. Columns match PlayerEntry."""
+
+    game_id: int = Field(foreign_key="game.id", primary_key=True)
+    player_id: int = Field(foreign_key="player.id", primary_key=True)
+    tournament_id: int = Field(foreign_key="tournament.id", index=True)
+    team_id: int = Field(foreign_key="team.id")
+    total_shots: int = 0
+    hits: int = 0
+    misses: int = 0
+    rims: int = 0
+    elbow_violations: int = 0
+    bounce_shots: int = 0
+    bounce_total: int = 0  # sum of recorded bounce counts
+    normal_hits: int = 0
+    normal_total: int = 0
+    bounce_hits: int = 0
+    trickshot_hits: int = 0
+    trickshot_total: int = 0
+    bounce_cups_removed: int = 0
+    cups_removed: int = 0
+    longest_hit_streak: int = 0
+    longest_miss_streak: int = 0
+
+
 # ============================================================
 # Stats response models
 # ============================================================
@@ -404,6 +566,234 @@ class DashboardStats(SQLModel):
     hot_hand: list[HotHandEntry]
 
 
+class TournamentBreakdown(SQLModel):
+    tournament_id: int
+    tournament_name: str
+    total_shots: int
+    hits: int
+    hit_percentage: float
+    ev: float
+    bounce_cups_removed: int
+    longest_hit_streak: int
+
+
+class AllTimeEntry(SQLModel):
+    player_id: int
+    player_name: str
+    tournaments_played: int
+    total_shots: int
+    hits: int
+    misses: int
+    rims: int
+    hit_percentage: float
+    ev: float
+    normal_hits: int
+    normal_total: int
+    bounce_hits: int
+    bounce_total: int
+    bounce_cups_removed: int
+    trickshot_hits: int
+    trickshot_total: int
+    elbow_violations: int
+    longest_hit_streak: int
+    longest_miss_streak: int
+    best_tournament: TournamentBreakdown | None
+    tournaments: list[TournamentBreakdown]
+
+
+class TimeBucketPoint(SQLModel):
+    bucket_start: UTCDatetime
+    shots: int
+    hits: int
+    cups_removed: int
+    hit_percentage: float
+    rolling_hit_percentage: float
+
+
+class GameBucketPoint(SQLModel):
+    game_id: int
+    shots: int
+    hits: int
+    cups_removed: int
+    hit_percentage: float
+    rolling_hit_percentage: float
+
+
+class PlayerForm(SQLModel):
+    player_id: int
+    player_name: str
+    by_time: list[TimeBucketPoint]
+    by_game: list[GameBucketPoint]
+
+
+class FormSeries(SQLModel):
+    tournament_id: int
+    bucket_seconds: int
+    window: int
+    players: list[PlayerForm]
+
+
+class CacheCheck(SQLModel):
+    tournament_id: int
+    enabled: bool
+    consistent: bool
+    mismatches: list[str]
+
+
+class ShotWriterStats(SQLModel):
+    enabled: bool
+    max_batch: int
+    max_delay_ms: float
+    queued: int
+    batches: int
+    shots: int
+    mean_batch_size: float
+    max_batch_size: int
+    p50_commit_ms: float
+    p95_commit_ms: float
+    p50_ack_ms: float
+    p95_ack_ms: float
+
+
+class SimulatedTeam(SQLModel):
+    team_id: int
+    team_name: str
+    group: str | None
+    # Percent of simulated tournaments; None until the first batch is back
+    win_group: float | None
+    advance: float | None
+    reach_final: float | None
+    win_tournament: float | None
+
+
+class TournamentSimulation(SQLModel):
+    tournament_id: int
+    generation: int
+    simulations: int
+    ready: bool  # False while no simulation has finished; the odds are then null
+    converged: bool
+    max_standard_error: float  # percentage points
+    elapsed_ms: float
+    teams: list[SimulatedTeam]
+
+
+class PlayerRating(SQLModel):
+    player_id: int
+    player_name: str
+    rating: float
+    games: int
+    wins: int
+    losses: int
+    provisional: bool
+
+
+class TeamRating(SQLModel):
+    team_id: int
+    team_name: str
+    group: str | None
+    rating: float  # mean of its players' ratings
+    players: list[PlayerRating]
+
+
+class TournamentRatings(SQLModel):
+    tournament_id: int
+    teams: list[TeamRating]
+
+
+class RatingReplay(SQLModel):
+    games: int
+    players: int
+    elapsed_ms: float
+    # Largest difference between the incrementally kept and replayed ratings
+    max_drift: float
+
+
+class ScheduledGame(SQLModel):
+    game_id: int
+    team1_id: int
+    team1_name: str
+    team2_id: int
+    team2_name: str
+    status: GameStatus
+    expected_start: UTCDatetime
+    expected_end: UTCDatetime
+
+
+class TableQueue(SQLModel):
+    table: int  # numbered from 1
+    games: list[ScheduledGame]  # in play order; a game in progress comes first
+
+
+class TournamentSchedule(SQLModel):
+    tournament_id: int
+    game_minutes: float
+    duration_source: DurationSource
+    tables: list[TableQueue]
+    expected_finish: UTCDatetime | None
+    # No schedule can finish before this (busiest team or table capacity)
+    lower_bound_finish: UTCDatetime | None
+    games_per_hour: float
+    elapsed_ms: float
+
+
+class BoxScoreLine(SQLModel):
+    player_id: int
+    player_name: str
+    total_shots: int
+    hits: int
+    misses: int
+    rims: int
+    hit_percentage: float
+    elbow_violations: int
+    bounce_shots: int
+    bounce_total: int
+    normal_hits: int
+    normal_total: int
+    bounce_hits: int
+    trickshot_hits: int
+    trickshot_total: int
+    bounce_cups_removed: int
+    cups_removed: int
+    longest_hit_streak: int
+    longest_miss_streak: int
+
+
+class BoxScoreTeam(SQLModel):
+    team_id: int
+    team_name: str
+    cups_removed: int
+    players: list[BoxScoreLine]
+
+
+class GameBoxScore(SQLModel):
+    game_id: int
+    tournament_id: int
+    status: GameStatus
+    winner_id: int | None
+    # True once the game is completed and the lines come from the box score
+    # table; games still being played are computed from their shots.
+    materialized: bool
+    teams: list[BoxScoreTeam]
+
+
+class HeadToHead(SQLModel):
+    """Teams x teams matrices over completed games.
+
+    Row i is a team and column j its opponent, both in `team_ids` order.
+    """
+
+    tournament_id: int
+    generation: int
+    team_ids: list[int]
+    team_names: list[str]
+    groups: list[str | None]
+    games: list[list[int]]  # completed games between i and j
+    wins: list[list[int]]  # games i won against j
+    cup_differential: list[list[int]]  # cups i removed minus cups j removed
+    # j's hit percentage in its games against i; None if j never shot at i
+    accuracy_against: list[list[float | None]]
+
+
 # Rebuild models for forward reference resolution
 Player.model_rebuild()
 Tournament.model_rebuild()
@@ -0,0 +1,416 @@
+"""Elo-style strength ratings for players, and for teams through their players.
+
+Every completed game with a winner is one rating event. A team's strength is
+the mean of its players' ratings, which gives the winner's expected score.
+The rating change, K * (result - expected), is split between teammates by
+their share of the team's cups in that game. K starts high and settles as a
+player's game count grows, so newcomers find their level within a few games
+while established ratings move slowly. That is the uncertainty half of
+TrueSkill, without its Gaussian bookkeeping.
+
+Games are applied in (started_at, id) order, so the ratings are a pure
+function of the data and a full replay always lands on the same numbers.
+Like the columnar cache, the rating book lives in this process. It is
+replayed at startup and then kept current from session events, so every
+write path is covered:
+
+- A game that turns COMPLETED after all rated games is appended in O(1).
+- A correction rewinds the book to the first affected game and reapplies
+  from there. Corrections include a changed winner, a reopened or deleted
+  game, shots edited in a completed game, or a game completing out of
+  order. Each applied game keeps its players' ratings from before it, so
+  rewinding restores them exactly.
+"""
+
+import threading
+import time
+from bisect import bisect_left
+from collections import defaultdict
+from dataclasses import dataclass
+
+from sqlalchemy import bindparam, event, text
+from sqlmodel import Session, select
+
+from .database import tournament_session
+from .models import (
+    Game,
+    GameStatus,
+    Player,
+    PlayerRating,
+    RatingReplay,
+    Shot,
+    Team,
+    TeamRating,
+    TournamentRatings,
+)
+
+INITIAL_RATING = 1500.0
+K_MAX = 64.0  # K for a player's first game...
+K_MIN = 16.0  # ...falling towards this one
+SETTLE_GAMES = 10  # games after which K is halfway between the two
+PROVISIONAL_GAMES = 5  # ratings from fewer games are flagged provisional
+# How much of a game's rating change follows each player's share of the
+# team's cups: 0 splits it evenly, 1 hands it all to whoever sank the cups.
+PERFORMANCE_WEIGHT = 0.5
+
+# (rating, games, wins)
+_UNRATED = (INITIAL_RATING, 0, 0)
+
+
+def k_factor(games: int) -> float:
+    return K_MIN + (K_MAX - K_MIN) * SETTLE_GAMES / (SETTLE_GAMES + games)
+
+
+def expected_score(rating: float, opponent: float) -> float:
+    return 1 / (1 + 10 ** ((opponent - rating) / 400))
+
+
+@dataclass(slots=True)
+class RatedGame:
+    game_id: int
+    tournament_id: int
+    started_at: str  # SQLite's text format sorts chronologically; "" if unset
+    winner_team: int
+    loser_team: int
+    winners: tuple[int, int]
+    losers: tuple[int, int]
+    # Cups sunk by each player, in the order of `winners` / `losers`
+    winner_cups: tuple[int, int]
+    loser_cups: tuple[int, int]
+
+    @property
+    def key(self) -> tuple[str, int]:
+        return (self.started_at, self.game_id)
+
+
+class RatingBook:
+    """Player ratings plus the ordered games that produced them."""
+
+    def __init__(self):
+        self.players: dict[int, tuple[float, int, int]] = {}
+        self._games: list[RatedGame] = []
+        self._keys: list[tuple[str, int]] = []
+        # Per applied game: (player, state before it or None if unrated)
+        self._before: list[tuple[tuple[int, tuple | None], ...]] = []
+        self._by_id: dict[int, RatedGame] = {}
+
+    @classmethod
+    def replay(cls, games: list[RatedGame]) -> "RatingBook":
+        book = cls()
+        for game in sorted(games, key=lambda g: g.key):
+            book._apply(game)
+        return book
+
+    def __contains__(self, game_id: int) -> bool:
+        return game_id in self._by_id
+
+    def __len__(self) -> int:
+        return len(self._games)
+
+    def state(self, player_id: int) -> tuple[float, int, int]:
+        return self.players.get(player_id, _UNRATED)
+
+    def tournament_of(self, game_id: int) -> int:
+        return self._by_id[game_id].tournament_id
+
+    def games_of_team(self, team_id: int) -> list[int]:
+        return [
+            g.game_id for g in self._games if team_id in (g.winner_team, g.loser_team)
+        ]
+
+    def games_of_tournament(self, tournament_id: int) -> list[int]:
+        return [g.game_id for g in self._games if g.tournament_id == tournament_id]
+
+    def update(self, changes: dict[int, RatedGame | None]) -> int:
+        """Apply new, changed (RatedGame) and unrated (None) games.
+
+        Returns how many games were (re)applied.
+        """
+        changes = {
+            game_id: game
+            for game_id, game in changes.items()
+            if self._by_id.get(game_id) != game
+        }
+        if not changes:
+            return 0
+        start = len(self._games)
+        for game_id, game in changes.items():
+            for known in (self._by_id.get(game_id), game):
+                if known is not None:
+                    start = min(start, bisect_left(self._keys, known.key))
+        tail = [g for g in self._rewind(start) if g.game_id not in changes]
+        tail += [g for g in changes.values() if g is not None]
+        tail.sort(key=lambda g: g.key)
+        for game in tail:
+            self._apply(game)
+        return len(tail)
+
+    def _apply(self, game: RatedGame) -> None:
+        players = self.players
+        involved = dict.fromkeys((*game.winners, *game.losers))
+        self._before.append(tuple((p, players.get(p)) for p in involved))
+        winners = [players.get(p, _UNRATED) for p in game.winners]
+        losers = [players.get(p, _UNRATED) for p in game.losers]
+        upset = 1 - expected_score(
+            sum(s[0] for s in winners) / 2, sum(s[0] for s in losers) / 2
+        )
+        updates = {}
+        for ids, states, cups, sign in (
+            (game.winners, winners, game.winner_cups, 1),
+            (game.losers, losers, game.loser_cups, -1),
+        ):
+            total = sum(cups)
+            for player_id, (rating, games, wins), sunk in zip(ids, states, cups):
+                lead = 2 * sunk / total - 1 if total else 0.0
+                weight = 1 + sign * PERFORMANCE_WEIGHT * lead
+                updates[player_id] = (
+                    rating + sign * k_factor(games) * upset * weight,
+                    games + 1,
+                    wins + (sign > 0),
+                )
+        players.update(updates)
+        self._games.append(game)
+        self._keys.append(game.key)
+        self._by_id[game.game_id] = game
+
+    def _rewind(self, index: int) -> list[RatedGame]:
+        """Undo every game from `index` on and return them."""
+        undone = []
+        while len(self._games) > index:
+            game = self._games.pop()
+            self._keys.pop()
+            del self._by_id[game.game_id]
+            for player_id, state in self._before.pop():
+                if state is None:
+                    del self.players[player_id]
+                else:
+                    self.players[player_id] = state
+            undone.append(game)
+        return undone
+
+
+# ---------------------------------------------------------------------------
+# Loading games from SQLite
+# ---------------------------------------------------------------------------
+
+_GAMES_SQL = """
+    SELECT
+        g.id,
+        g.tournament_id,
+        COALESCE(g.started_at, '') AS started_at,
+        w.id AS winner_team,
+        l.id AS loser_team,
+        w.player1_id AS w1,
+        w.player2_id AS w2,
+        l.player1_id AS l1,
+        l.player2_id AS l2
+    FROM game g
+    JOIN team w ON w.id = g.winner_id
+    JOIN team l ON l.id = CASE
+        WHEN g.winner_id = g.team1_id THEN g.team2_id ELSE g.team1_id END
+    WHERE g.status = 'COMPLETED'
+        AND g.winner_id IN (g.team1_id, g.team2_id)
+        AND {where}
+"""
+
+# Per-game cups come from the GAME performance buckets (buckets.py), which
+# the shot write paths keep current in the same transaction, instead of
+# aggregating the shot table.
+_CUPS_SQL = """
+    SELECT b.bucket AS game_id, b.player_id, b.cups_removed AS cups
+    FROM performancebucket b
+    WHERE b.kind = 'GAME' AND {where}
+"""
+
+
+def load_games(
+    session: Session, tournament_id: int | None = None, game_ids=None
+) -> list[RatedGame]:
+    """Rated games from one database: all of them, or `game_ids` of a tournament."""
+    games_where = cups_where = "1 = 1"
+    params = {}
+    if game_ids is not None:
+        games_where = "g.id IN :ids"
+        cups_where = "b.tournament_id = :tid AND b.bucket IN :ids"
+        params = {"tid": tournament_id, "ids": list(game_ids)}
+
+    def query(sql, where):
+        statement = text(sql.format(where=where))
+        if game_ids is not None:
+            statement = statement.bindparams(bindparam("ids", expanding=True))
+        return session.execute(statement, params).tuples().all()
+
+    # Plain tuples: named Row access dominates the load on long histories
+    cups = {(g, p): n for g, p, n in query(_CUPS_SQL, cups_where)}
+    games = []
+    for row in query(_GAMES_SQL, games_where):
+        game_id, tournament_id, started_at, winner_team, loser_team = row[:5]
+        w1, w2, l1, l2 = row[5:]
+        games.append(
+            RatedGame(
+                game_id,
+                tournament_id,
+                started_at,
+                winner_team,
+                loser_team,
+                (w1, w2),
+                (l1, l2),
+                (cups.get((game_id, w1), 0), cups.get((game_id, w2), 0)),
+                (cups.get((game_id, l1), 0), cups.get((game_id, l2), 0)),
+            )
+        )
+    return games
+
+
+# ---------------------------------------------------------------------------
+# The process-wide book
+# ---------------------------------------------------------------------------
+
+_lock = threading.Lock()
+_book = RatingBook()
+
+
+def rebuild(sessions: list[Session]) -> RatingBook:
+    """Replay every tournament's completed games from scratch."""
+    global _book
+    with _lock:
+        _book = RatingBook.replay([g for s in sessions for g in load_games(s)])
+        return _book
+
+
+def replay(sessions: list[Session]) -> RatingReplay:
+    """Full replay for corrections made outside the API (or to audit the book)."""
+    global _book
+    started = time.perf_counter()
+    with _lock:
+        fresh = RatingBook.replay([g for s in sessions for g in load_games(s)])
+        drift = max(
+            (
+                abs(fresh.state(p)[0] - _book.state(p)[0])
+                for p in fresh.players.keys() | _book.players.keys()
+            ),
+            default=0.0,
+        )
+        _book = fresh
+    return RatingReplay(
+        games=len(fresh),
+        players=len(fresh.players),
+        elapsed_ms=round((time.perf_counter() - started) * 1000, 1),
+        max_drift=round(drift, 6),
+    )
+
+
+def forget_tournament(session: Session, tournament_id: int) -> None:
+    """Unrate a tournament's games when `session` commits.
+
+    For deletes that bypass the ORM (a sharded tournament's registry row).
+    """
+    session.info.setdefault("unrated_tournaments", set()).add(tournament_id)
+
+
+def _rating(player_id: int, name: str, state: tuple) -> PlayerRating:
+    rating, games, wins = state
+    return PlayerRating(
+        player_id=player_id,
+        player_name=name,
+        rating=round(rating, 1),
+        games=games,
+        wins=wins,
+        losses=games - wins,
+        provisional=games < PROVISIONAL_GAMES,
+    )
+
+
+def get_player_ratings(session: Session, limit: int | None) -> list[PlayerRating]:
+    players = session.exec(select(Player)).all()
+    with _lock:
+        ratings = [_rating(p.id, p.name, _book.state(p.id)) for p in players]
+    ratings.sort(key=lambda r: (-r.rating, r.player_name))
+    return ratings[:limit]
+
+
+def get_tournament_ratings(session: Session, tournament_id: int) -> TournamentRatings:
+    teams = session.execute(
+        text("""
+            SELECT t.id, t.name, t."group",
+                   p1.id AS p1_id, p1.name AS p1_name,
+                   p2.id AS p2_id, p2.name AS p2_name
+            FROM team t
+            JOIN player p1 ON t.player1_id = p1.id
+            JOIN player p2 ON t.player2_id = p2.id
+            WHERE t.tournament_id = :tid
+        """),
+        {"tid": tournament_id},
+    ).all()
+    rated = []
+    with _lock:
+        for t in teams:
+            players = [
+                _rating(t.p1_id, t.p1_name, _book.state(t.p1_id)),
+                _rating(t.p2_id, t.p2_name, _book.state(t.p2_id)),
+            ]
+            rated.append(
+                TeamRating(
+                    team_id=t.id,
+                    team_name=t.name,
+                    group=t.group,
+                    rating=round(sum(p.rating for p in players) / 2, 1),
+                    players=players,
+                )
+            )
+    rated.sort(key=lambda t: (-t.rating, t.team_name))
+    return TournamentRatings(tournament_id=tournament_id, teams=rated)
+
+
+# ---------------------------------------------------------------------------
+# Session events
+# ---------------------------------------------------------------------------
+
+
+@event.listens_for(Session, "after_flush")
+def _collect(session, flush_context):
+    # new/dirty/deleted still hold the flushed objects, now with their ids
+    touched = set()
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(obj, Game):
+            if obj.id in _book or obj.status == GameStatus.COMPLETED:
+                touched.add((obj.tournament_id, obj.id))
+        elif isinstance(obj, Shot):
+            # Flagging an elbow violation (dirty) doesn't change the cups
+            if obj not in session.dirty and obj.game_id in _book:
+                touched.add((_book.tournament_of(obj.game_id), obj.game_id))
+        elif isinstance(obj, Team) and obj in session.dirty:
+            touched.update(
+                (obj.tournament_id, game_id) for game_id in _book.games_of_team(obj.id)
+            )
+    if touched:
+        session.info.setdefault("rated_games", set()).update(touched)
+
+
+@event.listens_for(Session, "after_commit")
+def _update(session):
+    touched = session.info.pop("rated_games", set())
+    dropped = session.info.pop("unrated_tournaments", set())
+    if not touched and not dropped:
+        return
+    by_tournament = defaultdict(set)
+    for tournament_id, game_id in touched:
+        if tournament_id not in dropped:
+            by_tournament[tournament_id].add(game_id)
+    # Load under the lock, so a commit's changes can't be overtaken by an
+    # older snapshot of the same games loaded by a concurrent commit.
+    with _lock:
+        changes = {}
+        for tournament_id in dropped:
+            changes.update(dict.fromkeys(_book.games_of_tournament(tournament_id)))
+        for tournament_id, game_ids in by_tournament.items():
+            with tournament_session(tournament_id) as s:
+                loaded = {g.game_id: g for g in load_games(s, tournament_id, game_ids)}
+            changes.update({game_id: loaded.get(game_id) for game_id in game_ids})
+        _book.update(changes)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard(session):
+    session.info.pop("rated_games", None)
+    session.info.pop("unrated_tournaments", None)
@@ -0,0 +1,198 @@
+from sqlalchemy import delete, text
+from sqlmodel import Session
+
+from .models import PlayerTournamentRollup, Shot, ShotOutcome, ShotType
+
+# Counter columns shared by the rollup table and the recompute query.
+_COUNTERS = (
+    "total_shots",
+    "hits",
+    "misses",
+    "rims",
+    "normal_hits",
+    "normal_total",
+    "bounce_hits",
+    "bounce_total",
+    "bounce_cups_removed",
+    "trickshot_hits",
+    "trickshot_total",
+    "elbow_violations",
+)
+
+
+# ---------------------------------------------------------------------------
+# Private helpers
+# ---------------------------------------------------------------------------
+
+
+def _shot_deltas(shot: Shot) -> dict[str, int]:
+    """Counter increments contributed by a single (non-rerack) shot."""
+    hit = shot.outcome == ShotOutcome.HIT
+    bounce = shot.shot_type == ShotType.BOUNCE
+    return {
+        "total_shots": 1,
+        "hits": int(hit),
+        "misses": int(shot.outcome == ShotOutcome.MISS),
+        "rims": int(shot.outcome == ShotOutcome.RIM),
+        "normal_hits": int(shot.shot_type == ShotType.NORMAL and hit),
+        "normal_total": int(shot.shot_type == ShotType.NORMAL),
+        "bounce_hits": int(bounce and hit),
+        "bounce_total": int(bounce),
+        "bounce_cups_removed": shot.bounces + 1
+        if bounce and hit and shot.bounces is not None
+        else 0,
+        "trickshot_hits": int(shot.shot_type == ShotType.TRICKSHOT and hit),
+        "trickshot_total": int(shot.shot_type == ShotType.TRICKSHOT),
+        "elbow_violations": int(shot.elbow_violation),
+    }
+
+
+def _advance_streaks(rollup: PlayerTournamentRollup, is_hit: bool) -> None:
+    """Extend the running streaks with one more shot. RIM counts as a miss."""
+    if is_hit:
+        rollup.current_hit_streak += 1
+        rollup.current_miss_streak = 0
+        rollup.longest_hit_streak = max(
+            rollup.longest_hit_streak, rollup.current_hit_streak
+        )
+    else:
+        rollup.current_miss_streak += 1
+        rollup.current_hit_streak = 0
+        rollup.longest_miss_streak = max(
+            rollup.longest_miss_streak, rollup.current_miss_streak
+        )
+
+
+def _recompute(
+    session: Session, where: str, params: dict
+) -> list[PlayerTournamentRollup]:
+    """Rebuild rollup rows from the shot table for every key matching `where`.
+
+    Totals come from one grouped query; streaks need the ordered outcome
+    sequence, so those are replayed in Python.
+    """
+    totals = session.execute(
+        text(f"""
+            SELECT
+                s.player_id,
+                g.tournament_id,
+                COUNT(*)                                             AS total_shots,
+                SUM(CASE WHEN s.outcome = 'HIT' THEN 1 ELSE 0 END)  AS hits,
+                SUM(CASE WHEN s.outcome = 'MISS' THEN 1 ELSE 0 END) AS misses,
+                SUM(CASE WHEN s.outcome = 'RIM' THEN 1 ELSE 0 END)  AS rims,
+                SUM(CASE WHEN s.shot_type = 'NORMAL' AND s.outcome = 'HIT' THEN 1 ELSE 0 END)    AS normal_hits,
+                SUM(CASE WHEN s.shot_type = 'NORMAL' THEN 1 ELSE 0 END)                          AS normal_total,
+                SUM(CASE WHEN s.shot_type = 'BOUNCE' AND s.outcome = 'HIT' THEN 1 ELSE 0 END)    AS bounce_hits,
+                SUM(CASE WHEN s.shot_type = 'BOUNCE' THEN 1 ELSE 0 END)                          AS bounce_total,
+                COALESCE(SUM(CASE WHEN s.shot_type = 'BOUNCE' AND s.outcome = 'HIT'
+                    THEN s.bounces + 1 ELSE 0 END), 0)                                            AS bounce_cups_removed,
+                SUM(CASE WHEN s.shot_type = 'TRICKSHOT' AND s.outcome = 'HIT' THEN 1 ELSE 0 END) AS trickshot_hits,
+                SUM(CASE WHEN s.shot_type = 'TRICKSHOT' THEN 1 ELSE 0 END)                       AS trickshot_total,
+                SUM(CASE WHEN s.elbow_violation = 1 THEN 1 ELSE 0 END)                           AS elbow_violations
+            FROM shot s
+            JOIN game g ON s.game_id = g.id
+            WHERE s.shot_type != 'RERACK' AND {where}
+            GROUP BY s.player_id, g.tournament_id
+        """),
+        params,
+    ).all()
+    rollups = {
+        (r.player_id, r.tournament_id): PlayerTournamentRollup(
+            player_id=r.player_id,
+            tournament_id=r.tournament_id,
+            **{c: getattr(r, c) or 0 for c in _COUNTERS},
+        )
+        for r in totals
+    }
+
+    outcomes = session.execute(
+        text(f"""
+            SELECT s.player_id, g.tournament_id, s.outcome = 'HIT' AS is_hit
+            FROM shot s
+            JOIN game g ON s.game_id = g.id
+            WHERE s.shot_type != 'RERACK' AND {where}
+            ORDER BY s.player_id, g.tournament_id, s.timestamp, s.id
+        """),
+        params,
+    ).all()
+    for r in outcomes:
+        _advance_streaks(rollups[(r.player_id, r.tournament_id)], bool(r.is_hit))
+
+    return list(rollups.values())
+
+
+# ---------------------------------------------------------------------------
+# Public functions — called from the write paths
+# ---------------------------------------------------------------------------
+
+
+def record_shot(session: Session, shot: Shot, tournament_id: int) -> None:
+    """Fold a newly created shot into its player's rollup in O(1).
+
+    New shots are always the latest in time, so streaks can be extended
+    without looking at history.
+    """
+    if shot.shot_type == ShotType.RERACK:
+        return
+    key = {"player_id": shot.player_id, "tournament_id": tournament_id}
+    rollup = session.get(PlayerTournamentRollup, key)
+    if rollup is None:
+        rollup = PlayerTournamentRollup(**key, **{c: 0 for c in _COUNTERS})
+    for column, delta in _shot_deltas(shot).items():
+        setattr(rollup, column, getattr(rollup, column) + delta)
+    _advance_streaks(rollup, shot.outcome == ShotOutcome.HIT)
+    session.add(rollup)
+
+
+def record_elbow_violation(session: Session, shot: Shot, tournament_id: int) -> None:
+    """Count an elbow violation flagged on an already recorded shot in O(1)."""
+    if shot.shot_type == ShotType.RERACK:
+        return
+    rollup = session.get(
+        PlayerTournamentRollup,
+        {"player_id": shot.player_id, "tournament_id": tournament_id},
+    )
+    if rollup is not None:
+        rollup.elbow_violations += 1
+        session.add(rollup)
+
+
+def refresh_player_rollup(session: Session, player_id: int, tournament_id: int) -> None:
+    """Recompute one (player, tournament) rollup from its shots.
+
+    Used after deletes, where streaks cannot be patched incrementally.
+    Call after the delete has been flushed.
+    """
+    session.flush()
+    existing = session.get(
+        PlayerTournamentRollup,
+        {"player_id": player_id, "tournament_id": tournament_id},
+    )
+    fresh = _recompute(
+        session,
+        "s.player_id = :pid AND g.tournament_id = :tid",
+        {"pid": player_id, "tid": tournament_id},
+    )
+    if fresh:
+        session.merge(fresh[0])
+    elif existing:
+        session.delete(existing)
+
+
+def drop_tournament_rollups(session: Session, tournament_id: int) -> None:
+    session.execute(
+        delete(PlayerTournamentRollup).where(
+            PlayerTournamentRollup.tournament_id == tournament_id
+        )
+    )
+
+
+def rebuild_rollups(session: Session) -> None:
+    """Full compaction: rebuild every rollup row from the shot table.
+
+    Run at startup so databases created before rollups existed (or edited
+    by hand) are brought back in sync.
+    """
+    session.execute(delete(PlayerTournamentRollup))
+    session.add_all(_recompute(session, "1 = 1", {}))
+    session.commit()
@@ -0,0 +1,65 @@
+from fastapi import APIRouter, Depends, HTTPException
+from sqlmodel import Session, select
+
+from ..database import get_game_session, get_tournament_session
+from ..models import (
+    ElbowViolation,
+    ElbowViolationBatch,
+    ElbowViolationPublic,
+    Game,
+    GameStatus,
+    Tournament,
+)
+from ..writes import record_elbow_violations
+
+router = APIRouter(tags=["elbow-violations"])
+
+
+@router.post(
+    "/tournaments/{tournament_id}/elbow-violations",
+    response_model=list[ElbowViolationPublic],
+)
+def report_elbow_violations(
+    tournament_id: int,
+    body: ElbowViolationBatch,
+    session: Session = Depends(get_tournament_session),
+):
+    """Batch of start/end events from the elbow tracker.
+
+    Without a `game_id` the events go to the game in progress that started last.
+    """
+    if not session.get(Tournament, tournament_id):
+        raise HTTPException(404, "Tournament not found")
+    if body.game_id is not None:
+        game = session.get(Game, body.game_id)
+        if not game or game.tournament_id != tournament_id:
+            raise HTTPException(404, "Game not found")
+    else:
+        game = session.exec(
+            select(Game)
+            .where(
+                Game.tournament_id == tournament_id,
+                Game.status == GameStatus.IN_PROGRESS,
+            )
+            .order_by(Game.started_at.desc())
+        ).first()
+        if not game:
+            raise HTTPException(409, "No game in progress")
+    violations = record_elbow_violations(session, game, body.events)
+    session.commit()
+    for violation in violations:
+        session.refresh(violation)
+    return violations
+
+
+@router.get(
+    "/games/{game_id}/elbow-violations", response_model=list[ElbowViolationPublic]
+)
+def list_elbow_violations(game_id: int, session: Session = Depends(get_game_session)):
+    if not session.get(Game, game_id):
+        raise HTTPException(404, "Game not found")
+    return session.exec(
+        select(ElbowViolation)
+        .where(ElbowViolation.game_id == game_id)
+        .order_by(ElbowViolation.started_at)
+    ).all()
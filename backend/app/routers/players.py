@@ -1,9 +1,19 @@
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlmodel import Session, select
 
-from ..database import get_session
-from ..models import Player, PlayerCreate, PlayerPublic, PlayerStats
-from ..stats import get_player_stats
+from ..database import get_all_sessions, get_session
+from ..models import (
+    AllTimeEntry,
+    LeaderboardSort,
+    Player,
+    PlayerCreate,
+    PlayerPublic,
+    PlayerRating,
+    PlayerStats,
+    RatingReplay,
+)
+from ..ratings import get_player_ratings, replay
+from ..stats import get_all_time_leaderboard, get_player_stats
 
 router = APIRouter(prefix="/players", tags=["players"])
 
@@ -23,6 +33,30 @@ def search_players(
     ).all()
 
 
+@router.get("/leaderboard", response_model=list[AllTimeEntry])
+def all_time_leaderboard(
+    sort: LeaderboardSort = LeaderboardSort.HITS,
+    limit: int | None = Query(default=None, ge=1),
+    sessions: list[Session] = Depends(get_all_sessions),
+):
+    return get_all_time_leaderboard(sessions, sort, limit)
+
+
+@router.get("/ratings", response_model=list[PlayerRating])
+def player_ratings(
+    limit: int | None = Query(default=None, ge=1),
+    session: Session = Depends(get_session),
+):
+    """Elo-style ratings from every completed game (see ratings.py)."""
+    return get_player_ratings(session, limit)
+
+
+@router.post("/ratings/replay", response_model=RatingReplay)
+def replay_ratings(sessions: list[Session] = Depends(get_all_sessions)):
+    """Recompute every rating from scratch, e.g. after editing the database by hand."""
+    return replay(sessions)
+
+
 @router.post("/", response_model=PlayerPublic, status_code=201)
 def create_player(body: PlayerCreate, session: Session = Depends(get_session)):
     player = Player.model_validate(body)
@@ -41,8 +75,12 @@ def get_player(player_id: int, session: Session = Depends(get_session)):
 
 
 @router.get("/{player_id}/stats", response_model=PlayerStats)
-def player_stats(player_id: int, session: Session = Depends(get_session)):
+def player_stats(
+    player_id: int,
+    session: Session = Depends(get_session),
+    sessions: list[Session] = Depends(get_all_sessions),
+):
     player = session.get(Player, player_id)
     if not player:
         raise HTTPException(404, "Player not found")
-    return get_player_stats(session, player.id, player.name)
+    return get_player_stats(sessions, player.id, player.name)
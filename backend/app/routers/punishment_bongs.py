@@ -1,7 +1,7 @@
 from fastapi import APIRouter, Depends, HTTPException
 from sqlmodel import Session, select
 
-from ..database import get_session
+from ..database import get_punishment_bong_session, get_tournament_session
 from ..models import (
     PunishmentBong,
     PunishmentBongCreate,
@@ -9,6 +9,7 @@ from ..models import (
     Tournament,
     Player,
 )
+from ..writes import add_punishment_bong, remove_punishment_bong
 
 router = APIRouter(tags=["punishment-bongs"])
 
@@ -21,14 +22,13 @@ router = APIRouter(tags=["punishment-bongs"])
 def create_punishment_bong(
     tournament_id: int,
     body: PunishmentBongCreate,
-    session: Session = Depends(get_session),
+    session: Session = Depends(get_tournament_session),
 ):
     if not session.get(Tournament, tournament_id):
         raise HTTPException(404, "Tournament not found")
     if not session.get(Player, body.player_id):
         raise HTTPException(404, "Player not found")
-    pb = PunishmentBong(tournament_id=tournament_id, **body.model_dump())
-    session.add(pb)
+    pb = add_punishment_bong(session, tournament_id, body)
     session.commit()
     session.refresh(pb)
     return pb
@@ -38,7 +38,9 @@ def create_punishment_bong(
     "/tournaments/{tournament_id}/punishment-bongs",
     response_model=list[PunishmentBongPublic],
 )
-def list_punishment_bongs(tournament_id: int, session: Session = Depends(get_session)):
+def list_punishment_bongs(
+    tournament_id: int, session: Session = Depends(get_tournament_session)
+):
     if not session.get(Tournament, tournament_id):
         raise HTTPException(404, "Tournament not found")
     return session.exec(
@@ -50,10 +52,10 @@ def list_punishment_bongs(tournament_id: int, session: Session = Depends(get_ses
 
 @router.delete("/punishment-bongs/{punishment_bong_id}", status_code=204)
 def delete_punishment_bong(
-    punishment_bong_id: int, session: Session = Depends(get_session)
+    punishment_bong_id: int, session: Session = Depends(get_punishment_bong_session)
 ):
     pb = session.get(PunishmentBong, punishment_bong_id)
     if not pb:
         raise HTTPException(404, "Punishment bong not found")
-    session.delete(pb)
+    remove_punishment_bong(session, pb)
     session.commit()
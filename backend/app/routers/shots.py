@@ -1,8 +1,10 @@
 from fastapi import APIRouter, Depends, HTTPException
 from sqlmodel import Session, select
 
-from ..database import get_session
-from ..models import Game, Shot, ShotCreate, ShotPublic
+from ..database import get_game_session, get_shot_session
+from ..models import Game, Shot, ShotCreate, ShotPublic, ShotWriterStats
+from ..shot_writer import GROUP_COMMIT, writer
+from ..writes import add_shot, remove_shot
 
 router = APIRouter(tags=["shots"])
 
@@ -11,19 +13,21 @@ router = APIRouter(tags=["shots"])
 def create_shot(
     game_id: int,
     body: ShotCreate,
-    session: Session = Depends(get_session),
+    session: Session = Depends(get_game_session),
 ):
-    if not session.get(Game, game_id):
+    game = session.get(Game, game_id)
+    if not game:
         raise HTTPException(404, "Game not found")
-    shot = Shot(game_id=game_id, **body.model_dump())
-    session.add(shot)
+    if GROUP_COMMIT:
+        return writer.submit(game.tournament_id, game_id, body)
+    shot = add_shot(session, game, body)
     session.commit()
     session.refresh(shot)
     return shot
 
 
 @router.get("/games/{game_id}/shots", response_model=list[ShotPublic])
-def list_shots(game_id: int, session: Session = Depends(get_session)):
+def list_shots(game_id: int, session: Session = Depends(get_game_session)):
     if not session.get(Game, game_id):
         raise HTTPException(404, "Game not found")
     return session.exec(
@@ -31,10 +35,16 @@ def list_shots(game_id: int, session: Session = Depends(get_session)):
     ).all()
 
 
+@router.get("/shots/writer-stats", response_model=ShotWriterStats)
+def shot_writer_stats():
+    """Batch sizes and commit/ack latency of the group-commit writer."""
+    return writer.stats()
+
+
 @router.delete("/shots/{shot_id}", status_code=204)
-def delete_shot(shot_id: int, session: Session = Depends(get_session)):
+def delete_shot(shot_id: int, session: Session = Depends(get_shot_session)):
     shot = session.get(Shot, shot_id)
     if not shot:
         raise HTTPException(404, "Shot not found")
-    session.delete(shot)
+    remove_shot(session, shot)
     session.commit()
@@ -1,7 +1,7 @@
 from fastapi import APIRouter, Depends, HTTPException
 from sqlmodel import Session, select
 
-from ..database import get_session
+from ..database import get_team_session, get_tournament_session
 from ..models import Team, TeamCreate, TeamPublic, TeamUpdate, Tournament
 
 router = APIRouter(tags=["teams"])
@@ -13,7 +13,7 @@ router = APIRouter(tags=["teams"])
 def create_team(
     tournament_id: int,
     body: TeamCreate,
-    session: Session = Depends(get_session),
+    session: Session = Depends(get_tournament_session),
 ):
     if not session.get(Tournament, tournament_id):
         raise HTTPException(404, "Tournament not found")
@@ -25,7 +25,7 @@ def create_team(
 
 
 @router.get("/tournaments/{tournament_id}/teams", response_model=list[TeamPublic])
-def list_teams(tournament_id: int, session: Session = Depends(get_session)):
+def list_teams(tournament_id: int, session: Session = Depends(get_tournament_session)):
     if not session.get(Tournament, tournament_id):
         raise HTTPException(404, "Tournament not found")
     return session.exec(select(Team).where(Team.tournament_id == tournament_id)).all()
@@ -35,7 +35,7 @@ def list_teams(tournament_id: int, session: Session = Depends(get_session)):
 def update_team(
     team_id: int,
     body: TeamUpdate,
-    session: Session = Depends(get_session),
+    session: Session = Depends(get_team_session),
 ):
     team = session.get(Team, team_id)
     if not team:
@@ -49,7 +49,7 @@ def update_team(
 
 
 @router.delete("/teams/{team_id}", status_code=204)
-def delete_team(team_id: int, session: Session = Depends(get_session)):
+def delete_team(team_id: int, session: Session = Depends(get_team_session)):
     team = session.get(Team, team_id)
     if not team:
         raise HTTPException(404, "Team not found")
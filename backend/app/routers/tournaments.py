@@ -1,15 +1,27 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlmodel import Session, select
 
-from ..database import get_session
+from ..columnar import COLUMNAR_CACHE, check_consistency
+from ..database import SHARDED, drop_shard, get_session, get_tournament_session
+from ..headtohead import get_head_to_head
 from ..models import (
+    CacheCheck,
     DashboardStats,
+    FormSeries,
+    HeadToHead,
     Tournament,
     TournamentCreate,
     TournamentPublic,
+    TournamentRatings,
+    TournamentSchedule,
+    TournamentSimulation,
     TournamentStats,
 )
-from ..stats import get_dashboard, get_tournament_stats
+from ..ratings import get_tournament_ratings
+from ..scheduler import build_schedule
+from ..simulate import simulate_tournament
+from ..stats import get_dashboard, get_form_series, get_tournament_stats
+from ..writes import remove_tournament
 
 router = APIRouter(prefix="/tournaments", tags=["tournaments"])
 
@@ -41,12 +53,16 @@ def delete_tournament(tournament_id: int, session: Session = Depends(get_session
     tournament = session.get(Tournament, tournament_id)
     if not tournament:
         raise HTTPException(404, "Tournament not found")
-    session.delete(tournament)
+    remove_tournament(session, tournament)
     session.commit()
+    if SHARDED:
+        drop_shard(tournament_id)
 
 
 @router.get("/{tournament_id}/stats", response_model=TournamentStats)
-def tournament_stats(tournament_id: int, session: Session = Depends(get_session)):
+def tournament_stats(
+    tournament_id: int, session: Session = Depends(get_tournament_session)
+):
     tournament = session.get(Tournament, tournament_id)
     if not tournament:
         raise HTTPException(404, "Tournament not found")
@@ -54,8 +70,97 @@ def tournament_stats(tournament_id: int, session: Session = Depends(get_session)
 
 
 @router.get("/{tournament_id}/dashboard", response_model=DashboardStats)
-def tournament_dashboard(tournament_id: int, session: Session = Depends(get_session)):
+def tournament_dashboard(
+    tournament_id: int, session: Session = Depends(get_tournament_session)
+):
     tournament = session.get(Tournament, tournament_id)
     if not tournament:
         raise HTTPException(404, "Tournament not found")
     return get_dashboard(session, tournament.id, tournament.name)
+
+
+@router.get("/{tournament_id}/form", response_model=FormSeries)
+def tournament_form(
+    tournament_id: int,
+    window: int = Query(default=4, ge=1),
+    session: Session = Depends(get_tournament_session),
+):
+    if not session.get(Tournament, tournament_id):
+        raise HTTPException(404, "Tournament not found")
+    return get_form_series(session, tournament_id, window)
+
+
+@router.get("/{tournament_id}/head-to-head", response_model=HeadToHead)
+def tournament_head_to_head(
+    tournament_id: int, session: Session = Depends(get_tournament_session)
+):
+    """Teams x teams wins, cup differential and accuracy against (see headtohead.py)."""
+    if not session.get(Tournament, tournament_id):
+        raise HTTPException(404, "Tournament not found")
+    return get_head_to_head(session, tournament_id)
+
+
+@router.get("/{tournament_id}/simulation", response_model=TournamentSimulation)
+def tournament_simulation(
+    tournament_id: int,
+    advance: int = Query(default=2, ge=1),
+    tolerance: float = Query(default=0.5, gt=0),
+    time_limit: float = Query(default=2.0, gt=0, le=30),
+    max_simulations: int = Query(default=200_000, ge=1, le=5_000_000),
+    session: Session = Depends(get_tournament_session),
+):
+    """Monte Carlo odds of winning the group and the tournament (see simulate.py).
+
+    Runs until every team's odds have a standard error under `tolerance`
+    percentage points, `max_simulations` is reached or `time_limit` seconds
+    pass. Results carry over between calls until the tournament changes.
+    """
+    if not session.get(Tournament, tournament_id):
+        raise HTTPException(404, "Tournament not found")
+    return simulate_tournament(
+        session, tournament_id, advance, tolerance, time_limit, max_simulations
+    )
+
+
+@router.get("/{tournament_id}/schedule", response_model=TournamentSchedule)
+def tournament_schedule(
+    tournament_id: int,
+    tables: int = Query(ge=1, le=64),
+    game_minutes: float | None = Query(default=None, gt=0),
+    rest_minutes: float = Query(default=0, ge=0),
+    session: Session = Depends(get_tournament_session),
+):
+    """Queue of upcoming games per table (see scheduler.py).
+
+    Recomputed from the tournament's current state on every call. Game
+    length is the median of completed games unless `game_minutes` is given.
+    """
+    if not session.get(Tournament, tournament_id):
+        raise HTTPException(404, "Tournament not found")
+    return build_schedule(session, tournament_id, tables, game_minutes, rest_minutes)
+
+
+@router.get("/{tournament_id}/ratings", response_model=TournamentRatings)
+def tournament_ratings(
+    tournament_id: int, session: Session = Depends(get_tournament_session)
+):
+    """Teams ranked by the mean rating of their players, e.g. for seeding."""
+    if not session.get(Tournament, tournament_id):
+        raise HTTPException(404, "Tournament not found")
+    return get_tournament_ratings(session, tournament_id)
+
+
+@router.get("/{tournament_id}/cache/check", response_model=CacheCheck)
+def tournament_cache_check(
+    tournament_id: int, session: Session = Depends(get_tournament_session)
+):
+    """Diff the in-memory columnar cache against SQLite."""
+    if not session.get(Tournament, tournament_id):
+        raise HTTPException(404, "Tournament not found")
+    mismatches = check_consistency(session, tournament_id) if COLUMNAR_CACHE else []
+    return CacheCheck(
+        tournament_id=tournament_id,
+        enabled=COLUMNAR_CACHE,
+        consistent=not mismatches,
+        mismatches=mismatches,
+    )
@@ -0,0 +1,319 @@
+"""Table scheduler: the queue of games each table should play next.
+
+Round-robin games are created up front in nested-loop order, and picking
+the next one by hand leaves tables idle while a team that is still playing
+holds up its next match. `build_schedule` plans every not-started game of
+a tournament onto its tables, starting from the current state:
+
+- Every game is expected to take the same time. That is the median time
+  from started_at to the last shot of completed games. The median comes
+  from this tournament, or else from recent games across all tournaments,
+  or else it is DEFAULT_GAME_MINUTES.
+- Each game in progress holds a table until started_at plus that time, or
+  until now if it is running over.
+- Whenever a table frees up it takes the best game whose teams are both
+  free, so no team is ever due on two tables. "Best" means the teams with
+  the most games left, because they bound when the tournament can finish.
+  Ties go to the teams that have waited longest since they last played,
+  then to the lowest game id.
+- A table with no playable game waits for the next team to come free.
+
+The plan is recomputed on every request, so it re-optimizes as games
+start, finish or run over. The response also gives a lower bound on the
+finish time, to show how far the plan is from the best possible one.
+"""
+
+import heapq
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime, timezone
+from math import inf
+from statistics import median
+
+from sqlalchemy import text
+from sqlmodel import Session, select
+
+from .database import all_tournament_sessions
+from .models import (
+    DurationSource,
+    Game,
+    GameStatus,
+    ScheduledGame,
+    TableQueue,
+    Team,
+    TournamentSchedule,
+)
+
+DEFAULT_GAME_MINUTES = 15.0
+MIN_SAMPLES = 3  # completed games needed before trusting a median
+HISTORY_GAMES = 500  # most recent completed games per database to sample
+HISTORY_TTL = 600.0  # seconds the cross-tournament median is reused
+
+_DURATIONS_SQL = """
+    SELECT g.started_at, MAX(s.timestamp) AS ended_at
+    FROM game g
+    JOIN shot s ON s.game_id = g.id
+    WHERE g.status = 'COMPLETED'
+        AND g.started_at IS NOT NULL
+        AND {where}
+    GROUP BY g.id
+    ORDER BY g.started_at DESC
+    LIMIT :limit
+"""
+
+_LAST_PLAYED_SQL = """
+    SELECT s.team_id, MAX(s.timestamp) AS last_shot
+    FROM shot s
+    JOIN game g ON s.game_id = g.id
+    WHERE g.tournament_id = :tid
+    GROUP BY s.team_id
+"""
+
+
+def _seconds(ts: datetime | str) -> float:
+    if isinstance(ts, str):  # raw SQL returns SQLite's text format
+        ts = datetime.fromisoformat(ts)
+    if ts.tzinfo is None:
+        ts = ts.replace(tzinfo=timezone.utc)
+    return ts.timestamp()
+
+
+def _datetime(seconds: float) -> datetime:
+    return datetime.fromtimestamp(seconds, timezone.utc)
+
+
+# ---------------------------------------------------------------------------
+# Expected game duration
+# ---------------------------------------------------------------------------
+
+
+def _durations(session: Session, where: str, params: dict) -> list[float]:
+    rows = session.execute(
+        text(_DURATIONS_SQL.format(where=where)), {**params, "limit": HISTORY_GAMES}
+    ).all()
+    durations = (_seconds(r.ended_at) - _seconds(r.started_at) for r in rows)
+    return [d for d in durations if d > 0]
+
+
+_history_lock = threading.Lock()
+_history: tuple[float, float | None] = (0.0, None)  # (expires, seconds)
+
+
+def _history_seconds() -> float | None:
+    global _history
+    with _history_lock:
+        expires, seconds = _history
+        if time.monotonic() < expires:
+            return seconds
+        samples = []
+        with all_tournament_sessions() as sessions:
+            for session in sessions:
+                samples += _durations(session, "1 = 1", {})
+        seconds = median(samples) if len(samples) >= MIN_SAMPLES else None
+        _history = (time.monotonic() + HISTORY_TTL, seconds)
+        return seconds
+
+
+def game_seconds(session: Session, tournament_id: int) -> tuple[float, DurationSource]:
+    samples = _durations(session, "g.tournament_id = :tid", {"tid": tournament_id})
+    if len(samples) >= MIN_SAMPLES:
+        return median(samples), DurationSource.TOURNAMENT
+    seconds = _history_seconds()
+    if seconds is not None:
+        return seconds, DurationSource.HISTORY
+    return DEFAULT_GAME_MINUTES * 60, DurationSource.DEFAULT
+
+
+# ---------------------------------------------------------------------------
+# Planning
+# ---------------------------------------------------------------------------
+
+
+def _sides(a: int, b: int) -> tuple[tuple[int, int], ...]:
+    """(team, opponent) for each distinct team of a game."""
+    return ((a, b),) if a == b else ((a, b), (b, a))
+
+
+def plan(
+    pending: list[tuple[int, int, int]],
+    table_free: list[float],
+    team_free: dict[int, float],
+    rested_since: dict[int, float],
+    duration: float,
+    rest: float = 0.0,
+) -> list[tuple[int, int, float]]:
+    """Greedy list schedule of `pending` (game, team1, team2) games.
+
+    `table_free` and `team_free` give when each table and busy team comes
+    free; `rested_since` when each team last played. Returns (table index,
+    game, start) in start order. A game of a team against itself (the
+    backend doesn't forbid one) just occupies that team.
+    """
+    left = defaultdict(int)
+    games_of = defaultdict(dict)  # team -> {game: opponent}, for games left
+    for game_id, a, b in pending:
+        for team, opponent in _sides(a, b):
+            left[team] += 1
+            games_of[team][game_id] = opponent
+    # Sort keys are cached and only redone for the two teams of each pick
+    keys = {team: (-left[team], rested_since.get(team, -inf), team) for team in left}
+    busy = [(team_free.get(team, -inf), team) for team in left]
+    heapq.heapify(busy)
+    idle = set()
+    # Idle teams by key. A team's key can't change while it is idle, so
+    # entries only go stale when the team plays; those are skipped on pop.
+    ready = []
+    tables = [(t, i) for i, t in enumerate(table_free)]
+    heapq.heapify(tables)
+    schedule = []
+    while len(schedule) < len(pending):
+        t, table = heapq.heappop(tables)
+        # Tables come free in time order, so teams can be released as we go
+        while busy and busy[0][0] <= t:
+            team = heapq.heappop(busy)[1]
+            idle.add(team)
+            heapq.heappush(ready, (keys[team], team))
+        pick, skipped = None, []
+        while ready:
+            key, a = heapq.heappop(ready)
+            if a not in idle or key != keys[a]:
+                continue
+            playable = [
+                (keys[b], game_id, b) for game_id, b in games_of[a].items() if b in idle
+            ]
+            if playable:
+                _, game_id, b = min(playable)
+                pick = (game_id, a, b)
+                break
+            skipped.append((key, a))
+        for entry in skipped:
+            heapq.heappush(ready, entry)
+        if pick is None:
+            # Every remaining game waits on a busy team: idle until one is free
+            heapq.heappush(tables, (busy[0][0], table))
+            continue
+        game_id, a, b = pick
+        for team, _ in _sides(a, b):
+            del games_of[team][game_id]
+            left[team] -= 1
+            rested_since[team] = t + duration
+            keys[team] = (-left[team], t + duration, team)
+            idle.discard(team)
+            if left[team]:
+                heapq.heappush(busy, (t + duration + rest, team))
+        schedule.append((table, game_id, t))
+        heapq.heappush(tables, (t + duration, table))
+    return schedule
+
+
+def lower_bound(
+    pending: list[tuple[int, int, int]],
+    table_free: list[float],
+    team_free: dict[int, float],
+    now: float,
+    duration: float,
+    rest: float = 0.0,
+) -> float:
+    """Earliest possible finish: the busiest team, or the tables' capacity."""
+    left = defaultdict(int)
+    for _, a, b in pending:
+        for team, _ in _sides(a, b):
+            left[team] += 1
+    bound = max(
+        (
+            max(team_free.get(team, now), now) + n * duration + (n - 1) * rest
+            for team, n in left.items()
+        ),
+        default=now,
+    )
+    tables = list(table_free)
+    heapq.heapify(tables)
+    for _ in pending:
+        heapq.heappush(tables, heapq.heappop(tables) + duration)
+    return max(bound, *tables)
+
+
+def build_schedule(
+    session: Session,
+    tournament_id: int,
+    tables: int,
+    game_minutes: float | None = None,
+    rest_minutes: float = 0.0,
+) -> TournamentSchedule:
+    started = time.perf_counter()
+    now = time.time()
+    if game_minutes is not None:
+        duration, source = game_minutes * 60, DurationSource.QUERY
+    else:
+        duration, source = game_seconds(session, tournament_id)
+    rest = rest_minutes * 60
+
+    teams = {
+        t.id: t.name
+        for t in session.exec(select(Team).where(Team.tournament_id == tournament_id))
+    }
+    games = session.exec(
+        select(Game)
+        .where(Game.tournament_id == tournament_id)
+        .order_by(Game.started_at, Game.id)
+    ).all()
+    running = [g for g in games if g.status == GameStatus.IN_PROGRESS]
+    pending = [
+        (g.id, g.team1_id, g.team2_id)
+        for g in games
+        if g.status == GameStatus.NOT_STARTED
+    ]
+    by_id = {g.id: g for g in games}
+    rested_since = {
+        r.team_id: _seconds(r.last_shot)
+        for r in session.execute(text(_LAST_PLAYED_SQL), {"tid": tournament_id})
+    }
+
+    # Games in progress are being played somewhere, so there are at least as
+    # many tables as there are of them.
+    queues: list[list[ScheduledGame]] = [[] for _ in range(max(tables, len(running)))]
+    table_free = [now] * len(queues)
+    team_free: dict[int, float] = {}
+    for table, game in enumerate(running):
+        start = _seconds(game.started_at) if game.started_at else now
+        end = max(start + duration, now)
+        table_free[table] = end
+        team_free[game.team1_id] = team_free[game.team2_id] = end + rest
+        rested_since[game.team1_id] = rested_since[game.team2_id] = end
+        queues[table].append(_scheduled(game, teams, start, end))
+
+    bound = lower_bound(pending, table_free, team_free, now, duration, rest)
+    for table, game_id, start in plan(
+        pending, table_free, dict(team_free), rested_since, duration, rest
+    ):
+        queues[table].append(_scheduled(by_id[game_id], teams, start, start + duration))
+
+    ends = [q[-1].expected_end for q in queues if q]
+    finish = max(ends) if ends else None
+    hours = (finish.timestamp() - now) / 3600 if finish else 0.0
+    return TournamentSchedule(
+        tournament_id=tournament_id,
+        game_minutes=round(duration / 60, 1),
+        duration_source=source,
+        tables=[TableQueue(table=i + 1, games=q) for i, q in enumerate(queues)],
+        expected_finish=finish,
+        lower_bound_finish=_datetime(bound) if finish else None,
+        games_per_hour=round(len(pending) / hours, 2) if hours > 0 else 0.0,
+        elapsed_ms=round((time.perf_counter() - started) * 1000, 2),
+    )
+
+
+def _scheduled(
+    game: Game, teams: dict[int, str], start: float, end: float
+) -> ScheduledGame:
+    return ScheduledGame(
+        game_id=game.id,
+        team1_id=game.team1_id,
+        team1_name=teams.get(game.team1_id, ""),
+        team2_id=game.team2_id,
+        team2_name=teams.get(game.team2_id, ""),
+        status=game.status,
+        expected_start=_datetime(start),
+        expected_end=_datetime(end),
+    )
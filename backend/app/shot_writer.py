@@ -0,0 +1,207 @@
+"""Optional group-commit write path for shots.
+
+Enable with ``SUPER_PONG_GROUP_COMMIT=1``. ``POST /games/{id}/shots`` then
+hands the shot to a single writer thread instead of committing on its own.
+The writer drains the queue into batches, closing a batch when
+``GROUP_COMMIT_MAX_BATCH`` shots are waiting or ``GROUP_COMMIT_MAX_DELAY_MS``
+after its first shot arrived. Each batch is one transaction per tournament,
+so it pays for one fsync instead of one per shot. A request returns only
+after its batch has committed, or with 503 if the writer does not answer
+within ``GROUP_COMMIT_TIMEOUT_S``.
+"""
+
+import logging
+import os
+import queue
+import statistics
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+
+from fastapi import HTTPException
+
+from .database import tournament_session
+from .models import Game, ShotCreate, ShotPublic, ShotWriterStats
+from .writes import add_shot
+
+GROUP_COMMIT = os.environ.get("SUPER_PONG_GROUP_COMMIT") == "1"
+GROUP_COMMIT_MAX_BATCH = int(os.environ.get("SUPER_PONG_GROUP_COMMIT_MAX_BATCH", "64"))
+GROUP_COMMIT_MAX_DELAY_MS = float(
+    os.environ.get("SUPER_PONG_GROUP_COMMIT_MAX_DELAY_MS", "5")
+)
+GROUP_COMMIT_TIMEOUT_S = float(
+    os.environ.get("SUPER_PONG_GROUP_COMMIT_TIMEOUT_S", "10")
+)
+STATS_WINDOW = 1000  # batches kept for the stats endpoint
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class _PendingShot:
+    tournament_id: int
+    game_id: int
+    body: ShotCreate
+    future: Future = field(default_factory=Future)
+    enqueued_at: float = field(default_factory=time.perf_counter)
+
+
+@dataclass
+class _BatchRecord:
+    size: int
+    commit_ms: float
+    ack_ms: list[float]
+
+
+class ShotWriter:
+    def __init__(self, max_batch: int, max_delay_ms: float):
+        self.max_batch = max_batch
+        self.max_delay = max_delay_ms / 1000
+        self._queue: queue.Queue[_PendingShot | None] = queue.Queue()
+        self._thread: threading.Thread | None = None
+        self._history: deque[_BatchRecord] = deque(maxlen=STATS_WINDOW)
+        self._totals = {"batches": 0, "shots": 0}
+        self._stats_lock = threading.Lock()
+
+    def start(self) -> None:
+        self._thread = threading.Thread(
+            target=self._run, name="shot-writer", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Commit everything already queued, then stop the writer thread."""
+        if self._thread is None:
+            return
+        self._queue.put(None)
+        self._thread.join()
+        self._thread = None
+
+    def submit(self, tournament_id: int, game_id: int, body: ShotCreate) -> ShotPublic:
+        """Queue a shot and block until the batch holding it is durable."""
+        pending = _PendingShot(tournament_id, game_id, body)
+        self._queue.put(pending)
+        try:
+            return pending.future.result(timeout=GROUP_COMMIT_TIMEOUT_S)
+        except TimeoutError:
+            raise HTTPException(
+                503, "Shot writer did not respond; the shot may still be recorded"
+            ) from None
+
+    # --- Writer thread -----------------------------------------------------
+
+    def _collect(self) -> tuple[list[_PendingShot], bool]:
+        """Block for one shot, then gather more until the batch closes."""
+        first = self._queue.get()
+        if first is None:
+            return [], True
+        batch = [first]
+        deadline = time.perf_counter() + self.max_delay
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.perf_counter()
+            try:
+                item = (
+                    self._queue.get(timeout=remaining)
+                    if remaining > 0
+                    else self._queue.get_nowait()
+                )
+            except queue.Empty:
+                break
+            if item is None:
+                return batch, True
+            batch.append(item)
+        return batch, False
+
+    def _commit(self, batch: list[_PendingShot]) -> None:
+        by_tournament: dict[int, list[_PendingShot]] = {}
+        for pending in batch:
+            by_tournament.setdefault(pending.tournament_id, []).append(pending)
+
+        start = time.perf_counter()
+        for tournament_id, items in by_tournament.items():
+            results = []
+            committed = False
+            try:
+                with tournament_session(tournament_id) as session:
+                    for pending in items:
+                        game = session.get(Game, pending.game_id)
+                        if not game:
+                            results.append(HTTPException(404, "Game not found"))
+                            continue
+                        shot = add_shot(session, game, pending.body)
+                        results.append(ShotPublic.model_validate(shot))
+                    session.commit()
+                    committed = True
+            except Exception as exc:
+                if committed:
+                    # The shots are durable; only closing the session failed
+                    logger.exception("Shot batch committed, then failed")
+                else:  # the whole transaction failed
+                    results = [exc] * len(items)
+            for pending, result in zip(items, results):
+                if isinstance(result, Exception):
+                    pending.future.set_exception(result)
+                else:
+                    pending.future.set_result(result)
+        done = time.perf_counter()
+
+        with self._stats_lock:
+            self._totals["batches"] += 1
+            self._totals["shots"] += len(batch)
+            self._history.append(
+                _BatchRecord(
+                    size=len(batch),
+                    commit_ms=(done - start) * 1000,
+                    ack_ms=[(done - p.enqueued_at) * 1000 for p in batch],
+                )
+            )
+
+    def _run(self) -> None:
+        stopping = False
+        while not stopping:
+            batch, stopping = self._collect()
+            if not batch:
+                continue
+            try:
+                self._commit(batch)
+            except Exception as exc:
+                # Keep the writer alive: every request would otherwise hang
+                logger.exception("Shot writer failed on a batch")
+                for pending in batch:
+                    if not pending.future.done():
+                        pending.future.set_exception(exc)
+
+    # --- Stats -------------------------------------------------------------
+
+    def stats(self) -> ShotWriterStats:
+        with self._stats_lock:
+            history = list(self._history)
+            totals = dict(self._totals)
+        sizes = [b.size for b in history]
+        commits = sorted(b.commit_ms for b in history)
+        acks = sorted(ms for b in history for ms in b.ack_ms)
+
+        def pct(values: list[float], p: float) -> float:
+            if not values:
+                return 0.0
+            return round(values[min(len(values) - 1, int(len(values) * p))], 2)
+
+        return ShotWriterStats(
+            enabled=GROUP_COMMIT,
+            max_batch=self.max_batch,
+            max_delay_ms=self.max_delay * 1000,
+            queued=self._queue.qsize(),
+            batches=totals["batches"],
+            shots=totals["shots"],
+            mean_batch_size=round(statistics.fmean(sizes), 2) if sizes else 0.0,
+            max_batch_size=max(sizes, default=0),
+            p50_commit_ms=pct(commits, 0.5),
+            p95_commit_ms=pct(commits, 0.95),
+            p50_ack_ms=pct(acks, 0.5),
+            p95_ack_ms=pct(acks, 0.95),
+        )
+
+
+writer = ShotWriter(GROUP_COMMIT_MAX_BATCH, GROUP_COMMIT_MAX_DELAY_MS)
@@ -0,0 +1,656 @@
+"""Monte Carlo tournament outcomes: each team's chance to win its group and the tournament.
+
+Players are modelled from their shots in the tournament, with the inputs
+EV.md uses: how often they throw each shot type, their hit rate per type,
+how many cups their bounce hits take, and where their hits land (for 2B1C).
+Small samples are shrunk towards the tournament average.
+
+A group's round robin is the first game between each pair of its teams;
+every other game is a knockout game. The unplayed group games are simulated
+(in-progress ones from their current cup counts), the top ``advance`` teams
+of every group go into a seeded single-elimination bracket, and knockout
+games already on record decide or resume their pairing. Every game in a
+batch is played at once as NumPy arrays, and batches are spread over a
+process pool. Results are cached per tournament write generation
+(generations.py): a request at the same generation adds simulations to the
+cached counts until they converge.
+"""
+
+import math
+import multiprocessing
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from dataclasses import dataclass, field
+
+import numpy as np
+from sqlalchemy import text
+from sqlmodel import Session
+
+from . import generations
+from .models import SimulatedTeam, TournamentSimulation
+
+# 0 runs batches in the request thread instead of a process pool
+SIM_WORKERS = int(os.environ.get("SUPER_PONG_SIM_WORKERS", min(4, os.cpu_count() or 1)))
+BATCH_SIZE = 2000  # most simulated tournaments per pool task
+MIN_BATCH_SIZE = 100
+# Batches are sized from the measured time per simulation so that one takes
+# about this share of the request's time_limit
+BATCH_TIME_SHARE = 0.25
+MIN_SIMULATIONS = 4000  # before convergence is judged
+MAX_CACHED_TOURNAMENTS = 8
+# A game still going after this many turns goes to the team closer to winning
+MAX_TURNS = 200
+
+PRIOR_SHOTS = 10  # pseudo-shots at the tournament average added to every player
+SHOT_TYPES = ("NORMAL", "BOUNCE", "TRICKSHOT")
+BOUNCE_CUPS = np.array([2, 3, 4])  # cups a 1, 2 or 3+ bounce hit removes
+# Used before anyone in the tournament has thrown
+DEFAULT_MIX = (0.8, 0.15, 0.05)
+DEFAULT_HIT_RATES = (0.3, 0.2, 0.1)
+DEFAULT_BOUNCE_SPLIT = (0.8, 0.15, 0.05)
+DEFAULT_CUPS = 6
+
+OUTCOMES = ("win_group", "advance", "reach_final", "win_tournament")
+
+
+@dataclass
+class TournamentModel:
+    """Everything a pool worker needs to simulate one tournament. Picklable."""
+
+    team_ids: list[int]
+    team_names: list[str]
+    team_groups: list[str | None]
+    groups: np.ndarray  # (T,) group index per team
+    team_players: np.ndarray  # (T, 2) player index per team
+    mix_cdf: np.ndarray  # (P, 3) cumulative shot-type mix
+    hit_rates: np.ndarray  # (P, 3) per shot type
+    bounce_cdf: np.ndarray  # (P, 3) cumulative split of bounce hits over BOUNCE_CUPS
+    overlap: np.ndarray  # (T,) chance both hits land in the same cup (2B1C)
+    base_wins: np.ndarray  # (T,) completed group games won
+    # Unplayed group games: teams and the cups each still has to sink
+    home: np.ndarray
+    away: np.ndarray
+    home_needs: np.ndarray
+    away_needs: np.ndarray
+    # Knockout games on record, keyed by the pair's code (see _pair_code)
+    knockouts: dict[int, tuple]
+    advance: int
+    starting_cups: int
+
+
+@dataclass
+class _Run:
+    generation: int
+    advance: int
+    model: TournamentModel
+    counts: dict[str, np.ndarray]
+    simulations: int = 0
+    seeds: np.random.SeedSequence = field(default_factory=np.random.SeedSequence)
+    lock: threading.Lock = field(default_factory=threading.Lock)
+    # Measured seconds per simulated tournament, None until a batch returns
+    sim_seconds: float | None = None
+    # Pool batches not merged yet -> their size; merged by the next call
+    in_flight: dict[Future, int] = field(default_factory=dict)
+    stale: bool = False  # replaced or evicted: stop adding batches
+
+
+# ---------------------------------------------------------------------------
+# Building the model from the database
+# ---------------------------------------------------------------------------
+
+
+def _shrink(counts: np.ndarray, prior: np.ndarray) -> np.ndarray:
+    """Row-normalised counts with PRIOR_SHOTS pseudo-counts spread as `prior`."""
+    smoothed = counts + PRIOR_SHOTS * prior
+    return smoothed / smoothed.sum(axis=-1, keepdims=True)
+
+
+def _player_profiles(session: Session, tid: int, player_ids: list[int]) -> dict:
+    """Shot-type mix, hit rates, bounce yields and 2B1C cup spread per player."""
+    index = {pid: i for i, pid in enumerate(player_ids)}
+    attempts = np.zeros((len(player_ids), 3))
+    hits = np.zeros((len(player_ids), 3))
+    bounce_hits = np.zeros((len(player_ids), 3))
+    rows = session.execute(
+        text("""
+            SELECT
+                s.player_id,
+                s.shot_type,
+                COUNT(*) AS attempts,
+                SUM(CASE WHEN s.outcome = 'HIT' THEN 1 ELSE 0 END) AS hits,
+                SUM(CASE WHEN s.outcome = 'HIT' AND COALESCE(s.bounces, 1) <= 1
+                    THEN 1 ELSE 0 END) AS hits_1,
+                SUM(CASE WHEN s.outcome = 'HIT' AND s.bounces = 2
+                    THEN 1 ELSE 0 END) AS hits_2,
+                SUM(CASE WHEN s.outcome = 'HIT' AND s.bounces >= 3
+                    THEN 1 ELSE 0 END) AS hits_3
+            FROM shot s
+            JOIN game g ON s.game_id = g.id
+            WHERE g.tournament_id = :tid
+                AND s.shot_type != 'RERACK'
+            GROUP BY s.player_id, s.shot_type
+        """),
+        {"tid": tid},
+    ).all()
+    for r in rows:
+        if r.player_id not in index:
+            continue  # a substitute who isn't on a team any more
+        i, kind = index[r.player_id], SHOT_TYPES.index(r.shot_type)
+        attempts[i, kind] = r.attempts
+        hits[i, kind] = r.hits
+        if r.shot_type == "BOUNCE":
+            bounce_hits[i] = (r.hits_1, r.hits_2, r.hits_3)
+
+    total_attempts = attempts.sum(axis=0)
+    if total_attempts.sum() > 0:
+        base_mix = _shrink(total_attempts, np.array(DEFAULT_MIX))
+    else:
+        base_mix = np.array(DEFAULT_MIX)
+    base_rates = (hits.sum(axis=0) + PRIOR_SHOTS * np.array(DEFAULT_HIT_RATES)) / (
+        total_attempts + PRIOR_SHOTS
+    )
+    base_bounce = _shrink(bounce_hits.sum(axis=0), np.array(DEFAULT_BOUNCE_SPLIT))
+
+    cups = session.execute(
+        text("""
+            SELECT s.player_id, s.cup_position, COUNT(*) AS hits
+            FROM shot s
+            JOIN game g ON s.game_id = g.id
+            WHERE g.tournament_id = :tid
+                AND s.outcome = 'HIT'
+                AND s.cup_position IS NOT NULL
+            GROUP BY s.player_id, s.cup_position
+        """),
+        {"tid": tid},
+    ).all()
+    positions = sorted({r.cup_position for r in cups}) or list(range(DEFAULT_CUPS))
+    cup_hits = np.zeros((len(player_ids), len(positions)))
+    for r in cups:
+        if r.player_id in index:
+            cup_hits[index[r.player_id], positions.index(r.cup_position)] = r.hits
+    base_cups = _shrink(
+        cup_hits.sum(axis=0), np.full(len(positions), 1 / len(positions))
+    )
+
+    return {
+        "mix_cdf": np.cumsum(_shrink(attempts, base_mix), axis=1),
+        "hit_rates": (hits + PRIOR_SHOTS * base_rates) / (attempts + PRIOR_SHOTS),
+        "bounce_cdf": np.cumsum(_shrink(bounce_hits, base_bounce), axis=1),
+        "cup_spread": _shrink(cup_hits, base_cups),
+    }
+
+
+def _cups_sunk(session: Session, tid: int) -> dict[tuple[int, int], int]:
+    """(game, team) -> cups that team has hit so far, for games in progress."""
+    rows = session.execute(
+        text("""
+            SELECT
+                s.game_id,
+                s.team_id,
+                -- Counted like the stats queries: a bounce hit with no bounce
+                -- count removes nothing. Capped at BOUNCE_CUPS, as in _throw.
+                COALESCE(SUM(CASE WHEN s.shot_type = 'BOUNCE'
+                    THEN MIN(s.bounces, :max_bounces) + 1 ELSE 1 END), 0) AS cups
+            FROM shot s
+            JOIN game g ON s.game_id = g.id
+            WHERE g.tournament_id = :tid
+                AND g.status = 'IN_PROGRESS'
+                AND s.outcome = 'HIT'
+                AND s.shot_type != 'RERACK'
+            GROUP BY s.game_id, s.team_id
+        """),
+        {"tid": tid, "max_bounces": len(BOUNCE_CUPS)},
+    ).all()
+    return {(r.game_id, r.team_id): r.cups for r in rows}
+
+
+def _pair_code(a, b, n_teams):
+    return np.minimum(a, b) * n_teams + np.maximum(a, b)
+
+
+def load_model(session: Session, tid: int, advance: int) -> TournamentModel | None:
+    teams = session.execute(
+        text("""
+            SELECT id, name, "group" AS "group", player1_id, player2_id
+            FROM team
+            WHERE tournament_id = :tid
+            ORDER BY id
+        """),
+        {"tid": tid},
+    ).all()
+    if not teams:
+        return None
+    team_index = {t.id: i for i, t in enumerate(teams)}
+    group_names = sorted({t.group or "" for t in teams})
+    player_ids = sorted({p for t in teams for p in (t.player1_id, t.player2_id)})
+    player_index = {pid: i for i, pid in enumerate(player_ids)}
+    team_players = np.array(
+        [[player_index[t.player1_id], player_index[t.player2_id]] for t in teams]
+    )
+    profiles = _player_profiles(session, tid, player_ids)
+    spread = profiles["cup_spread"][team_players]
+    overlap = (spread[:, 0] * spread[:, 1]).sum(axis=1)
+
+    games = session.execute(
+        text("""
+            SELECT id, team1_id, team2_id, starting_cups_per_team, status, winner_id
+            FROM game
+            WHERE tournament_id = :tid
+            ORDER BY id
+        """),
+        {"tid": tid},
+    ).all()
+    sunk = _cups_sunk(session, tid)
+    n_teams = len(teams)
+    base_wins = np.zeros(n_teams, dtype=np.int64)
+    pending, knockouts, seen_pairs = [], {}, set()
+    for g in games:
+        if g.team1_id not in team_index or g.team2_id not in team_index:
+            continue
+        home, away = team_index[g.team1_id], team_index[g.team2_id]
+        code = int(_pair_code(home, away, n_teams))
+        is_group = teams[home].group == teams[away].group and code not in seen_pairs
+        seen_pairs.add(code)
+        if g.status == "COMPLETED" and g.winner_id in team_index:
+            if is_group:
+                base_wins[team_index[g.winner_id]] += 1
+            else:
+                knockouts[code] = ("won", team_index[g.winner_id])
+            continue
+        needs = (
+            g.starting_cups_per_team - sunk.get((g.id, g.team1_id), 0),
+            g.starting_cups_per_team - sunk.get((g.id, g.team2_id), 0),
+        )
+        if is_group:
+            pending.append((home, away, *needs))
+        elif g.status == "IN_PROGRESS":
+            knockouts[code] = ("playing", home, away, *needs)
+
+    starting = [g.starting_cups_per_team for g in games]
+    pending = np.array(pending, dtype=np.int64).reshape(-1, 4)
+    return TournamentModel(
+        team_ids=[t.id for t in teams],
+        team_names=[t.name for t in teams],
+        team_groups=[t.group for t in teams],
+        groups=np.array([group_names.index(t.group or "") for t in teams]),
+        team_players=team_players,
+        mix_cdf=profiles["mix_cdf"],
+        hit_rates=profiles["hit_rates"],
+        bounce_cdf=profiles["bounce_cdf"],
+        overlap=overlap,
+        base_wins=base_wins,
+        home=pending[:, 0],
+        away=pending[:, 1],
+        home_needs=pending[:, 2],
+        away_needs=pending[:, 3],
+        knockouts=knockouts,
+        advance=advance,
+        starting_cups=max(set(starting), key=starting.count)
+        if starting
+        else DEFAULT_CUPS,
+    )
+
+
+# ---------------------------------------------------------------------------
+# Simulation (runs in the pool workers)
+# ---------------------------------------------------------------------------
+
+
+def _throw(model: TournamentModel, teams: np.ndarray, rng) -> np.ndarray:
+    """Cups removed by one turn of each team in `teams`: both players throw once."""
+    players = model.team_players[teams]
+    kinds = (
+        rng.random(players.shape)[..., None] > model.mix_cdf[players][..., :2]
+    ).sum(-1)
+    hit = rng.random(players.shape) < model.hit_rates[players, kinds]
+    bounce = BOUNCE_CUPS[
+        (rng.random(players.shape)[..., None] > model.bounce_cdf[players][..., :2]).sum(
+            -1
+        )
+    ]
+    cups = np.where(kinds == 1, bounce, 1) * hit
+    # 2 balls 1 cup: both hit the same cup for one bonus cup
+    same_cup = hit.all(axis=1) & (rng.random(len(teams)) < model.overlap[teams])
+    return cups.sum(axis=1) + same_cup
+
+
+def play(model: TournamentModel, home, away, home_needs, away_needs, rng) -> np.ndarray:
+    """Play many games at once; True where the home team won.
+
+    `*_needs` are the cups each side still has to sink. The team that throws
+    first is a coin flip.
+    """
+    teams = np.stack([home, away], axis=1)
+    needs = np.stack([home_needs, away_needs], axis=1).astype(np.int64)
+    winner = np.full(len(home), -1)
+    done = needs <= 0
+    winner[done[:, 0]] = 0
+    winner[done[:, 1] & ~done[:, 0]] = 1
+    side = rng.integers(0, 2, len(home))
+    active = np.flatnonzero(winner < 0)
+    for _ in range(MAX_TURNS):
+        if active.size == 0:
+            break
+        throwing = side[active]
+        needs[active, throwing] -= _throw(model, teams[active, throwing], rng)
+        finished = needs[active, throwing] <= 0
+        winner[active[finished]] = throwing[finished]
+        side[active] ^= 1
+        active = active[~finished]
+    if active.size:
+        left = needs[active]
+        winner[active] = np.where(
+            left[:, 0] == left[:, 1],
+            rng.integers(0, 2, active.size),
+            left[:, 0] > left[:, 1],
+        )
+    return winner == 0
+
+
+def _bracket_order(size: int) -> list[int]:
+    """Seed positions in a bracket of `size` (a power of 2) keeping top seeds apart."""
+    order = [0]
+    while len(order) < size:
+        order = [s for seed in order for s in (seed, 2 * len(order) - 1 - seed)]
+    return order
+
+
+def _knockout_round(model, a, b, rng) -> np.ndarray:
+    """Winners of a round of (a, b) pairings; -1 is a bye, recorded games count."""
+    winners = np.where(a < 0, b, a)
+    real = (a >= 0) & (b >= 0)
+    n_teams = len(model.team_ids)
+    codes = np.where(real, _pair_code(a, b, n_teams), -1)
+    to_play = real.copy()
+    for code, record in model.knockouts.items():
+        rows = np.flatnonzero(codes == code)
+        if rows.size == 0:
+            continue
+        to_play[rows] = False
+        if record[0] == "won":
+            winners[rows] = record[1]
+            continue
+        _, home, away, home_needs, away_needs = record
+        home_won = play(
+            model,
+            np.full(rows.size, home),
+            np.full(rows.size, away),
+            np.full(rows.size, home_needs),
+            np.full(rows.size, away_needs),
+            rng,
+        )
+        winners[rows] = np.where(home_won, home, away)
+    rows = np.flatnonzero(to_play)
+    if rows.size:
+        cups = np.full(rows.size, model.starting_cups)
+        home_won = play(model, a[rows], b[rows], cups, cups, rng)
+        winners[rows] = np.where(home_won, a[rows], b[rows])
+    return winners
+
+
+def timed_batch(model: TournamentModel, n: int, seed):
+    """run_batch plus how long it took, for sizing the next batches."""
+    started = time.perf_counter()
+    counts = run_batch(model, n, seed)
+    return counts, time.perf_counter() - started
+
+
+def run_batch(model: TournamentModel, n: int, seed) -> dict[str, np.ndarray]:
+    """Simulate the rest of the tournament `n` times; per-team outcome counts."""
+    rng = np.random.default_rng(seed)
+    n_teams = len(model.team_ids)
+    counts = {name: np.zeros(n_teams, dtype=np.int64) for name in OUTCOMES}
+    rows = np.arange(n)
+
+    wins = np.tile(model.base_wins, (n, 1))
+    if model.home.size:
+        games = model.home.size
+        home_won = play(
+            model,
+            np.tile(model.home, n),
+            np.tile(model.away, n),
+            np.tile(model.home_needs, n),
+            np.tile(model.away_needs, n),
+            rng,
+        ).reshape(n, games)
+        winners = np.where(home_won, model.home, model.away)
+        np.add.at(wins, (np.repeat(rows, games), winners.ravel()), 1)
+
+    # Rank each group by wins; ties are broken at random, like a playoff game would
+    score = wins + rng.random(wins.shape) * 0.5
+    ranked = []
+    for group in np.unique(model.groups):
+        members = np.flatnonzero(model.groups == group)
+        ranked.append(members[np.argsort(-score[:, members], axis=1)])
+        np.add.at(counts["win_group"], ranked[-1][:, 0], 1)
+
+    # Seeds: every group winner, then every runner-up, and so on
+    seeds = np.stack(
+        [
+            standings[:, rank]
+            for rank in range(model.advance)
+            for standings in ranked
+            if rank < standings.shape[1]
+        ],
+        axis=1,
+    )
+    np.add.at(counts["advance"], seeds.ravel(), 1)
+    size = 1 << max(0, math.ceil(math.log2(seeds.shape[1])))
+    slots = np.full((n, size), -1)
+    order = _bracket_order(size)
+    for rank in range(seeds.shape[1]):
+        slots[:, order.index(rank)] = seeds[:, rank]
+    while slots.shape[1] > 1:
+        if slots.shape[1] == 2:
+            finalists = slots[slots >= 0]
+            np.add.at(counts["reach_final"], finalists, 1)
+        a, b = slots[:, 0::2].ravel(), slots[:, 1::2].ravel()
+        slots = _knockout_round(model, a, b, rng).reshape(n, -1)
+    np.add.at(counts["win_tournament"], slots[:, 0], 1)
+    return counts
+
+
+# ---------------------------------------------------------------------------
+# Pool and cache
+# ---------------------------------------------------------------------------
+
+_pool: ProcessPoolExecutor | None = None
+_pool_lock = threading.Lock()
+_runs: OrderedDict[int, _Run] = OrderedDict()
+_runs_lock = threading.Lock()
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # spawn: forking a server with live threads and connections is unsafe
+            _pool = ProcessPoolExecutor(
+                SIM_WORKERS, mp_context=multiprocessing.get_context("spawn")
+            )
+        return _pool
+
+
+def _ready() -> None:
+    """No-op pool task: a worker has started once it has run this."""
+
+
+def warm_up() -> None:
+    """Start the pool's processes now, so the first request doesn't wait for them."""
+    if SIM_WORKERS == 0:
+        return
+    pool = _get_pool()
+    for _ in range(SIM_WORKERS):
+        pool.submit(_ready)
+
+
+def shutdown() -> None:
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
+
+
+def _max_standard_error(run: _Run) -> float:
+    """Largest standard error of any team's odds, as a probability."""
+    if run.simulations == 0:
+        return 0.5
+    p = np.concatenate(list(run.counts.values())) / run.simulations
+    return math.sqrt(float((p * (1 - p)).max()) / run.simulations)
+
+
+def _converged(run: _Run, tolerance: float) -> bool:
+    return run.simulations >= MIN_SIMULATIONS and _max_standard_error(run) <= tolerance
+
+
+def _batch_size(run: _Run, time_limit: float) -> int:
+    if run.sim_seconds is None:
+        return MIN_BATCH_SIZE
+    n = int(time_limit * BATCH_TIME_SHARE / run.sim_seconds)
+    return max(MIN_BATCH_SIZE, min(BATCH_SIZE, n))
+
+
+def _merge(run: _Run, result, n: int) -> None:
+    counts, seconds = result
+    for name in OUTCOMES:
+        run.counts[name] += counts[name]
+    run.simulations += n
+    run.sim_seconds = seconds / n
+
+
+def _cancel(run: _Run) -> None:
+    """Drop a stale run's queued batches. Ones already running finish unread."""
+    run.stale = True
+    for future in list(run.in_flight):
+        future.cancel()
+
+
+def _extend(run: _Run, tolerance: float, time_limit: float, max_simulations: int):
+    """Add batches to `run` until it converges, hits the cap or runs out of time.
+
+    Pool batches still running at the deadline stay in `run.in_flight` and
+    are merged by the next call at the same generation.
+    """
+    deadline = time.monotonic() + time_limit
+
+    def more_wanted() -> bool:
+        return (
+            not run.stale
+            and not _converged(run, tolerance)
+            and run.simulations + sum(run.in_flight.values()) < max_simulations
+            and time.monotonic() < deadline
+        )
+
+    if SIM_WORKERS == 0:
+        while more_wanted():
+            n = _batch_size(run, time_limit)
+            _merge(run, timed_batch(run.model, n, run.seeds.spawn(1)[0]), n)
+        return
+    pool = _get_pool()
+    while True:
+        for future in [f for f in run.in_flight if f.done()]:
+            n = run.in_flight.pop(future)
+            if not future.cancelled():
+                _merge(run, future.result(), n)
+        while len(run.in_flight) < SIM_WORKERS and more_wanted():
+            n = _batch_size(run, time_limit)
+            future = pool.submit(timed_batch, run.model, n, run.seeds.spawn(1)[0])
+            run.in_flight[future] = n
+        if not run.in_flight or not more_wanted():
+            return
+        done, _ = wait(
+            run.in_flight,
+            timeout=max(0.0, deadline - time.monotonic()),
+            return_when=FIRST_COMPLETED,
+        )
+        if not done:
+            return
+
+
+def simulate_tournament(
+    session: Session,
+    tournament_id: int,
+    advance: int,
+    tolerance: float,
+    time_limit: float,
+    max_simulations: int,
+) -> TournamentSimulation:
+    """Outcome odds for every team, refined by each call at the same generation.
+
+    Odds are percentages. `tolerance` is the largest standard error, in
+    percentage points, accepted for any of them.
+    """
+    started = time.monotonic()
+    generation = generations.current(tournament_id)
+    with _runs_lock:
+        run = _runs.get(tournament_id)
+        if run is None or (run.generation, run.advance) != (generation, advance):
+            stale, run = run, None
+            if stale is not None:
+                _cancel(_runs.pop(tournament_id))
+            model = load_model(session, tournament_id, advance)
+            if model is not None:
+                run = _Run(
+                    generation,
+                    advance,
+                    model,
+                    {
+                        name: np.zeros(len(model.team_ids), np.int64)
+                        for name in OUTCOMES
+                    },
+                    # The same tournament simulates at about the same speed
+                    sim_seconds=stale.sim_seconds if stale else None,
+                )
+                _runs[tournament_id] = run
+                if len(_runs) > MAX_CACHED_TOURNAMENTS:
+                    _cancel(_runs.popitem(last=False)[1])
+        if run is not None:
+            _runs.move_to_end(tournament_id)
+    if run is None:
+        return TournamentSimulation(
+            tournament_id=tournament_id,
+            generation=generation,
+            simulations=0,
+            ready=True,
+            converged=True,
+            max_standard_error=0.0,
+            elapsed_ms=0.0,
+            teams=[],
+        )
+
+    with run.lock:
+        _extend(run, tolerance / 100, time_limit, max_simulations)
+        ready = run.simulations > 0
+        model = run.model
+        teams = [
+            SimulatedTeam(
+                team_id=team_id,
+                team_name=model.team_names[i],
+                group=model.team_groups[i],
+                **{
+                    # No batch back yet (e.g. the pool is still starting): zeros
+                    # would read as real odds, so leave them null
+                    name: round(float(run.counts[name][i]) * 100 / run.simulations, 1)
+                    if ready
+                    else None
+                    for name in OUTCOMES
+                },
+            )
+            for i, team_id in enumerate(model.team_ids)
+        ]
+        if ready:
+            teams.sort(key=lambda t: (-t.win_tournament, -t.win_group, t.team_name))
+        return TournamentSimulation(
+            tournament_id=tournament_id,
+            generation=generation,
+            simulations=run.simulations,
+            ready=ready,
+            converged=_converged(run, tolerance / 100),
+            max_standard_error=round(_max_standard_error(run) * 100, 2),
+            elapsed_ms=round((time.monotonic() - started) * 1000, 1),
+            teams=teams,
+        )
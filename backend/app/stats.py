@@ -1,15 +1,34 @@
+from datetime import datetime, timezone
+
 from sqlalchemy import text
-from sqlmodel import Session
+from sqlmodel import Session, select
 
+from .boxscores import compute_game
+from .buckets import BUCKET_SECONDS
+from .columnar import COLUMNAR_CACHE, get_store
 from .models import (
+    AllTimeEntry,
+    BoxScore,
+    BoxScoreLine,
+    BoxScoreTeam,
     CupHeatmapEntry,
     DashboardStats,
+    FormSeries,
+    Game,
+    GameBoxScore,
+    GameBucketPoint,
+    GameStatus,
     HotHandEntry,
+    LeaderboardSort,
     PlayerEntry,
+    PlayerForm,
     PlayerStats,
     PunishmentCount,
     RecentPunishment,
+    Team,
     TeamStanding,
+    TimeBucketPoint,
+    TournamentBreakdown,
     TournamentStats,
 )
 
@@ -36,33 +55,63 @@ def _game_counts(session: Session, tid: int) -> tuple[int, int, int]:
 
 
 def _player_leaderboard(session: Session, tid: int) -> list[PlayerEntry]:
+    """Per-player totals: completed games summed from their box scores, games
+    still being played aggregated from their shots."""
     rows = session.execute(
         text("""
+            WITH lines AS (
+                SELECT
+                    b.player_id, b.total_shots, b.hits, b.misses, b.rims,
+                    b.elbow_violations, b.bounce_shots, b.bounce_total,
+                    b.normal_hits, b.normal_total, b.bounce_hits,
+                    b.trickshot_hits, b.trickshot_total, b.bounce_cups_removed
+                FROM boxscore b
+                WHERE b.tournament_id = :tid
+                UNION ALL
+                SELECT
+                    s.player_id,
+                    1,
+                    CASE WHEN s.outcome = 'HIT' THEN 1 ELSE 0 END,
+                    CASE WHEN s.outcome = 'MISS' THEN 1 ELSE 0 END,
+                    CASE WHEN s.outcome = 'RIM' THEN 1 ELSE 0 END,
+                    CASE WHEN s.elbow_violation = 1 THEN 1 ELSE 0 END,
+                    CASE WHEN s.shot_type = 'BOUNCE' THEN 1 ELSE 0 END,
+                    CASE WHEN s.shot_type = 'BOUNCE' THEN s.bounces ELSE 0 END,
+                    CASE WHEN s.shot_type = 'NORMAL' AND s.outcome = 'HIT' THEN 1 ELSE 0 END,
+                    CASE WHEN s.shot_type = 'NORMAL' THEN 1 ELSE 0 END,
+                    CASE WHEN s.shot_type = 'BOUNCE' AND s.outcome = 'HIT' THEN 1 ELSE 0 END,
+                    CASE WHEN s.shot_type = 'TRICKSHOT' AND s.outcome = 'HIT' THEN 1 ELSE 0 END,
+                    CASE WHEN s.shot_type = 'TRICKSHOT' THEN 1 ELSE 0 END,
+                    CASE WHEN s.shot_type = 'BOUNCE' AND s.outcome = 'HIT' THEN s.bounces + 1 ELSE 0 END
+                FROM shot s
+                JOIN game g ON s.game_id = g.id
+                WHERE g.tournament_id = :tid
+                    AND g.status != 'COMPLETED'
+                    AND s.shot_type != 'RERACK'
+            )
             SELECT
                 p.id   AS player_id,
                 p.name AS player_name,
-                COUNT(s.id)                                         AS total_shots,
-                SUM(CASE WHEN s.outcome = 'HIT' THEN 1 ELSE 0 END) AS hits,
-                SUM(CASE WHEN s.outcome = 'MISS' THEN 1 ELSE 0 END) AS misses,
-                SUM(CASE WHEN s.outcome = 'RIM' THEN 1 ELSE 0 END) AS rims,
-                SUM(CASE WHEN s.elbow_violation = 1 THEN 1 ELSE 0 END) AS elbow_violations,
-                SUM(CASE WHEN s.shot_type = 'BOUNCE' THEN 1 ELSE 0 END) AS bounce_shots,
-                COALESCE(SUM(CASE WHEN s.shot_type = 'BOUNCE' THEN s.bounces ELSE 0 END), 0) AS bounce_total,
-                SUM(CASE WHEN s.shot_type = 'NORMAL' AND s.outcome = 'HIT' THEN 1 ELSE 0 END) AS normal_hits,
-                SUM(CASE WHEN s.shot_type = 'NORMAL' THEN 1 ELSE 0 END) AS normal_total,
-                SUM(CASE WHEN s.shot_type = 'BOUNCE' AND s.outcome = 'HIT' THEN 1 ELSE 0 END) AS bounce_hits,
-                SUM(CASE WHEN s.shot_type = 'TRICKSHOT' AND s.outcome = 'HIT' THEN 1 ELSE 0 END) AS trickshot_hits,
-                SUM(CASE WHEN s.shot_type = 'TRICKSHOT' THEN 1 ELSE 0 END) AS trickshot_total,
-                COALESCE(SUM(CASE WHEN s.shot_type = 'BOUNCE' AND s.outcome = 'HIT' THEN s.bounces + 1 ELSE 0 END), 0) AS bounce_cups_removed
+                COALESCE(SUM(l.total_shots), 0)         AS total_shots,
+                COALESCE(SUM(l.hits), 0)                AS hits,
+                SUM(l.misses)                           AS misses,
+                SUM(l.rims)                             AS rims,
+                SUM(l.elbow_violations)                 AS elbow_violations,
+                SUM(l.bounce_shots)                     AS bounce_shots,
+                COALESCE(SUM(l.bounce_total), 0)        AS bounce_total,
+                SUM(l.normal_hits)                      AS normal_hits,
+                SUM(l.normal_total)                     AS normal_total,
+                SUM(l.bounce_hits)                      AS bounce_hits,
+                SUM(l.trickshot_hits)                   AS trickshot_hits,
+                SUM(l.trickshot_total)                  AS trickshot_total,
+                COALESCE(SUM(l.bounce_cups_removed), 0) AS bounce_cups_removed
             FROM (
                 SELECT player1_id AS player_id FROM team WHERE tournament_id = :tid
                 UNION
                 SELECT player2_id FROM team WHERE tournament_id = :tid
             ) tp
             JOIN player p ON tp.player_id = p.id
-            LEFT JOIN shot s ON s.player_id = p.id
-                AND s.shot_type != 'RERACK'
-                AND s.game_id IN (SELECT id FROM game WHERE tournament_id = :tid)
+            LEFT JOIN lines l ON l.player_id = p.id
             GROUP BY p.id
             ORDER BY hits DESC, total_shots ASC, p.name ASC
         """),
@@ -264,50 +313,140 @@ def _hot_hand_streaks(session: Session, tid: int) -> list[HotHandEntry]:
     ]
 
 
-# ---------------------------------------------------------------------------
-# Public functions — compose helpers into response models
-# ---------------------------------------------------------------------------
+def _roster(session: Session, tid: int) -> dict[int, str]:
+    """Player id -> name for everyone on a team in the tournament."""
+    rows = session.execute(
+        text("""
+            SELECT p.id, p.name
+            FROM player p
+            WHERE p.id IN (
+                SELECT player1_id FROM team WHERE tournament_id = :tid
+                UNION
+                SELECT player2_id FROM team WHERE tournament_id = :tid
+            )
+        """),
+        {"tid": tid},
+    ).all()
+    return {r.id: r.name for r in rows}
 
 
-def get_player_stats(session: Session, player_id: int, player_name: str) -> PlayerStats:
-    row = session.execute(
+def _player_names(session: Session, tid: int) -> dict[int, str]:
+    """Roster names plus anyone who received a punishment bong."""
+    rows = session.execute(
         text("""
-            SELECT
-                COUNT(*)                                             AS total_shots,
-                SUM(CASE WHEN outcome = 'HIT' THEN 1 ELSE 0 END)   AS hits,
-                SUM(CASE WHEN outcome = 'MISS' THEN 1 ELSE 0 END)  AS misses,
-                SUM(CASE WHEN outcome = 'RIM' THEN 1 ELSE 0 END)   AS rims,
-                SUM(CASE WHEN shot_type = 'NORMAL' AND outcome = 'HIT' THEN 1 ELSE 0 END)    AS normal_hits,
-                SUM(CASE WHEN shot_type = 'NORMAL' THEN 1 ELSE 0 END)                        AS normal_total,
-                SUM(CASE WHEN shot_type = 'BOUNCE' AND outcome = 'HIT' THEN 1 ELSE 0 END)    AS bounce_hits,
-                SUM(CASE WHEN shot_type = 'BOUNCE' THEN 1 ELSE 0 END)                        AS bounce_total,
-                SUM(CASE WHEN shot_type = 'TRICKSHOT' AND outcome = 'HIT' THEN 1 ELSE 0 END) AS trickshot_hits,
-                SUM(CASE WHEN shot_type = 'TRICKSHOT' THEN 1 ELSE 0 END)                     AS trickshot_total,
-                SUM(CASE WHEN elbow_violation = 1 THEN 1 ELSE 0 END) AS elbow_violations
-            FROM shot
-            WHERE player_id = :pid AND shot_type != 'RERACK'
+            SELECT p.id, p.name
+            FROM player p
+            WHERE p.id IN (SELECT player_id FROM punishmentbong WHERE tournament_id = :tid)
         """),
-        {"pid": player_id},
-    ).one()
+        {"tid": tid},
+    ).all()
+    return _roster(session, tid) | {r.id: r.name for r in rows}
+
+
+def _leaderboard_section(session: Session, tid: int) -> list[PlayerEntry]:
+    if COLUMNAR_CACHE:
+        return get_store(session, tid).player_leaderboard(_roster(session, tid))
+    return _player_leaderboard(session, tid)
+
+
+def _shot_and_punishment_sections(session: Session, tid: int) -> dict:
+    """Dashboard sections derived from shots and punishment bongs.
+
+    Served from the in-memory columnar cache when it is enabled, otherwise
+    straight from SQLite.
+    """
+    if not COLUMNAR_CACHE:
+        return {
+            "player_leaderboard": _player_leaderboard(session, tid),
+            "cup_heatmap": _cup_heatmap(session, tid),
+            "total_punishments": _total_punishments(session, tid),
+            "punishment_counts": _punishment_counts(session, tid),
+            "recent_punishments": _recent_punishments(session, tid),
+            "hot_hand": _hot_hand_streaks(session, tid),
+        }
+    store = get_store(session, tid)
+    names = _player_names(session, tid)
+    return {
+        "player_leaderboard": store.player_leaderboard(_roster(session, tid)),
+        "cup_heatmap": store.cup_heatmap(),
+        "total_punishments": store.total_punishments(),
+        "punishment_counts": store.punishment_counts(names),
+        "recent_punishments": store.recent_punishments(names),
+        "hot_hand": store.hot_hand_streaks(),
+    }
+
+
+def _hit_percentage(hits: int, total: int) -> float:
+    return round(hits / total * 100, 1) if total > 0 else 0.0
+
+
+def _ev(
+    normal_hits: int, trickshot_hits: int, bounce_cups_removed: int, total: int
+) -> float:
+    """Expected cups removed per attempt (see EV.md), without the 2B1C bonus."""
+    cups = normal_hits + trickshot_hits + bounce_cups_removed
+    return round(cups / total, 3) if total > 0 else 0.0
+
+
+def _rolling_hit_percentages(points: list, span) -> list[float]:
+    """Hit % over a trailing window for each point of a sorted series.
+
+    `span(newer, older)` says whether `older` still falls inside the window
+    that ends at `newer`.
+    """
+    result = []
+    start = shots = hits = 0
+    for end, point in enumerate(points):
+        shots += point.shots
+        hits += point.hits
+        while not span(point, points[start], end - start):
+            shots -= points[start].shots
+            hits -= points[start].hits
+            start += 1
+        result.append(_hit_percentage(hits, shots))
+    return result
+
+
+# ---------------------------------------------------------------------------
+# Public functions — compose helpers into response models
+# ---------------------------------------------------------------------------
+
 
-    total = row.total_shots or 0
-    hits = row.hits or 0
+def get_player_stats(
+    sessions: list[Session], player_id: int, player_name: str
+) -> PlayerStats:
+    """Career totals for one player, summed from the rollups of every shard."""
+    columns = (
+        "total_shots",
+        "hits",
+        "misses",
+        "rims",
+        "normal_hits",
+        "normal_total",
+        "bounce_hits",
+        "bounce_total",
+        "trickshot_hits",
+        "trickshot_total",
+        "elbow_violations",
+    )
+    totals = dict.fromkeys(columns, 0)
+    for session in sessions:
+        row = session.execute(
+            text(f"""
+                SELECT {", ".join(f"SUM({c}) AS {c}" for c in columns)}
+                FROM playertournamentrollup
+                WHERE player_id = :pid
+            """),
+            {"pid": player_id},
+        ).one()
+        for c in columns:
+            totals[c] += getattr(row, c) or 0
 
     return PlayerStats(
         player_id=player_id,
         player_name=player_name,
-        total_shots=total,
-        hits=hits,
-        misses=row.misses or 0,
-        rims=row.rims or 0,
-        hit_percentage=round(hits / total * 100, 1) if total > 0 else 0.0,
-        normal_hits=row.normal_hits or 0,
-        normal_total=row.normal_total or 0,
-        bounce_hits=row.bounce_hits or 0,
-        bounce_total=row.bounce_total or 0,
-        trickshot_hits=row.trickshot_hits or 0,
-        trickshot_total=row.trickshot_total or 0,
-        elbow_violations=row.elbow_violations or 0,
+        hit_percentage=_hit_percentage(totals["hits"], totals["total_shots"]),
+        **totals,
     )
 
 
@@ -320,7 +459,7 @@ def get_tournament_stats(
         tournament_name=tournament_name,
         total_games=total,
         completed_games=completed,
-        player_leaderboard=_player_leaderboard(session, tournament_id),
+        player_leaderboard=_leaderboard_section(session, tournament_id),
         team_standings=_team_standings(session, tournament_id),
     )
 
@@ -336,10 +475,219 @@ def get_dashboard(
         completed_games=completed,
         in_progress_games=in_progress,
         team_standings=_team_standings(session, tournament_id),
-        player_leaderboard=_player_leaderboard(session, tournament_id),
-        cup_heatmap=_cup_heatmap(session, tournament_id),
-        total_punishments=_total_punishments(session, tournament_id),
-        punishment_counts=_punishment_counts(session, tournament_id),
-        recent_punishments=_recent_punishments(session, tournament_id),
-        hot_hand=_hot_hand_streaks(session, tournament_id),
+        **_shot_and_punishment_sections(session, tournament_id),
+    )
+
+
+def get_game_boxscore(session: Session, game: Game) -> GameBoxScore:
+    """Per-player lines of one game, grouped by team.
+
+    Completed games read their stored box score; games still being played
+    are computed from their shots. Both team players always get a line.
+    """
+    materialized = game.status == GameStatus.COMPLETED
+    if materialized:
+        rows = session.exec(select(BoxScore).where(BoxScore.game_id == game.id)).all()
+    else:
+        rows = compute_game(session, game.id)
+    by_player = {row.player_id: row for row in rows}
+    names = _roster(session, game.tournament_id)
+    teams = []
+    for team_id in (game.team1_id, game.team2_id):
+        team = session.get(Team, team_id)
+        players = [team.player1_id, team.player2_id] if team else []
+        players += [r.player_id for r in rows if r.team_id == team_id]
+        lines = []
+        for player_id in dict.fromkeys(players):
+            row = by_player.get(player_id) or BoxScore(
+                game_id=game.id,
+                player_id=player_id,
+                tournament_id=game.tournament_id,
+                team_id=team_id,
+            )
+            lines.append(
+                BoxScoreLine(
+                    **row.model_dump(exclude={"game_id", "tournament_id", "team_id"}),
+                    player_name=names.get(player_id, ""),
+                    hit_percentage=_hit_percentage(row.hits, row.total_shots),
+                )
+            )
+        teams.append(
+            BoxScoreTeam(
+                team_id=team_id,
+                team_name=team.name if team else "",
+                cups_removed=sum(line.cups_removed for line in lines),
+                players=lines,
+            )
+        )
+    return GameBoxScore(
+        game_id=game.id,
+        tournament_id=game.tournament_id,
+        status=game.status,
+        winner_id=game.winner_id,
+        materialized=materialized,
+        teams=teams,
+    )
+
+
+def get_all_time_leaderboard(
+    sessions: list[Session], sort: LeaderboardSort, limit: int | None = None
+) -> list[AllTimeEntry]:
+    """Career totals per player, read from the precomputed rollup tables.
+
+    Cost scales with (players x tournaments), never with the number of shots.
+    """
+    rows = []
+    for session in sessions:
+        rows += session.execute(
+            text("""
+                SELECT r.*, p.name AS player_name, t.name AS tournament_name,
+                       t.created_at AS tournament_created_at
+                FROM playertournamentrollup r
+                JOIN player p ON r.player_id = p.id
+                JOIN tournament t ON r.tournament_id = t.id
+            """)
+        ).all()
+
+    by_player: dict[int, list] = {}
+    for r in sorted(rows, key=lambda r: (r.player_id, r.tournament_created_at)):
+        by_player.setdefault(r.player_id, []).append(r)
+
+    def metric(entry: AllTimeEntry | TournamentBreakdown) -> float:
+        return getattr(entry, sort.value)
+
+    entries = []
+    for player_id, player_rows in by_player.items():
+        totals = {
+            c: sum(getattr(r, c) for r in player_rows)
+            for c in (
+                "total_shots",
+                "hits",
+                "misses",
+                "rims",
+                "normal_hits",
+                "normal_total",
+                "bounce_hits",
+                "bounce_total",
+                "bounce_cups_removed",
+                "trickshot_hits",
+                "trickshot_total",
+                "elbow_violations",
+            )
+        }
+        tournaments = [
+            TournamentBreakdown(
+                tournament_id=r.tournament_id,
+                tournament_name=r.tournament_name,
+                total_shots=r.total_shots,
+                hits=r.hits,
+                hit_percentage=_hit_percentage(r.hits, r.total_shots),
+                ev=_ev(
+                    r.normal_hits,
+                    r.trickshot_hits,
+                    r.bounce_cups_removed,
+                    r.total_shots,
+                ),
+                bounce_cups_removed=r.bounce_cups_removed,
+                longest_hit_streak=r.longest_hit_streak,
+            )
+            for r in player_rows
+        ]
+        entries.append(
+            AllTimeEntry(
+                player_id=player_id,
+                player_name=player_rows[0].player_name,
+                tournaments_played=len(player_rows),
+                hit_percentage=_hit_percentage(totals["hits"], totals["total_shots"]),
+                ev=_ev(
+                    totals["normal_hits"],
+                    totals["trickshot_hits"],
+                    totals["bounce_cups_removed"],
+                    totals["total_shots"],
+                ),
+                longest_hit_streak=max(r.longest_hit_streak for r in player_rows),
+                longest_miss_streak=max(r.longest_miss_streak for r in player_rows),
+                best_tournament=max(tournaments, key=lambda t: (metric(t), t.hits)),
+                tournaments=tournaments,
+                **totals,
+            )
+        )
+
+    entries.sort(key=lambda e: (-metric(e), e.total_shots, e.player_name))
+    return entries[:limit] if limit is not None else entries
+
+
+def get_form_series(session: Session, tournament_id: int, window: int) -> FormSeries:
+    """Per-player hit rate per time bucket and per game, read from buckets.py.
+
+    Rolling percentages cover the trailing `window` time buckets (empty
+    buckets included) or the player's last `window` games, in the order
+    they started.
+    """
+    rows = session.execute(
+        text("""
+            SELECT b.player_id, p.name AS player_name, b.kind, b.bucket,
+                   b.shots, b.hits, b.cups_removed
+            FROM performancebucket b
+            JOIN player p ON b.player_id = p.id
+            LEFT JOIN game g ON b.kind = 'GAME' AND g.id = b.bucket
+            WHERE b.tournament_id = :tid
+            -- Games in play order, the (started_at, id) key ratings.py uses;
+            -- ids follow creation order, not the order games were played
+            ORDER BY p.name, b.player_id, b.kind, COALESCE(g.started_at, ''), b.bucket
+        """),
+        {"tid": tournament_id},
+    ).all()
+
+    by_player: dict[int, dict] = {}
+    for r in rows:
+        entry = by_player.setdefault(
+            r.player_id, {"name": r.player_name, "TIME": [], "GAME": []}
+        )
+        entry[r.kind].append(r)
+
+    players = []
+    for player_id, entry in by_player.items():
+        time_rows, game_rows = entry["TIME"], entry["GAME"]
+        time_rolling = _rolling_hit_percentages(
+            time_rows,
+            lambda new, old, _: new.bucket - old.bucket < window * BUCKET_SECONDS,
+        )
+        game_rolling = _rolling_hit_percentages(
+            game_rows, lambda new, old, distance: distance < window
+        )
+        players.append(
+            PlayerForm(
+                player_id=player_id,
+                player_name=entry["name"],
+                by_time=[
+                    TimeBucketPoint(
+                        bucket_start=datetime.fromtimestamp(r.bucket, timezone.utc),
+                        shots=r.shots,
+                        hits=r.hits,
+                        cups_removed=r.cups_removed,
+                        hit_percentage=_hit_percentage(r.hits, r.shots),
+                        rolling_hit_percentage=rolling,
+                    )
+                    for r, rolling in zip(time_rows, time_rolling)
+                ],
+                by_game=[
+                    GameBucketPoint(
+                        game_id=r.bucket,
+                        shots=r.shots,
+                        hits=r.hits,
+                        cups_removed=r.cups_removed,
+                        hit_percentage=_hit_percentage(r.hits, r.shots),
+                        rolling_hit_percentage=rolling,
+                    )
+                    for r, rolling in zip(game_rows, game_rolling)
+                ],
+            )
+        )
+
+    return FormSeries(
+        tournament_id=tournament_id,
+        bucket_seconds=BUCKET_SECONDS,
+        window=window,
+        players=players,
     )
@@ -0,0 +1,238 @@
+"""Write paths that touch shots, game results and punishment bongs.
+
+Every insert or delete that can change a shot goes through here, so the
+precomputed tables (rollups.py, buckets.py, boxscores.py) stay in sync with
+the shot table inside the same transaction, and the columnar cache
+(columnar.py) is patched once that transaction commits. Callers commit.
+"""
+
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import delete, update
+from sqlmodel import Session, select
+
+from . import boxscores, buckets, columnar, generations, ratings, rollups
+from .database import SHARDED
+from .models import (
+    Elbow,
+    ElbowViolation,
+    ElbowViolationEvent,
+    Game,
+    GameStatus,
+    PunishmentBong,
+    PunishmentBongCreate,
+    Shot,
+    ShotCreate,
+    ShotType,
+    Tournament,
+    ViolationEdge,
+)
+
+# A tracked elbow violation belongs to the first shot recorded within this
+# long after it started: judges enter the shot once the ball has landed.
+VIOLATION_ATTACH_WINDOW = timedelta(seconds=10)
+
+
+def _unattached_violations(
+    session: Session, game_id: int, shot_time: datetime
+) -> list[ElbowViolation]:
+    return list(
+        session.exec(
+            select(ElbowViolation).where(
+                ElbowViolation.game_id == game_id,
+                ElbowViolation.shot_id.is_(None),
+                ElbowViolation.started_at >= shot_time - VIOLATION_ATTACH_WINDOW,
+                ElbowViolation.started_at <= shot_time,
+            )
+        ).all()
+    )
+
+
+def add_shot(session: Session, game: Game, body: ShotCreate) -> Shot:
+    shot = Shot(game_id=game.id, **body.model_dump())
+    violations = []
+    if shot.shot_type != ShotType.RERACK:
+        violations = _unattached_violations(session, game.id, shot.timestamp)
+        shot.elbow_violation = shot.elbow_violation or bool(violations)
+    session.add(shot)
+    rollups.record_shot(session, shot, game.tournament_id)
+    buckets.record_shot(session, shot, game.tournament_id)
+    session.flush()
+    for violation in violations:
+        violation.shot_id = shot.id
+        session.add(violation)
+    if game.status == GameStatus.COMPLETED:
+        boxscores.refresh_game(session, game)
+    row = columnar.shot_row(shot)
+    columnar.after_commit(
+        session, game.tournament_id, lambda store: store.shots.append(row)
+    )
+    return shot
+
+
+def remove_shot(session: Session, shot: Shot) -> None:
+    shot_id, player_id, game = shot.id, shot.player_id, shot.game
+    tournament_id = game.tournament_id
+    session.execute(
+        update(ElbowViolation)
+        .where(ElbowViolation.shot_id == shot_id)
+        .values(shot_id=None)
+    )
+    buckets.forget_shot(session, shot, tournament_id)
+    session.delete(shot)
+    rollups.refresh_player_rollup(session, player_id, tournament_id)
+    if game.status == GameStatus.COMPLETED:
+        boxscores.refresh_game(session, game)
+    columnar.after_commit(
+        session, tournament_id, lambda store: store.shots.remove_id(shot_id)
+    )
+
+
+def apply_game_update(session: Session, game: Game, data: dict) -> None:
+    """Apply a game update. Completing or reopening it writes or drops its box score."""
+    was_completed = game.status == GameStatus.COMPLETED
+    # Auto-set started_at when transitioning to in_progress
+    if data.get("status") == GameStatus.IN_PROGRESS and game.started_at is None:
+        data["started_at"] = datetime.now(timezone.utc)
+    for key, value in data.items():
+        setattr(game, key, value)
+    session.add(game)
+    if was_completed != (game.status == GameStatus.COMPLETED):
+        boxscores.refresh_game(session, game)
+
+
+def remove_game(session: Session, game: Game) -> None:
+    game_id, tournament_id = game.id, game.tournament_id
+    shooters = set()
+    for shot in game.shots:
+        buckets.forget_shot(session, shot, tournament_id)
+        shooters.add(shot.player_id)
+    boxscores.drop_game_boxscores(session, game_id)
+    session.delete(game)
+    for player_id in shooters:
+        rollups.refresh_player_rollup(session, player_id, tournament_id)
+    columnar.after_commit(
+        session,
+        tournament_id,
+        lambda store: store.shots.remove(store.shots.column("game_id") == game_id),
+    )
+
+
+def _flag_elbow_violation(session: Session, shot: Shot, tournament_id: int) -> None:
+    if shot.elbow_violation:
+        return
+    shot.elbow_violation = True
+    session.add(shot)
+    rollups.record_elbow_violation(session, shot, tournament_id)
+    if shot.game.status == GameStatus.COMPLETED:
+        boxscores.refresh_game(session, shot.game)
+    shot_id = shot.id
+    columnar.after_commit(
+        session,
+        tournament_id,
+        lambda store: store.shots.update_id(shot_id, {"elbow": True}),
+    )
+
+
+def _attach_to_shot(session: Session, violation: ElbowViolation, tournament_id: int):
+    shot = session.exec(
+        select(Shot)
+        .where(
+            Shot.game_id == violation.game_id,
+            Shot.shot_type != ShotType.RERACK,
+            Shot.timestamp >= violation.started_at,
+            Shot.timestamp <= violation.started_at + VIOLATION_ATTACH_WINDOW,
+        )
+        .order_by(Shot.timestamp)
+    ).first()
+    if shot is not None:
+        violation.shot_id = shot.id
+        _flag_elbow_violation(session, shot, tournament_id)
+
+
+def record_elbow_violations(
+    session: Session, game: Game, events: list[ElbowViolationEvent]
+) -> list[ElbowViolation]:
+    """Apply tracker start/end events and flag the shots they belong to.
+
+    Events are keyed by `violation_id`, so a resent batch changes nothing.
+    A violation whose shot has not been entered yet stays unattached until
+    add_shot picks it up.
+    """
+    touched: dict[str, ElbowViolation] = {}
+    for event in events:
+        timestamp = event.timestamp.astimezone(timezone.utc)
+        violation = (
+            touched.get(event.violation_id)
+            or session.exec(
+                select(ElbowViolation).where(
+                    ElbowViolation.violation_id == event.violation_id
+                )
+            ).first()
+        )
+        if violation is None:
+            violation = ElbowViolation(
+                violation_id=event.violation_id,
+                game_id=game.id,
+                elbow=event.elbow,
+                camera=event.camera,
+                started_at=timestamp,
+            )
+        if event.edge == ViolationEdge.START:
+            violation.started_at = timestamp
+        else:
+            violation.ended_at = timestamp
+        if violation.elbow != event.elbow:
+            violation.elbow = Elbow.BOTH
+        violation.clip = event.clip or violation.clip
+        session.add(violation)
+        touched[event.violation_id] = violation
+    session.flush()
+    for violation in touched.values():
+        if violation.shot_id is None:
+            _attach_to_shot(session, violation, game.tournament_id)
+    session.flush()
+    return list(touched.values())
+
+
+def remove_tournament(session: Session, tournament: Tournament) -> None:
+    columnar.evict(tournament.id)
+    # Its id can be reused; nothing cached for the old tournament may match
+    generations.touch(session, tournament.id)
+    ratings.forget_tournament(session, tournament.id)
+    if SHARDED:
+        # Only the registry row lives here; the caller drops the shard file.
+        session.execute(delete(Tournament).where(Tournament.id == tournament.id))
+        return
+    rollups.drop_tournament_rollups(session, tournament.id)
+    buckets.drop_tournament_buckets(session, tournament.id)
+    boxscores.drop_tournament_boxscores(session, tournament.id)
+    session.delete(tournament)
+
+
+def add_punishment_bong(
+    session: Session, tournament_id: int, body: PunishmentBongCreate
+) -> PunishmentBong:
+    pb = PunishmentBong(tournament_id=tournament_id, **body.model_dump())
+    session.add(pb)
+    session.flush()
+    row = columnar.punishment_row(pb)
+    columnar.after_commit(
+        session, tournament_id, lambda store: store.punishments.append(row)
+    )
+    return pb
+
+
+def remove_punishment_bong(session: Session, pb: PunishmentBong) -> None:
+    bong_id, tournament_id = pb.id, pb.tournament_id
+    session.delete(pb)
+    columnar.after_commit(
+        session, tournament_id, lambda store: store.punishments.remove_id(bong_id)
+    )
+
+
+def rebuild_aggregates(session: Session) -> None:
+    """Rebuild every precomputed table from scratch (startup compaction)."""
+    rollups.rebuild_rollups(session)
+    buckets.rebuild_buckets(session)
+    boxscores.rebuild_boxscores(session)
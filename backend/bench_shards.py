@@ -0,0 +1,173 @@
+"""Benchmark: shot write throughput with several tournaments live at once.
+
+Runs the same workload against the single-file layout and the sharded
+layout (SUPER_PONG_SHARDED=1), each in a fresh temporary directory. Every
+tournament gets a few writer threads committing one shot per transaction
+(like POST /games/{id}/shots) and one thread polling its dashboard.
+
+Usage:
+    cd backend
+    uv run python bench_shards.py [--tournaments 4] [--writers 2] [--shots 200]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent
+
+
+def worker(tournaments: int, writers: int, shots: int) -> dict:
+    from app.database import create_db_and_tables, engine, tournament_session
+    from app.models import Game, Player, ShotCreate, Team, Tournament
+    from app.stats import get_dashboard
+    from app.writes import add_shot
+    from sqlalchemy.exc import OperationalError
+    from sqlmodel import Session
+
+    create_db_and_tables()
+    tables = []
+    with Session(engine) as session:
+        players = [Player(name=f"Player {i}") for i in range(4)]
+        session.add_all(players)
+        ids = []
+        for i in range(tournaments):
+            tournament = Tournament(name=f"Bench {i}")
+            session.add(tournament)
+            session.flush()
+            ids.append(tournament.id)
+        session.commit()
+        player_ids = [p.id for p in players]
+
+    for tid in ids:
+        with tournament_session(tid) as session:
+            teams = [
+                Team(
+                    name=f"Team {i}",
+                    player1_id=player_ids[2 * i],
+                    player2_id=player_ids[2 * i + 1],
+                    tournament_id=tid,
+                )
+                for i in range(2)
+            ]
+            session.add_all(teams)
+            session.flush()
+            game = Game(tournament_id=tid, team1_id=teams[0].id, team2_id=teams[1].id)
+            session.add(game)
+            session.commit()
+            tables.append((tid, game.id, teams[0].id))
+
+    latencies: list[float] = []
+    errors = 0
+    lock = threading.Lock()
+    done = threading.Event()
+
+    def write(tid: int, game_id: int, team_id: int):
+        nonlocal errors
+        body = ShotCreate(
+            player_id=player_ids[0], team_id=team_id, shot_type="normal", outcome="hit"
+        )
+        for _ in range(shots):
+            start = time.perf_counter()
+            try:
+                with tournament_session(tid) as session:
+                    add_shot(session, session.get(Game, game_id), body)
+                    session.commit()
+            except OperationalError:  # "database is locked" past the busy timeout
+                with lock:
+                    errors += 1
+                continue
+            with lock:
+                latencies.append(time.perf_counter() - start)
+
+    def read(tid: int):
+        while not done.is_set():
+            with tournament_session(tid) as session:
+                get_dashboard(session, tid, "bench")
+
+    readers = [threading.Thread(target=read, args=(tid,)) for tid, _, _ in tables]
+    threads = [
+        threading.Thread(target=write, args=table)
+        for table in tables
+        for _ in range(writers)
+    ]
+    for t in readers:
+        t.start()
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - start
+    done.set()
+    for t in readers:
+        t.join()
+
+    latencies.sort()
+    return {
+        "shots": len(latencies),
+        "errors": errors,
+        "seconds": round(elapsed, 3),
+        "shots_per_second": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(statistics.median(latencies) * 1000, 2),
+        "p95_ms": round(latencies[int(len(latencies) * 0.95) - 1] * 1000, 2),
+    }
+
+
+def run_mode(sharded: bool, args) -> dict:
+    env = {
+        **os.environ,
+        "PYTHONPATH": str(BACKEND_DIR),
+        "SUPER_PONG_SHARDED": "1" if sharded else "0",
+    }
+    with tempfile.TemporaryDirectory() as tmp:
+        out = subprocess.check_output(
+            [
+                sys.executable,
+                str(Path(__file__).resolve()),
+                "--worker",
+                f"--tournaments={args.tournaments}",
+                f"--writers={args.writers}",
+                f"--shots={args.shots}",
+            ],
+            cwd=tmp,
+            env=env,
+            text=True,
+        )
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tournaments", type=int, default=4)
+    parser.add_argument("--writers", type=int, default=2, help="per tournament")
+    parser.add_argument("--shots", type=int, default=200, help="per writer")
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        print(json.dumps(worker(args.tournaments, args.writers, args.shots)))
+        return
+
+    print(
+        f"{args.tournaments} tournaments x {args.writers} writers x "
+        f"{args.shots} shots, one dashboard poller per tournament\n"
+    )
+    print(f"{'layout':<10} {'shots/s':>9} {'p50 ms':>8} {'p95 ms':>8} {'errors':>7}")
+    for label, sharded in (("single", False), ("sharded", True)):
+        r = run_mode(sharded, args)
+        print(
+            f"{label:<10} {r['shots_per_second']:>9} {r['p50_ms']:>8} "
+            f"{r['p95_ms']:>8} {r['errors']:>7}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -7,7 +7,7 @@ Usage:
 
 from sqlmodel import Session
 
-from app.database import create_db_and_tables, engine
+from app.database import create_db_and_tables, engine, tournament_session
 from app.models import Game, Player, Team, Tournament
 
 TOURNAMENT_NAME = "SuperPongTest"
@@ -48,8 +48,12 @@ def seed():
         # --- Tournament ---
         tournament = Tournament(name=TOURNAMENT_NAME)
         session.add(tournament)
-        session.flush()
+        session.commit()
+        tournament_id = tournament.id
+        player_ids = {name: player.id for name, player in player_cache.items()}
 
+    # Teams and games go to the tournament's shard when sharding is enabled
+    with tournament_session(tournament_id) as session:
         # --- Teams ---
         all_teams: dict[str, list[Team]] = {}
         for group, pairs in GROUPS.items():
@@ -57,9 +61,9 @@ def seed():
             for p1_name, p2_name in pairs:
                 team = Team(
                     name=f"{p1_name} & {p2_name}",
-                    player1_id=player_cache[p1_name].id,
-                    player2_id=player_cache[p2_name].id,
-                    tournament_id=tournament.id,
+                    player1_id=player_ids[p1_name],
+                    player2_id=player_ids[p2_name],
+                    tournament_id=tournament_id,
                     group=group,
                 )
                 session.add(team)
@@ -71,7 +75,7 @@ def seed():
             for i in range(len(teams)):
                 for j in range(i + 1, len(teams)):
                     game = Game(
-                        tournament_id=tournament.id,
+                        tournament_id=tournament_id,
                         team1_id=teams[i].id,
                         team2_id=teams[j].id,
                         starting_cups_per_team=6,
@@ -83,9 +87,9 @@ def seed():
         total_games = sum(
             len(teams) * (len(teams) - 1) // 2 for teams in all_teams.values()
         )
-        print(f"✓ Tournament '{TOURNAMENT_NAME}' (id={tournament.id})")
+        print(f"✓ Tournament '{TOURNAMENT_NAME}' (id={tournament_id})")
         print(
-            f"  {len(player_cache)} players, {sum(len(t) for t in all_teams.values())} teams, {total_games} games"
+            f"  {len(player_ids)} players, {sum(len(t) for t in all_teams.values())} teams, {total_games} games"
         )
 
 
@@ -1,31 +1,62 @@
-import collections
+import argparse
+import json
 import os
 import platform
 import subprocess
 import sys
+import threading
+import time
+from pathlib import Path
 
 # Suppress noisy OpenCV/FFmpeg/TF warnings before importing cv2
 os.environ["OPENCV_LOG_LEVEL"] = "ERROR"
 os.environ["TF_CPP_MIN_LOG_LEVEL"] = "3"
 
 import cv2
-from detector import PoseDetector
+import renderer
+from clips import ClipExporter
+from detector import MODEL_VARIANTS, PoseDetector
+from framebus import FrameBus, bus_name
 from gesture import GestureDetector
+from headless import timing_summary, violation_spans
+from model_select import AdaptivePoseDetector, select_variant
+from pipeline import CaptureThread, InferenceThread, LatestQueue, StageStats
+from preprocess import FramePool
+from replay import BACKENDS, create_replay_buffer
+from reporting import ViolationDebouncer, ViolationSender
+from table_zone import ROI_MARGIN, TableZone
+from telemetry import HUD_REFRESH, STAGES, TelemetryWriter, hud_rows
 from violation import check_violation
-import renderer
 
 CAMERA_WIDTH = 1280
 CAMERA_HEIGHT = 720
-REPLAY_BUFFER_SIZE = 300  # ~10s at 30fps
+CAMERA_FPS = 30
+REPLAY_SECONDS = 10
 PUNISHMENT_DURATION = 90  # ~3s at 30fps
 OUTPUT_WIDTH = 1920
 OUTPUT_HEIGHT = 1080
 MAX_CAMERA_PROBE = 8
+PROBE_TIMEOUT = 3.0  # seconds to wait for a camera to open and deliver a frame
+CAMERA_CACHE = Path.home() / ".cache" / "elbow-tracking" / "cameras.json"
+# Buffers in flight at once: one per pipeline stage plus one per handoff slot
+PIPELINE_BUFFERS = 6
+STATS_PRINT_INTERVAL = 5.0  # seconds between per-stage FPS/latency lines
+CONSOLE_STAGES = ("capture", "inference", "render", "end-to-end")
+WARMUP_FRAMES = 20  # camera frames used to time the pose models with --pose-model auto
 
 
-def discover_cameras():
-    """Probe available cameras and return list of (index, name) tuples."""
-    # Get camera names from macOS system_profiler if available
+def open_camera(camera_index):
+    """Open a camera at the tracker's capture resolution."""
+    # Use AVFoundation backend on macOS to avoid noisy FFmpeg fallback.
+    backend = cv2.CAP_AVFOUNDATION if platform.system() == "Darwin" else cv2.CAP_ANY
+    cap = cv2.VideoCapture(camera_index, backend)
+    cap.set(cv2.CAP_PROP_FRAME_WIDTH, CAMERA_WIDTH)
+    cap.set(cv2.CAP_PROP_FRAME_HEIGHT, CAMERA_HEIGHT)
+    return cap
+
+
+def camera_names():
+    """Camera names by index from macOS system_profiler, where available."""
     names = {}
     if platform.system() == "Darwin":
         try:
@@ -43,36 +74,118 @@ def discover_cameras():
                     idx += 1
         except (subprocess.SubprocessError, FileNotFoundError):
             pass
+    return names
+
+
+def device_identity(names):
+    """Something that changes whenever the set of attached cameras does, or None.
+
+    On Linux that is each /dev/video* node's device number and creation time
+    (plugging or re-enumerating a camera recreates the node); on macOS, the
+    system_profiler camera list. A cached inventory is trusted only while this
+    is unchanged.
+    """
+    if platform.system() == "Linux":
+        return {path.name: [path.stat().st_rdev, path.stat().st_ctime_ns]
+                for path in sorted(Path("/dev").glob("video*"))}
+    if platform.system() == "Darwin" and names:
+        return list(names.values())
+    return None
+
+
+def _load_camera_cache(identity):
+    try:
+        cached = json.loads(CAMERA_CACHE.read_text())
+    except (OSError, ValueError):
+        return None
+    if identity is None or cached.get("identity") != identity:
+        return None
+    return [tuple(camera) for camera in cached["cameras"]]
+
+
+def _save_camera_cache(identity, cameras):
+    if identity is None:
+        return
+    try:
+        CAMERA_CACHE.parent.mkdir(parents=True, exist_ok=True)
+        CAMERA_CACHE.write_text(json.dumps({"identity": identity, "cameras": cameras}))
+    except OSError:
+        pass
+
+
+def probe_cameras(indices, timeout=PROBE_TIMEOUT):
+    """Open every index in parallel and return {index: open capture} for those
+    that deliver a frame. A device that hangs is given up on after `timeout`."""
+    found = {}
+    lock = threading.Lock()
+    expired = threading.Event()
+
+    def probe(i):
+        cap = open_camera(i)
+        ok = cap.isOpened() and cap.read()[0]
+        with lock:
+            if ok and not expired.is_set():
+                found[i] = cap
+                return
+        cap.release()
+
+    # Daemon threads, so a wedged device can't keep the process alive
+    threads = [threading.Thread(target=probe, args=(i,), daemon=True) for i in indices]
+    for thread in threads:
+        thread.start()
+    deadline = time.monotonic() + timeout
+    for thread in threads:
+        thread.join(max(0.0, deadline - time.monotonic()))
+    with lock:
+        expired.set()
+        return dict(found)
+
+
+def discover_cameras(keep_open=False, rescan=False):
+    """Find available cameras and return (list of (index, name), open captures).
+
+    The inventory is cached on disk and reused until the attached devices
+    change. When cameras were actually probed and `keep_open` is set, their
+    open captures are returned so the chosen one need not be reopened; the
+    caller releases them. Otherwise the dict is empty.
+    """
+    names = camera_names()
+    identity = device_identity(names)
+    if not rescan:
+        cameras = _load_camera_cache(identity)
+        if cameras is not None:
+            return cameras, {}
 
-    # Use AVFoundation backend on macOS to avoid noisy FFmpeg fallback.
     # Redirect stderr to suppress C++-level "out device of bound" warnings
     # that OpenCV emits when probing non-existent camera indices.
-    backend = cv2.CAP_AVFOUNDATION if platform.system() == "Darwin" else cv2.CAP_ANY
-    cameras = []
     stderr_fd = sys.stderr.fileno()
     saved_stderr = os.dup(stderr_fd)
     devnull = os.open(os.devnull, os.O_WRONLY)
     os.dup2(devnull, stderr_fd)
     try:
-        for i in range(MAX_CAMERA_PROBE):
-            cap = cv2.VideoCapture(i, backend)
-            if cap.isOpened():
-                ret, _ = cap.read()
-                if ret:
-                    name = names.get(i, f"Camera {i}")
-                    cameras.append((i, name))
-                cap.release()
+        captures = probe_cameras(range(MAX_CAMERA_PROBE))
     finally:
         os.dup2(saved_stderr, stderr_fd)
         os.close(saved_stderr)
         os.close(devnull)
-    return cameras
+
+    cameras = [(i, names.get(i, f"Camera {i}")) for i in sorted(captures)]
+    _save_camera_cache(identity, cameras)
+    if not keep_open:
+        for cap in captures.values():
+            cap.release()
+        captures = {}
+    return cameras, captures
 
 
-def select_camera():
-    """Show a terminal menu of available cameras and return the selected index."""
+def select_camera(rescan=False):
+    """Show a terminal menu of available cameras.
+
+    Returns (index, capture), where capture is the already-open probe handle
+    for that camera or None if discovery came from the cache.
+    """
     print("Scanning for cameras...")
-    cameras = discover_cameras()
+    cameras, captures = discover_cameras(keep_open=True, rescan=rescan)
 
     if not cameras:
         print("No cameras found.")
@@ -81,39 +194,121 @@ def select_camera():
     if len(cameras) == 1:
         idx, name = cameras[0]
         print(f"Using: {name} (index {idx})")
-        return idx
-
-    print("\nAvailable cameras:")
-    for i, (idx, name) in enumerate(cameras):
-        print(f"  [{i + 1}] {name}  (index {idx})")
-
-    while True:
-        choice = input(f"\nSelect camera [1-{len(cameras)}]: ").strip()
-        try:
-            num = int(choice)
-            if 1 <= num <= len(cameras):
-                idx, name = cameras[num - 1]
-                print(f"Using: {name} (index {idx})")
-                return idx
-        except ValueError:
-            pass
-        print("Invalid choice, try again.")
+    else:
+        print("\nAvailable cameras:")
+        for i, (idx, name) in enumerate(cameras):
+            print(f"  [{i + 1}] {name}  (index {idx})")
+
+        while True:
+            choice = input(f"\nSelect camera [1-{len(cameras)}]: ").strip()
+            try:
+                num = int(choice)
+                if 1 <= num <= len(cameras):
+                    idx, name = cameras[num - 1]
+                    print(f"Using: {name} (index {idx})")
+                    break
+            except ValueError:
+                pass
+            print("Invalid choice, try again.")
+
+    for i, cap in captures.items():
+        if i != idx:
+            cap.release()
+    return idx, captures.get(idx)
 
 
 class ElbowTracker:
-    def __init__(self, camera_index=0):
-        self.detector = PoseDetector()
-        self.gesture_detector = GestureDetector()
+    def __init__(self, camera_index=0, pipelined=True, replay_backend="ring",
+                 replay_seconds=REPLAY_SECONDS, replay_width=CAMERA_WIDTH,
+                 replay_budget_mb=None, gesture_every=1, gesture_adaptive=False,
+                 gesture_roi=False, inference_width=None, live_stream=False,
+                 pose_model="full", cap=None, backend_url=None, tournament_id=None,
+                 game_id=None, clip_dir=None, target_fps=CAMERA_FPS, pose_roi=False,
+                 roi_margin=ROI_MARGIN, frame_bus=None, hud=False, telemetry_path=None):
+        self.zone = TableZone(pose_roi, roi_margin)
+        self.cap = open_camera(camera_index) if cap is None else cap
+        if pose_model == "auto":
+            self.detector = self.pick_pose_model(target_fps, inference_width, live_stream)
+        else:
+            self.detector = PoseDetector(live_stream=live_stream, variant=pose_model,
+                                         zone=self.zone)
+        self.gesture_detector = GestureDetector(gesture_every, gesture_adaptive,
+                                                gesture_roi, live_stream)
         self.table_edge_x = None
         self.calibrating = True
         self.camera_index = camera_index
-        backend = cv2.CAP_AVFOUNDATION if platform.system() == "Darwin" else cv2.CAP_ANY
-        self.cap = cv2.VideoCapture(camera_index, backend)
-        self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, CAMERA_WIDTH)
-        self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, CAMERA_HEIGHT)
-        self.frame_buffer = collections.deque(maxlen=REPLAY_BUFFER_SIZE)
+        self.replay = create_replay_buffer(
+            replay_backend, replay_seconds * CAMERA_FPS, replay_width,
+            replay_width * CAMERA_HEIGHT // CAMERA_WIDTH, replay_budget_mb)
         self.window_name = f"Elbow Tracker - Camera {camera_index}"
         self.punishment_timer = 0
+        self.pipelined = pipelined
+        self.inference_width = inference_width
+        self.live_stream = live_stream
+        self.compositor = None  # sized from the first frame the camera delivers
+        self.stats = {name: StageStats(name) for name in STAGES}
+        self.last_stats_print = time.monotonic()
+        self.hud = hud  # per-stage timings on screen, toggled with 'h'
+        self.hud_patch = None
+        self.hud_refreshed = 0.0
+        self.handoffs = ()  # pipelined mode's queues, for dropped-frame counts
+        self.telemetry = None
+        if telemetry_path:
+            self.telemetry = TelemetryWriter(telemetry_path, self.stats,
+                                             self.telemetry_extra)
+            self.telemetry.start()
+        # Violation events go to the backend from a background thread, if configured
+        self.debouncer = ViolationDebouncer(camera=camera_index)
+        self.sender = None
+        if backend_url:
+            self.sender = ViolationSender(backend_url, tournament_id, game_id,
+                                          f"violation_queue_{camera_index}.jsonl")
+            self.sender.start()
+        self.clips = None
+        if clip_dir:
+            self.clips = ClipExporter(self.replay, clip_dir, CAMERA_FPS, camera_index)
+            self.clips.start()
+        # Rendered output shared with other local processes (framebus.py serve/record)
+        self.bus = None
+        if frame_bus:
+            self.bus = FrameBus(frame_bus, OUTPUT_WIDTH, OUTPUT_HEIGHT)
+
+    def telemetry_extra(self):
+        extra = {"pose_model": self.detector.variant}
+        if self.handoffs:
+            extra["dropped"] = {"before_inference": self.handoffs[0].dropped,
+                                "before_render": self.handoffs[1].dropped}
+        if self.zone.enabled:
+            extra["pose_crops"] = {"cropped": self.zone.cropped,
+                                   "full_frame": self.zone.full_frame}
+        return extra
+
+    def pick_pose_model(self, target_fps, inference_width, live_stream):
+        """Time each pose model on live camera frames and start with the best that fits."""
+        pool = FramePool(WARMUP_FRAMES, inference_width)
+        samples = []
+        while len(samples) < WARMUP_FRAMES and self.cap.isOpened():
+            success, raw = self.cap.read()
+            if not success:
+                break
+            samples.append(pool.prepare(raw, pool.acquire()))
+        if samples:
+            variant, timings = select_variant(samples, target_fps)
+            print("Pose model warm-up: " + ", ".join(
+                f"{v} {ms:.1f} ms" for v, ms in timings.items())
+                + f" -> {variant} (target {target_fps} fps)")
+        else:
+            variant = "full"
+        return AdaptivePoseDetector(variant, target_fps, live_stream, self.zone)
+
+    @property
+    def table_edge_x(self):
+        return self.zone.edge_x
+
+    @table_edge_x.setter
+    def table_edge_x(self, x):
+        # The pose crop follows the calibrated edge
+        self.zone.edge_x = x
 
     def on_mouse(self, event, x, y, flags, param):
         """Handle mouse clicks, scaling from output image space to camera frame space."""
@@ -129,72 +324,440 @@ class ElbowTracker:
         self.calibrating = True
         print("Table edge reset - click to set new position")
 
-    def run(self):
-        cv2.namedWindow(self.window_name, cv2.WINDOW_AUTOSIZE)
-        cv2.setMouseCallback(self.window_name, self.on_mouse)
-
-        print("Elbow Tracker (PiP)")
-        print(f"  Output: {OUTPUT_WIDTH}x{OUTPUT_HEIGHT}")
-        print(f"  Replay buffer: {REPLAY_BUFFER_SIZE} frames (~10s)")
-        print("  Click to set table edge | 'r' to reset | 'q' to quit")
-
+    def report_violation(self, elbows, captured_at):
+        """Queue a debounced start/end event for the backend and a clip. Never blocks."""
+        if self.sender is None and self.clips is None:
+            return
+        event = self.debouncer.update(elbows, self.table_edge_x, captured_at)
+        if event is None:
+            return
+        if event["edge"] == "start" and self.clips is not None:
+            event["clip"] = self.clips.trigger("violation", event["violation_id"],
+                                               captured_at)
+        if self.sender is not None:
+            self.sender.emit(event)
+
+    def render(self, frame, elbows, pose_results, middle_finger, captured_at=None):
+        """Draw overlays on the live frame, push it to the replay buffer and compose the output."""
+        started = time.monotonic()
+        self.annotate(frame, elbows, pose_results, middle_finger)
+        drawn = time.monotonic()
+        self.stats["draw"].record(started, drawn)
+
+        # Push the fully rendered frame into the replay buffer
+        seq = self.replay.push(frame)
+        if self.clips is not None:
+            self.clips.mark(seq, started if captured_at is None else captured_at)
+        replay_frame = self.replay.delayed_frame() if self.replay.is_full() else None
+        replayed = time.monotonic()
+        self.stats["replay"].record(drawn, replayed)
+
+        # Compose PiP: replay (delayed) fills output, live is small overlay.
+        # With a frame bus, compose straight into its next slot: publishing
+        # costs no copy
+        out = self.bus.begin() if self.bus is not None else None
+        display = self.compositor.compose(replay_frame, frame, out=out)
+        if self.hud:
+            self.draw_hud(display, replayed)
+        if self.bus is not None:
+            self.bus.commit()
+        self.stats["compose"].record(replayed)
+        return display
+
+    def draw_hud(self, display, now):
+        """Paste the stage table; its text is only re-rendered every HUD_REFRESH seconds."""
+        if self.hud_patch is None or now - self.hud_refreshed >= HUD_REFRESH:
+            self.hud_patch = renderer.stage_hud(hud_rows(self.stats))
+            self.hud_refreshed = now
+        self.hud_patch.paste(display)
+
+    def annotate(self, frame, elbows, pose_results, middle_finger):
+        """Draw pose, elbows, table edge, violation and punishment overlays in place."""
+        height, width = frame.shape[:2]
+        if self.compositor is None or self.compositor.live_size != (width, height):
+            self.compositor = renderer.PipCompositor(OUTPUT_WIDTH, OUTPUT_HEIGHT,
+                                                     width, height)
+        renderer.draw_pose(frame, pose_results)
+
+        if elbows:
+            renderer.draw_elbows(frame, elbows)
+
+            if check_violation(elbows, self.table_edge_x):
+                renderer.draw_violation_warning(frame)
+            else:
+                renderer.reset_violation_warning()
+
+        renderer.draw_table_edge(frame, self.table_edge_x)
+        renderer.draw_status(frame, self.calibrating)
+
+        # Easter egg: middle finger triggers punishment bong
+        if middle_finger:
+            self.punishment_timer = PUNISHMENT_DURATION
+        if self.punishment_timer > 0:
+            self.compositor.draw_punishment(frame)
+            self.punishment_timer -= 1
+
+    def handle_key(self):
+        """Pump the GUI event loop. Returns False when the user asked to quit."""
+        key = cv2.waitKey(5) & 0xFF
+        if key == ord("q"):
+            return False
+        elif key == ord("r"):
+            self.reset_calibration()
+        elif key == ord("c") and self.clips is not None:
+            print(f"Exporting clip {self.clips.trigger('manual')}")
+        elif key == ord("h"):
+            self.hud = not self.hud
+        return True
+
+    def show(self, display, captured_at):
+        """Display a composed frame and record display and end-to-end timings."""
+        started = time.monotonic()
+        cv2.imshow(self.window_name, display)
+        self.stats["end-to-end"].record(captured_at)
+        keep_running = self.handle_key()
+        now = time.monotonic()
+        self.stats["display"].record(started, now)
+        if now - self.last_stats_print >= STATS_PRINT_INTERVAL:
+            print(" | ".join(self.stats[name].summary() for name in CONSOLE_STAGES))
+            self.last_stats_print = now
+        return keep_running
+
+    def run_serial(self):
+        """Original single-threaded loop: every stage waits for the one before it."""
+        pool = FramePool(1, self.inference_width)
+        prepared = pool.acquire()
         while self.cap.isOpened():
-            success, frame = self.cap.read()
+            started = time.monotonic()
+            success, raw = self.cap.read()
             if not success:
                 continue
-
-            frame = cv2.flip(frame, 1)
-
-            elbows, pose_results = self.detector.detect(frame)
-
-            renderer.draw_pose(frame, pose_results)
-
-            if elbows:
-                renderer.draw_elbows(frame, elbows)
-
-                if check_violation(elbows, self.table_edge_x):
-                    renderer.draw_violation_warning(frame)
-                else:
-                    renderer.reset_violation_warning()
-
-            renderer.draw_table_edge(frame, self.table_edge_x)
-            renderer.draw_status(frame, self.calibrating)
-
-            # Easter egg: middle finger triggers punishment bong
-            if self.gesture_detector.detect_middle_finger(frame):
-                self.punishment_timer = PUNISHMENT_DURATION
-            if self.punishment_timer > 0:
-                renderer.draw_punishment(frame)
-                self.punishment_timer -= 1
-
-            # Push the fully rendered frame into the replay buffer
-            self.frame_buffer.append(frame.copy())
-
-            # Compose PiP: replay (delayed) fills output, live is small overlay
-            if len(self.frame_buffer) == REPLAY_BUFFER_SIZE:
-                replay_frame = self.frame_buffer[0]
-                display = renderer.compose_pip(
-                    replay_frame, frame, OUTPUT_WIDTH, OUTPUT_HEIGHT)
-            else:
-                buffering = renderer.draw_buffering(OUTPUT_WIDTH, OUTPUT_HEIGHT)
-                display = renderer.compose_pip(
-                    buffering, frame, OUTPUT_WIDTH, OUTPUT_HEIGHT)
-
-            cv2.imshow(self.window_name, display)
-
-            key = cv2.waitKey(5) & 0xFF
-            if key == ord("q"):
+            captured_at = time.monotonic()
+            self.stats["read"].record(started, captured_at)
+            pool.prepare(raw, prepared)
+            frame = prepared.display
+            self.stats["prepare"].record(captured_at)
+            self.stats["capture"].record(started)
+
+            started = time.monotonic()
+            timestamp_ms = int(captured_at * 1000)
+            elbows, pose_results = self.detector.detect(frame, prepared.mp_image,
+                                                        timestamp_ms)
+            posed = time.monotonic()
+            self.stats["pose"].record(started, posed)
+            middle_finger = self.gesture_detector.update(
+                frame, pose_results, posed - captured_at, prepared.mp_image,
+                timestamp_ms)
+            self.stats["gesture"].record(posed)
+            self.stats["inference"].record(started)
+            self.report_violation(elbows, captured_at)
+
+            started = time.monotonic()
+            display = self.render(frame, elbows, pose_results, middle_finger,
+                                  captured_at)
+            self.stats["render"].record(started)
+            if not self.show(display, captured_at):
                 break
-            elif key == ord("r"):
-                self.reset_calibration()
 
+    def run_pipelined(self):
+        """Capture and inference run on their own threads; this thread renders.
+
+        Stages hand over through latest-wins slots, so a slow stage drops stale
+        frames instead of making the camera fall behind.
+        """
+        stop = threading.Event()
+        pool = FramePool(PIPELINE_BUFFERS, self.inference_width)
+        frames = LatestQueue(on_drop=lambda packet: pool.release(packet.prepared))
+        results = LatestQueue(on_drop=lambda result: pool.release(result.packet.prepared))
+        self.handoffs = (frames, results)
+        capture = CaptureThread(self.cap, pool, frames, stop, self.stats["capture"],
+                                self.stats["read"], self.stats["prepare"])
+        inference = InferenceThread(self.detector, self.gesture_detector,
+                                    frames, results, stop, self.stats["inference"],
+                                    self.stats["pose"], self.stats["gesture"])
+        capture.start()
+        inference.start()
+        try:
+            while capture.is_alive():
+                result = results.get(timeout=0.1)
+                if result is None:
+                    # Keep the window responsive while waiting on inference
+                    if not self.handle_key():
+                        break
+                    continue
+                self.report_violation(result.elbows, result.packet.captured_at)
+                started = time.monotonic()
+                display = self.render(result.packet.frame, result.elbows,
+                                      result.pose_results, result.middle_finger,
+                                      result.packet.captured_at)
+                self.stats["render"].record(started)
+                keep_running = self.show(display, result.packet.captured_at)
+                pool.release(result.packet.prepared)
+                if not keep_running:
+                    break
+        finally:
+            stop.set()
+            capture.join()
+            inference.join()
+        print(f"Dropped frames: {frames.dropped} before inference, "
+              f"{results.dropped} before render")
+
+    def run_headless(self, max_frames=None):
+        """Run detection, violation checks and rendering on every frame, with no GUI.
+
+        For recorded clips: frames are never dropped and timestamps come from
+        the video's frame rate. Returns a report dict of per-stage timings, FPS
+        and violation events.
+        """
+        pool = FramePool(1, self.inference_width)
+        prepared = pool.acquire()
+        fps = self.cap.get(cv2.CAP_PROP_FPS) or CAMERA_FPS
+        timings = {stage: [] for stage in
+                   ("read", "preprocess", "pose", "gesture", "render", "total")}
+        # The live tracker's debouncing, with timestamps in video seconds
+        debouncer = ViolationDebouncer(clock=lambda at: round(at, 3))
+        events = []
+        pose_frames = punishments = frames = 0
+        previous_gesture = False
+        started_run = time.perf_counter()
+
+        while self.cap.isOpened() and (max_frames is None or frames < max_frames):
+            t0 = time.perf_counter()
+            success, raw = self.cap.read()
+            if not success:
+                break
+            video_seconds = frames / fps
+            timestamp_ms = int(video_seconds * 1000)
+            t1 = time.perf_counter()
+            pool.prepare(raw, prepared)
+            frame = prepared.display
+            t2 = time.perf_counter()
+            elbows, pose_results = self.detector.detect(frame, prepared.mp_image,
+                                                        timestamp_ms)
+            t3 = time.perf_counter()
+            middle_finger = self.gesture_detector.update(
+                frame, pose_results, t3 - t0, prepared.mp_image, timestamp_ms)
+            t4 = time.perf_counter()
+            self.render(frame, elbows, pose_results, middle_finger)
+            t5 = time.perf_counter()
+
+            for stage, seconds in (("read", t1 - t0), ("preprocess", t2 - t1),
+                                   ("pose", t3 - t2), ("gesture", t4 - t3),
+                                   ("render", t5 - t4), ("total", t5 - t0)):
+                timings[stage].append(seconds)
+            event = debouncer.update(elbows, self.table_edge_x, video_seconds)
+            if event is not None:
+                events.append(event)
+            pose_frames += elbows is not None
+            punishments += middle_finger and not previous_gesture
+            previous_gesture = middle_finger
+            frames += 1
+
+        elapsed = time.perf_counter() - started_run
+        if (event := debouncer.finish()) is not None:
+            events.append(event)
+        return {
+            "frames": frames,
+            "seconds": round(elapsed, 3),
+            "fps": round(frames / elapsed, 2) if elapsed else 0.0,
+            "video_fps": fps,
+            "stages": {stage: timing_summary(values) for stage, values in timings.items()},
+            "pose_detected_frames": pose_frames,
+            "gesture_runs": self.gesture_detector.runs,
+            "punishment_triggers": punishments,
+            "violations": violation_spans(events),
+        }
+
+    def close(self):
         self.cap.release()
+        if self.clips is not None:
+            self.clips.close()  # reads the replay buffer, so stop it first
+        self.replay.close()
         self.detector.close()
         self.gesture_detector.close()
+        if self.sender is not None:
+            self.sender.close()
+        if self.bus is not None:
+            self.bus.close()
+        if self.telemetry is not None:
+            self.telemetry.close()
+
+    def run(self):
+        cv2.namedWindow(self.window_name, cv2.WINDOW_AUTOSIZE)
+        cv2.setMouseCallback(self.window_name, self.on_mouse)
+
+        print("Elbow Tracker (PiP)")
+        print(f"  Output: {OUTPUT_WIDTH}x{OUTPUT_HEIGHT}")
+        print(f"  Replay buffer: {self.replay.capacity} frames "
+              f"(~{self.replay.capacity // CAMERA_FPS}s) at "
+              f"{self.replay.width}x{self.replay.height}, "
+              f"{type(self.replay).__name__}")
+        print(f"  Loop: {'pipelined' if self.pipelined else 'serial'}")
+        print(f"  Inference width: {self.inference_width or 'camera'}")
+        print(f"  Landmarkers: {'LIVE_STREAM (async)' if self.live_stream else 'VIDEO'}, "
+              f"pose model {self.detector.variant}")
+        if self.clips is not None:
+            print(f"  Clips: {self.clips.out_dir} (on violations, 'c' to save one)")
+        if self.bus is not None:
+            print(f"  Frame bus: {self.bus.name} (framebus.py serve/record --name "
+                  f"{self.bus.name})")
+        if self.telemetry is not None:
+            print(f"  Telemetry: {self.telemetry.path} "
+                  f"(every {self.telemetry.interval:g}s)")
+        print("  Click to set table edge | 'r' to reset | 'h' stage timings | 'q' to quit")
+
+        if self.pipelined:
+            self.run_pipelined()
+        else:
+            self.run_serial()
+        print(" | ".join(stats.summary() for stats in self.stats.values()))
+        gestures = self.gesture_detector
+        if gestures.frames:
+            print(f"Gesture detection ran on {gestures.runs}/{gestures.frames} frames")
+        if self.live_stream:
+            print(f"Pose results: {self.detector.completed}/{self.detector.submitted} "
+                  "frames (the rest were dropped while the landmarker was busy)")
+        if self.zone.enabled:
+            print(f"Pose inference cropped to the table zone on {self.zone.cropped} frames, "
+                  f"full frame on {self.zone.full_frame}")
+        for old, new, fps in getattr(self.detector, "downgrades", []):
+            print(f"Pose model downgraded from {old} to {new} at {fps} fps")
+        if self.sender is not None:
+            print(f"Violation events: {self.sender.sent} sent, "
+                  f"{self.sender.dropped} rejected by the backend")
+
+        self.close()
         cv2.destroyAllWindows()
 
 
 if __name__ == "__main__":
-    camera_index = select_camera()
-    tracker = ElbowTracker(camera_index)
+    parser = argparse.ArgumentParser(description="Elbow violation tracker")
+    parser.add_argument("--serial", action="store_true",
+                        help="run capture, inference and render in one loop "
+                             "(for comparing against the threaded pipeline)")
+    parser.add_argument("--replay-backend", choices=BACKENDS, default="ring",
+                        help="ring: pre-allocated raw frames, jpeg: compressed "
+                             "in the background, deque: per-frame copies")
+    parser.add_argument("--replay-seconds", type=int, default=REPLAY_SECONDS)
+    parser.add_argument("--replay-width", type=int, default=CAMERA_WIDTH,
+                        help="replay resolution width (height keeps the camera aspect)")
+    parser.add_argument("--replay-budget-mb", type=float, default=None,
+                        help="memory cap for the replay buffer")
+    parser.add_argument("--gesture-every", type=int, default=1, metavar="N",
+                        help="run hand-gesture detection on every Nth frame")
+    parser.add_argument("--gesture-adaptive", action="store_true",
+                        help="run hand-gesture detection when the frame has time to "
+                             "spare (overrides --gesture-every)")
+    parser.add_argument("--gesture-roi", action="store_true",
+                        help="detect hands in crops around the pose wrists "
+                             "instead of the full frame")
+    parser.add_argument("--inference-width", type=int, default=None,
+                        help="downscale frames to this width for pose/hand inference "
+                             "(default: camera resolution)")
+    parser.add_argument("--live-stream", action="store_true",
+                        help="run the landmarkers asynchronously (LIVE_STREAM mode); "
+                             "frames use the newest finished landmarks")
+    parser.add_argument("--pose-model", choices=(*MODEL_VARIANTS, "auto"), default="full",
+                        help="pose landmarker variant (lite is fastest, heavy most "
+                             "accurate); auto times them at startup, picks the most "
+                             "accurate that reaches --target-fps and steps down at "
+                             "runtime if the loop falls behind")
+    parser.add_argument("--target-fps", type=float, default=CAMERA_FPS,
+                        help="frame rate --pose-model auto aims for")
+    parser.add_argument("--pose-roi", action="store_true",
+                        help="once the table edge is set, run pose detection on a crop "
+                             "around it and the player instead of the full frame")
+    parser.add_argument("--roi-margin", type=int, default=ROI_MARGIN,
+                        help="pixels kept on each side of the table edge with --pose-roi")
+    parser.add_argument("--backend", metavar="URL", default=None,
+                        help="report elbow violations to the Super Pong backend, "
+                             "e.g. http://localhost:8000")
+    parser.add_argument("--tournament", type=int, default=None,
+                        help="tournament to report violations to (with --backend)")
+    parser.add_argument("--game", type=int, default=None,
+                        help="game to attach violations to (default: the tournament's "
+                             "latest game in progress)")
+    parser.add_argument("--multi", action="store_true",
+                        help="track every discovered camera, one worker process each, "
+                             "shown side by side")
+    parser.add_argument("--clips", metavar="DIR", default=None,
+                        help="save an MP4 of the replay around each violation "
+                             "(and on 'c') to DIR, indexed in DIR/index.jsonl")
+    parser.add_argument("--frame-bus", nargs="?", const="", default=None, metavar="NAME",
+                        help="publish the rendered output to shared memory for other "
+                             "local apps (framebus.py serve/record); default name "
+                             "super-pong-cam<camera index>; single camera only")
+    parser.add_argument("--hud", action="store_true",
+                        help="start with the per-stage timing overlay shown ('h' toggles)")
+    parser.add_argument("--telemetry", metavar="FILE", default=None,
+                        help="append per-stage FPS and p50/p95/p99 latency to FILE "
+                             "as JSONL, once a second")
+    parser.add_argument("--camera", type=int, default=None, metavar="INDEX",
+                        help="use this camera index and skip discovery")
+    parser.add_argument("--rescan", action="store_true",
+                        help="probe cameras again instead of using the cached list")
+    args = parser.parse_args()
+    if args.backend and args.tournament is None:
+        parser.error("--backend needs --tournament")
+    if args.multi:
+        # Workers only annotate and tile their frames: nothing is rendered,
+        # replayed or timed per stage, and every camera is used
+        single_only = {"--frame-bus": args.frame_bus is not None,
+                       "--clips": args.clips is not None,
+                       "--hud": args.hud,
+                       "--telemetry": args.telemetry is not None,
+                       "--serial": args.serial,
+                       "--camera": args.camera is not None,
+                       "--replay-backend": args.replay_backend != "ring",
+                       "--replay-seconds": args.replay_seconds != REPLAY_SECONDS,
+                       "--replay-width": args.replay_width != CAMERA_WIDTH,
+                       "--replay-budget-mb": args.replay_budget_mb is not None}
+        given = [flag for flag, used in single_only.items() if used]
+        if given:
+            parser.error(f"{', '.join(given)}: single camera only, not with --multi")
+
+    options = {"gesture_every": args.gesture_every,
+               "gesture_adaptive": args.gesture_adaptive,
+               "gesture_roi": args.gesture_roi,
+               "inference_width": args.inference_width,
+               "live_stream": args.live_stream,
+               "pose_model": args.pose_model,
+               "target_fps": args.target_fps,
+               "pose_roi": args.pose_roi,
+               "roi_margin": args.roi_margin,
+               "backend_url": args.backend,
+               "tournament_id": args.tournament,
+               "game_id": args.game}
+    if args.multi:
+        from multicam import MultiCameraSupervisor
+
+        print("Scanning for cameras...")
+        cameras, _ = discover_cameras(rescan=args.rescan)
+        if not cameras:
+            print("No cameras found.")
+            sys.exit(1)
+        for idx, name in cameras:
+            print(f"Using: {name} (index {idx})")
+        MultiCameraSupervisor([idx for idx, _ in cameras],
+                              (OUTPUT_WIDTH, OUTPUT_HEIGHT),
+                              (CAMERA_WIDTH, CAMERA_HEIGHT), options).run()
+        sys.exit(0)
+
+    if args.camera is not None:
+        camera_index, cap = args.camera, None
+    else:
+        camera_index, cap = select_camera(rescan=args.rescan)
+    frame_bus = args.frame_bus
+    if frame_bus == "":
+        frame_bus = bus_name(camera_index)
+    tracker = ElbowTracker(camera_index, pipelined=not args.serial, cap=cap,
+                           replay_backend=args.replay_backend,
+                           replay_seconds=args.replay_seconds,
+                           replay_width=args.replay_width,
+                           replay_budget_mb=args.replay_budget_mb,
+                           clip_dir=args.clips,
+                           frame_bus=frame_bus,
+                           hud=args.hud,
+                           telemetry_path=args.telemetry,
+                           **options)
     tracker.run()
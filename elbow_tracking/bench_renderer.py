@@ -0,0 +1,90 @@
+"""Benchmark: per-frame cost of composing the output, old functions vs PipCompositor.
+
+Times the three per-frame paths the tracker takes (replay PiP, loading screen
+while the replay buffer fills, punishment banner) on random 1280x720 frames,
+and checks that both versions produce the same pixels.
+
+Usage:
+    uv run --package elbow-tracking python elbow_tracking/bench_renderer.py [--frames 300]
+"""
+
+import argparse
+import statistics
+import time
+
+import numpy as np
+import renderer
+
+LIVE_W, LIVE_H = 1280, 720
+OUT_W, OUT_H = 1920, 1080
+
+
+def old_pip(replay, live, _):
+    return renderer.compose_pip(replay, live, OUT_W, OUT_H)
+
+
+def new_pip(replay, live, compositor):
+    return compositor.compose(replay, live)
+
+
+def old_buffering(_, live, __):
+    return renderer.compose_pip(renderer.draw_buffering(OUT_W, OUT_H), live, OUT_W, OUT_H)
+
+
+def new_buffering(_, live, compositor):
+    return compositor.compose(None, live)
+
+
+def old_punishment(_, live, __):
+    renderer.draw_punishment(live)
+    return live
+
+
+def new_punishment(_, live, compositor):
+    compositor.draw_punishment(live)
+    return live
+
+
+CASES = [
+    ("replay PiP", old_pip, new_pip),
+    ("loading screen", old_buffering, new_buffering),
+    ("punishment", old_punishment, new_punishment),
+]
+
+
+def time_case(fn, frames, compositor):
+    replays, lives = frames
+    costs = []
+    for replay, live in zip(replays, lives):
+        live = live.copy()  # punishment draws in place
+        start = time.perf_counter()
+        fn(replay, live, compositor)
+        costs.append(time.perf_counter() - start)
+    return statistics.median(costs) * 1000, sorted(costs)[int(len(costs) * 0.95) - 1] * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--frames", type=int, default=300)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    pool = [rng.integers(0, 256, (LIVE_H, LIVE_W, 3), dtype=np.uint8) for _ in range(8)]
+    frames = ([pool[i % 8] for i in range(args.frames)],
+              [pool[(i + 3) % 8] for i in range(args.frames)])
+    compositor = renderer.PipCompositor(OUT_W, OUT_H, LIVE_W, LIVE_H)
+
+    print(f"{args.frames} frames, {LIVE_W}x{LIVE_H} -> {OUT_W}x{OUT_H}\n")
+    print(f"{'path':<16} {'old p50':>8} {'old p95':>8} {'new p50':>8} {'new p95':>8} "
+          f"{'same':>5}")
+    for name, old, new in CASES:
+        same = np.array_equal(old(pool[0], pool[1].copy(), None),
+                              new(pool[0], pool[1].copy(), compositor))
+        old_p50, old_p95 = time_case(old, frames, None)
+        new_p50, new_p95 = time_case(new, frames, compositor)
+        print(f"{name:<16} {old_p50:>8.3f} {old_p95:>8.3f} {new_p50:>8.3f} "
+              f"{new_p95:>8.3f} {same!s:>5}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""Benchmark: replay buffer memory and per-frame cost for each backend.
+
+Each backend runs in its own subprocess on the same synthetic 1280x720 clip,
+so its RSS growth is measured in isolation. Per-frame cost covers what the render
+loop pays: push() plus delayed_frame() once the buffer is full.
+
+Usage:
+    uv run --package elbow-tracking python elbow_tracking/bench_replay.py [--frames 600]
+"""
+
+import argparse
+import json
+import platform
+import resource
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import cv2
+import numpy as np
+from replay import BACKENDS, create_replay_buffer
+
+WIDTH = 1280
+HEIGHT = 720
+
+
+def rss_mb():
+    """Current resident set size. Falls back to the peak where /proc is missing."""
+    statm = Path("/proc/self/statm")
+    if statm.exists():
+        pages = int(statm.read_text().split()[1])
+        return pages * resource.getpagesize() / (1024 * 1024)
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is bytes on macOS, kilobytes on Linux
+    return peak / (1024 * 1024) if platform.system() == "Darwin" else peak / 1024
+
+
+def synthetic_frames(count):
+    """Camera-like frames: a gradient background, sensor noise and a moving block."""
+    rng = np.random.default_rng(0)
+    base = np.zeros((HEIGHT, WIDTH, 3), dtype=np.uint8)
+    base[:, :, 0] = np.linspace(40, 200, WIDTH, dtype=np.uint8)
+    base[:, :, 1] = np.linspace(60, 160, HEIGHT, dtype=np.uint8)[:, None]
+    noise = [rng.integers(0, 12, (HEIGHT, WIDTH, 3), dtype=np.uint8) for _ in range(8)]
+    for i in range(count):
+        frame = cv2.add(base, noise[i % len(noise)])
+        x = (i * 7) % (WIDTH - 200)
+        cv2.rectangle(frame, (x, 200), (x + 200, 500), (30, 30, 220), -1)
+        cv2.putText(frame, f"frame {i}", (40, 80), cv2.FONT_HERSHEY_SIMPLEX, 1.5,
+                    (255, 255, 255), 3)
+        yield frame
+
+
+def worker(backend, frames, seconds, budget_mb):
+    # A small pool of distinct frames, so the clip itself barely adds to RSS
+    pool = list(synthetic_frames(30))
+    baseline = rss_mb()
+    buffer = create_replay_buffer(backend, seconds * 30, WIDTH, HEIGHT, budget_mb)
+    costs = []
+    for i in range(frames):
+        frame = pool[i % len(pool)]
+        start = time.perf_counter()
+        buffer.push(frame)
+        if buffer.is_full():
+            buffer.delayed_frame()
+        costs.append(time.perf_counter() - start)
+    # Let the JPEG encoder catch up so its memory is counted
+    while frames >= buffer.capacity and not buffer.is_full():
+        time.sleep(0.01)
+    result = {
+        "rss_mb": round(rss_mb() - baseline, 1),
+        "buffer_mb": round(buffer.memory_bytes() / (1024 * 1024), 1),
+        "mean_ms": round(statistics.fmean(costs) * 1000, 3),
+        "p95_ms": round(sorted(costs)[int(len(costs) * 0.95) - 1] * 1000, 3),
+    }
+    buffer.close()
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--frames", type=int, default=600)
+    parser.add_argument("--seconds", type=int, default=10, help="replay length at 30 fps")
+    parser.add_argument("--budget-mb", type=float, default=None)
+    parser.add_argument("--worker", choices=BACKENDS, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        print(json.dumps(worker(args.worker, args.frames, args.seconds, args.budget_mb)))
+        return
+
+    print(f"{args.frames} frames at {WIDTH}x{HEIGHT}, {args.seconds}s replay\n")
+    print(f"{'backend':<8} {'RSS MB':>8} {'buffer MB':>10} {'mean ms':>8} {'p95 ms':>8}")
+    for backend in BACKENDS:
+        cmd = [sys.executable, str(Path(__file__).resolve()), f"--worker={backend}",
+               f"--frames={args.frames}", f"--seconds={args.seconds}"]
+        if args.budget_mb is not None:
+            cmd.append(f"--budget-mb={args.budget_mb}")
+        r = json.loads(subprocess.check_output(cmd, text=True).strip().splitlines()[-1])
+        print(f"{backend:<8} {r['rss_mb']:>8} {r['buffer_mb']:>10} "
+              f"{r['mean_ms']:>8} {r['p95_ms']:>8}")
+
+
+if __name__ == "__main__":
+    main()
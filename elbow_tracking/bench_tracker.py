@@ -0,0 +1,127 @@
+"""Headless tracker benchmark: run the full pipeline on a recorded clip, no camera or window.
+
+Every frame goes through preprocessing, pose and gesture detection, the
+violation check and rendering, serially and without dropping frames. Per-stage
+timings, FPS and violation events are written to a JSON report. --compare runs
+a set of configurations (pose model, inference resolution, gesture scheduling)
+on the same clip, each in its own process, and prints a table.
+
+Usage:
+    uv run --package elbow-tracking python elbow_tracking/bench_tracker.py CLIP \
+        [--table-edge 640] [--report report.json] [--pose-model lite] \
+        [--inference-width 640] [--gesture-every 3] [--gesture-roi]
+    uv run --package elbow-tracking python elbow_tracking/bench_tracker.py CLIP --compare
+
+CLIP is a video file, or "synthetic[:frames]" for a generated test pattern.
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+from detector import MODEL_VARIANTS
+
+COMPARE_CONFIGS = [
+    ("baseline", {}),
+    ("lite model", {"pose_model": "lite"}),
+    ("heavy model", {"pose_model": "heavy"}),
+    ("640px inference", {"inference_width": 640}),
+    ("gesture every 3", {"gesture_every": 3}),
+    ("gesture adaptive", {"gesture_adaptive": True}),
+    ("gesture ROI", {"gesture_roi": True}),
+    ("lite + 640px + ROI", {"pose_model": "lite", "inference_width": 640,
+                            "gesture_roi": True}),
+]
+
+
+def run_config(source, config, table_edge, max_frames):
+    from app import ElbowTracker
+    from detector import model_path
+    from gesture import MODEL_PATH as HAND_MODEL_PATH
+    from headless import open_source
+
+    for path in (model_path(config.get("pose_model", "full")), HAND_MODEL_PATH):
+        if not Path(path).exists():
+            return {"error": f"missing {Path(path).name}"}
+    tracker = ElbowTracker(pipelined=False, cap=open_source(source), **config)
+    tracker.table_edge_x = table_edge
+    tracker.calibrating = table_edge is None
+    try:
+        report = tracker.run_headless(max_frames)
+    finally:
+        tracker.close()
+    return {"source": source, "config": config, "table_edge_x": table_edge, **report}
+
+
+def compare(args):
+    print(f"{args.clip}: {len(COMPARE_CONFIGS)} configurations\n")
+    print(f"{'config':<20} {'fps':>7} {'pose p50':>9} {'gesture p50':>12} "
+          f"{'total p95':>10} {'violations':>11}")
+    reports = {}
+    for name, config in COMPARE_CONFIGS:
+        cmd = [sys.executable, str(Path(__file__).resolve()), args.clip,
+               f"--worker-config={json.dumps(config)}"]
+        if args.table_edge is not None:
+            cmd.append(f"--table-edge={args.table_edge}")
+        if args.max_frames is not None:
+            cmd.append(f"--max-frames={args.max_frames}")
+        r = json.loads(subprocess.check_output(cmd, text=True).strip().splitlines()[-1])
+        reports[name] = r
+        if "error" in r:
+            print(f"{name:<20} skipped: {r['error']}")
+            continue
+        stages = r["stages"]
+        print(f"{name:<20} {r['fps']:>7} {stages['pose']['p50_ms']:>9} "
+              f"{stages['gesture']['p50_ms']:>12} {stages['total']['p95_ms']:>10} "
+              f"{len(r['violations']):>11}")
+    return reports
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("clip", help='video file, or "synthetic[:frames]"')
+    parser.add_argument("--table-edge", type=int, default=None,
+                        help="table edge x in camera pixels (after the mirror flip)")
+    parser.add_argument("--max-frames", type=int, default=None)
+    parser.add_argument("--report", default=None, help="write the JSON report here")
+    parser.add_argument("--compare", action="store_true",
+                        help="run every configuration in COMPARE_CONFIGS")
+    parser.add_argument("--pose-model", choices=MODEL_VARIANTS, default="full")
+    parser.add_argument("--inference-width", type=int, default=None)
+    parser.add_argument("--gesture-every", type=int, default=1)
+    parser.add_argument("--gesture-adaptive", action="store_true")
+    parser.add_argument("--gesture-roi", action="store_true")
+    parser.add_argument("--worker-config", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker_config is not None:
+        config = json.loads(args.worker_config)
+        print(json.dumps(run_config(args.clip, config, args.table_edge, args.max_frames)))
+        return
+
+    if args.compare:
+        report = compare(args)
+    else:
+        config = {"pose_model": args.pose_model,
+                  "inference_width": args.inference_width,
+                  "gesture_every": args.gesture_every,
+                  "gesture_adaptive": args.gesture_adaptive,
+                  "gesture_roi": args.gesture_roi}
+        report = run_config(args.clip, config, args.table_edge, args.max_frames)
+        if "error" in report:
+            raise SystemExit(report["error"])
+        print(f"{report['frames']} frames in {report['seconds']}s "
+              f"({report['fps']} fps), {len(report['violations'])} violations")
+        for stage, summary in report["stages"].items():
+            print(f"  {stage:<11} p50 {summary['p50_ms']:>8} ms  "
+                  f"p95 {summary['p95_ms']:>8} ms")
+
+    if args.report:
+        Path(args.report).write_text(json.dumps(report, indent=2))
+        print(f"Report written to {args.report}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,190 @@
+"""Violation clips: MP4 exports of the replay buffer, written in the background.
+
+Clips are indexed in <clip dir>/index.jsonl by wall-clock time, so a disputed
+shot can be matched to its footage:
+
+    uv run --package elbow-tracking python elbow_tracking/clips.py clips \
+        --at 2026-05-01T21:14:03Z [--window 10]
+"""
+
+import argparse
+import json
+import queue
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import cv2
+
+CLIP_BEFORE = 4.0   # seconds of footage before the trigger
+CLIP_AFTER = 2.0    # seconds after it
+CLIP_SLACK = 1.0    # seconds of replay kept free so the encoder can't be lapped
+
+
+def _wall_seconds(monotonic_at):
+    return time.time() - (time.monotonic() - monotonic_at)
+
+
+def _utc(seconds):
+    return datetime.fromtimestamp(seconds, timezone.utc)
+
+
+@dataclass
+class ClipJob:
+    name: str
+    reason: str
+    violation_id: str | None
+    triggered_at: datetime
+    start: float  # wall-clock seconds of the footage to keep
+    end: float
+
+
+class ClipExporter(threading.Thread):
+    """Encodes replay-buffer windows to MP4 without stalling the camera loop.
+
+    The camera loop calls mark() with the sequence number each replay push
+    returns, so every frame in the buffer has its capture time; the loop
+    drops frames under load, so frame counts can't stand in for time.
+    trigger() only records the time window a clip covers. This thread waits
+    for the frames after the trigger to arrive, then reads the window
+    straight out of the replay buffer and encodes it, while the buffer keeps
+    filling.
+    """
+
+    def __init__(self, replay, out_dir, fps, camera=None,
+                 before=CLIP_BEFORE, after=CLIP_AFTER):
+        super().__init__(name="clip-exporter", daemon=True)
+        self.replay = replay
+        self.out_dir = Path(out_dir)
+        self.out_dir.mkdir(parents=True, exist_ok=True)
+        self.index_path = self.out_dir / "index.jsonl"
+        self.fps = fps  # only for clips too short to measure a frame rate
+        self.camera = camera
+        self.before = before
+        self.after = after
+        # Capture time (wall-clock seconds) of replay frame n, at n % capacity
+        self._times = [0.0] * replay.capacity
+        self.written = 0
+        self._jobs = queue.Queue()
+        self._stop_event = threading.Event()
+
+    def mark(self, seq, captured_at):
+        """Record the capture time (time.monotonic()) of replay frame `seq`."""
+        self._times[seq % self.replay.capacity] = _wall_seconds(captured_at)
+
+    def trigger(self, reason, violation_id=None, at=None):
+        """Schedule a clip around capture time `at` (default now). Returns its name."""
+        now = _wall_seconds(time.monotonic() if at is None else at)
+        triggered_at = _utc(now)
+        camera = "" if self.camera is None else f"_cam{self.camera}"
+        name = f"{triggered_at:%Y%m%d-%H%M%S-%f}{camera}_{reason}.mp4"
+        self._jobs.put(ClipJob(name, reason, violation_id, triggered_at,
+                               now - self.before, now + self.after))
+        return name
+
+    def _newest_time(self):
+        pushed = self.replay.pushed
+        return self._times[(pushed - 1) % self.replay.capacity] if pushed else 0.0
+
+    def run(self):
+        while not self._stop_event.is_set() or not self._jobs.empty():
+            try:
+                job = self._jobs.get(timeout=0.1)
+            except queue.Empty:
+                continue
+            # Wait for the footage after the trigger; on shutdown, take what exists
+            while self._newest_time() < job.end and not self._stop_event.is_set():
+                time.sleep(0.05)
+            self._export(job)
+
+    def _window(self, job):
+        """(seq, capture time) of the buffered frames inside the job's window."""
+        pushed, capacity = self.replay.pushed, self.replay.capacity
+        oldest = max(0, pushed - capacity)
+        start = job.start
+        if pushed > capacity:
+            # Leave the oldest frames alone so the encoder can't be lapped
+            start = max(start, self._times[oldest % capacity] + CLIP_SLACK)
+        window = [(seq, self._times[seq % capacity]) for seq in range(oldest, pushed)]
+        return [(seq, t) for seq, t in window if start <= t <= job.end]
+
+    def _export(self, job):
+        window = self._window(job)
+        if not window:
+            return
+        first, last = window[0][1], window[-1][1]
+        # Play back at the rate the frames were rendered, so clips run in real time
+        fps = (len(window) - 1) / (last - first) if last > first else self.fps
+        path = self.out_dir / job.name
+        writer = None
+        frames = lost = 0
+        for seq, _ in window:
+            frame = self.replay.frame_at(seq)
+            if frame is None:
+                lost += 1
+                continue
+            if writer is None:
+                height, width = frame.shape[:2]
+                writer = cv2.VideoWriter(str(path), cv2.VideoWriter_fourcc(*"mp4v"),
+                                         fps, (width, height))
+            writer.write(frame)
+            frames += 1
+        if writer is None:
+            return
+        writer.release()
+        entry = {"file": job.name, "reason": job.reason,
+                 "violation_id": job.violation_id, "camera": self.camera,
+                 "triggered_at": job.triggered_at.isoformat(),
+                 "started_at": _utc(first).isoformat(),
+                 "ended_at": _utc(last + 1 / fps).isoformat(),
+                 "fps": round(fps, 1), "frames": frames, "frames_lost": lost}
+        with self.index_path.open("a") as index:
+            index.write(json.dumps(entry) + "\n")
+        self.written += 1
+        print(f"Clip saved: {path} ({frames} frames)")
+
+    def close(self):
+        """Finish queued clips with whatever footage exists, then stop."""
+        self._stop_event.set()
+        self.join()
+
+
+def load_index(out_dir):
+    index_path = Path(out_dir) / "index.jsonl"
+    if not index_path.exists():
+        return []
+    return [json.loads(line) for line in index_path.read_text().splitlines() if line]
+
+
+def clips_near(out_dir, at, window=10.0):
+    """Clips whose footage overlaps [at - window, at], e.g. the seconds before a shot."""
+    earliest = at - timedelta(seconds=window)
+    return [entry for entry in load_index(out_dir)
+            if datetime.fromisoformat(entry["started_at"]) <= at
+            and datetime.fromisoformat(entry["ended_at"]) >= earliest]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Find violation clips by time")
+    parser.add_argument("clip_dir")
+    parser.add_argument("--at", required=True,
+                        help="ISO timestamp, e.g. a shot's timestamp from the backend")
+    parser.add_argument("--window", type=float, default=10.0,
+                        help="seconds before --at to search")
+    args = parser.parse_args()
+
+    at = datetime.fromisoformat(args.at)
+    if at.tzinfo is None:
+        at = at.replace(tzinfo=timezone.utc)
+    matches = clips_near(args.clip_dir, at, args.window)
+    if not matches:
+        print("No clips found")
+    for entry in matches:
+        print(f"{Path(args.clip_dir) / entry['file']}  {entry['reason']}  "
+              f"{entry['started_at']} .. {entry['ended_at']}")
+
+
+if __name__ == "__main__":
+    main()
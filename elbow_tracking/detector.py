@@ -1,11 +1,23 @@
-import mediapipe as mp
-import cv2
+import threading
+import time
 from dataclasses import dataclass
 from pathlib import Path
 
-MODEL_PATH = str(Path(__file__).parent / "pose_landmarker_full.task")
+import cv2
+import mediapipe as mp
+import numpy as np
+
+MODEL_VARIANTS = ("lite", "full", "heavy")  # fastest to most accurate
+
+
+def model_path(variant):
+    return str(Path(__file__).parent / f"pose_landmarker_{variant}.task")
+
+
+MODEL_PATH = model_path("full")
 
 PoseLandmark = mp.tasks.vision.PoseLandmark
+RunningMode = mp.tasks.vision.RunningMode
 
 
 @dataclass
@@ -16,27 +28,107 @@ class ElbowPositions:
     left_y: int
 
 
+def next_timestamp(previous, timestamp_ms=None):
+    """MediaPipe needs strictly increasing timestamps; default to the monotonic clock."""
+    if timestamp_ms is None:
+        timestamp_ms = int(time.monotonic() * 1000)
+    return max(int(timestamp_ms), previous + 1)
+
+
+def crop_image(mp_image, roi):
+    """Crop an mp.Image to a normalized (x0, y0, x1, y1) box.
+
+    Returns the crop and its (x, y, width, height) in normalized source
+    coordinates, snapped to whole pixels, for mapping landmarks back.
+    """
+    rgb = mp_image.numpy_view()
+    height, width = rgb.shape[:2]
+    x0, y0 = int(roi[0] * width), int(roi[1] * height)
+    x1, y1 = round(roi[2] * width), round(roi[3] * height)
+    crop = np.ascontiguousarray(rgb[y0:y1, x0:x1])
+    offset = (x0 / width, y0 / height, (x1 - x0) / width, (y1 - y0) / height)
+    return mp.Image(image_format=mp.ImageFormat.SRGB, data=crop), offset
+
+
+def uncrop_landmarks(results, offset):
+    """Map landmarks detected in a crop back to full-frame normalized coordinates."""
+    x, y, width, height = offset
+    for landmarks in results.pose_landmarks:
+        for lm in landmarks:
+            lm.x = x + lm.x * width
+            lm.y = y + lm.y * height
+
+
 class PoseDetector:
-    def __init__(self, min_detection_confidence=0.8, min_tracking_confidence=0.8):
+    def __init__(self, min_detection_confidence=0.8, min_tracking_confidence=0.8,
+                 live_stream=False, variant="full", zone=None):
+        self.live_stream = live_stream
+        self.variant = variant
+        self.zone = zone  # table_zone.TableZone: crop inference to the table area
         options = mp.tasks.vision.PoseLandmarkerOptions(
-            base_options=mp.tasks.BaseOptions(model_asset_path=MODEL_PATH),
-            running_mode=mp.tasks.vision.RunningMode.VIDEO,
+            base_options=mp.tasks.BaseOptions(model_asset_path=model_path(variant)),
+            running_mode=RunningMode.LIVE_STREAM if live_stream else RunningMode.VIDEO,
             min_pose_detection_confidence=min_detection_confidence,
             min_tracking_confidence=min_tracking_confidence,
+            result_callback=self._on_result if live_stream else None,
         )
         self.landmarker = mp.tasks.vision.PoseLandmarker.create_from_options(options)
         self.frame_timestamp = 0
+        # LIVE_STREAM bookkeeping: newest result, and how many frames were
+        # submitted vs. answered (MediaPipe drops frames while it is busy)
+        self._latest = None
+        self._lock = threading.Lock()
+        self.submitted = 0
+        self.completed = 0
+        self._crop_offsets = {}  # LIVE_STREAM: timestamp -> crop, until its result arrives
+
+    def _on_result(self, results, output_image, timestamp_ms):
+        with self._lock:
+            # Frames MediaPipe skipped never call back; forget their crops too
+            while self._crop_offsets and next(iter(self._crop_offsets)) < timestamp_ms:
+                del self._crop_offsets[next(iter(self._crop_offsets))]
+            offset = self._crop_offsets.pop(timestamp_ms, None)
+            if offset is not None:
+                uncrop_landmarks(results, offset)
+            self._latest = results
+            self.completed += 1
+
+    def detect(self, frame, mp_image=None, timestamp_ms=None):
+        """Process a frame and return elbow positions, or None if no pose detected.
 
-    def detect(self, frame):
-        """Process a frame and return elbow positions, or None if no pose detected."""
+        `mp_image` may be a prepared (possibly downscaled) RGB copy of `frame`.
+        Positions are always in `frame`'s pixel space. `timestamp_ms` should be
+        the capture time. In LIVE_STREAM mode the frame is queued and the newest
+        finished result (usually from an earlier frame) is returned immediately.
+        With a table zone, inference runs on its crop and landmarks are mapped
+        back to the full frame.
+        """
         height, width, _ = frame.shape
-        rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        mp_image = mp.Image(image_format=mp.ImageFormat.SRGB, data=rgb)
+        if mp_image is None:
+            rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+            mp_image = mp.Image(image_format=mp.ImageFormat.SRGB, data=rgb)
+        roi = self.zone.roi(width) if self.zone is not None else None
+        offset = None
+        if roi is not None:
+            mp_image, offset = crop_image(mp_image, roi)
 
-        self.frame_timestamp += 33  # ~30fps
-        results = self.landmarker.detect_for_video(mp_image, self.frame_timestamp)
+        self.frame_timestamp = next_timestamp(self.frame_timestamp, timestamp_ms)
+        if self.live_stream:
+            with self._lock:
+                if offset is not None:
+                    self._crop_offsets[self.frame_timestamp] = offset
+            self.landmarker.detect_async(mp_image, self.frame_timestamp)
+            with self._lock:
+                self.submitted += 1
+                results = self._latest
+        else:
+            results = self.landmarker.detect_for_video(mp_image, self.frame_timestamp)
+            if offset is not None and results.pose_landmarks:
+                uncrop_landmarks(results, offset)
+        if self.zone is not None:
+            self.zone.update(results)
 
-        if not results.pose_landmarks or len(results.pose_landmarks) == 0:
+        if results is None or not results.pose_landmarks:
             return None, results
 
         landmarks = results.pose_landmarks[0]
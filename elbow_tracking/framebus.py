@@ -0,0 +1,230 @@
+"""Shared-memory frame bus: the tracker's rendered output for other local processes.
+
+The tracker renders straight into a ring of frame slots in shared memory and
+stamps each slot with a sequence number. Readers copy the newest slot and
+re-check its stamp, so they never lock or slow the tracker; a reader that
+falls behind just skips frames.
+
+Usage (with the tracker running with --frame-bus):
+    uv run --package elbow-tracking python elbow_tracking/framebus.py serve \
+        [--name super-pong-cam0] [--port 8080]     # MJPEG at http://host:8080/
+    uv run --package elbow-tracking python elbow_tracking/framebus.py record \
+        out.mp4 [--name super-pong-cam0]
+"""
+
+import argparse
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from multiprocessing import resource_tracker, shared_memory
+
+import cv2
+import numpy as np
+
+MAGIC = 0x53504642  # "SPFB"
+HEADER_BYTES = 4096  # frames start page-aligned after the header
+# Header fields (int64): magic, width, height, slots, latest seq, then one seq per slot
+MAGIC_FIELD, WIDTH, HEIGHT, SLOTS, LATEST = range(5)
+SLOT_SEQS = 5
+WRITING = -1  # slot seq while the publisher is rendering into it
+DEFAULT_SLOTS = 4
+
+
+def bus_name(camera_index):
+    return f"super-pong-cam{camera_index}"
+
+
+def _views(shm, slots, height, width):
+    header = np.ndarray((SLOT_SEQS + slots,), dtype=np.int64, buffer=shm.buf)
+    frames = np.ndarray((slots, height, width, 3), dtype=np.uint8, buffer=shm.buf,
+                        offset=HEADER_BYTES)
+    return header, frames
+
+
+class FrameBus:
+    """Publisher side. begin() hands out the next slot to render into, commit() publishes it."""
+
+    def __init__(self, name, width, height, slots=DEFAULT_SLOTS):
+        self.name = name
+        size = HEADER_BYTES + slots * height * width * 3
+        try:
+            self.shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        except FileExistsError:
+            # Left behind by a tracker that crashed; nobody can be publishing to it
+            stale = shared_memory.SharedMemory(name=name)
+            stale.close()
+            stale.unlink()
+            self.shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        self.header, self.frames = _views(self.shm, slots, height, width)
+        self.header[:] = 0
+        self.header[SLOT_SEQS:] = WRITING
+        self.header[WIDTH], self.header[HEIGHT], self.header[SLOTS] = width, height, slots
+        self.header[MAGIC_FIELD] = MAGIC
+        self.seq = 0
+        self._slot = None
+
+    def begin(self):
+        """The slot for the next frame, as a (H, W, 3) view. Readers skip it until commit()."""
+        self._slot = (self.seq + 1) % len(self.frames)
+        self.header[SLOT_SEQS + self._slot] = WRITING
+        return self.frames[self._slot]
+
+    def commit(self):
+        self.seq += 1
+        self.header[SLOT_SEQS + self._slot] = self.seq
+        self.header[LATEST] = self.seq
+
+    def publish(self, frame):
+        """Copy a frame in, for callers that didn't render into begin()'s slot."""
+        np.copyto(self.begin(), frame)
+        self.commit()
+
+    def close(self):
+        del self.header, self.frames
+        self.shm.close()
+        self.shm.unlink()
+
+
+class FrameBusReader:
+    """Reader side. Attaching and reading never blocks or slows the publisher."""
+
+    def __init__(self, name):
+        try:
+            self.shm = shared_memory.SharedMemory(name=name, track=False)
+        except TypeError:  # Python < 3.13: stop the resource tracker unlinking it on exit
+            self.shm = shared_memory.SharedMemory(name=name)
+            resource_tracker.unregister(self.shm._name, "shared_memory")
+        header = np.ndarray((SLOT_SEQS,), dtype=np.int64, buffer=self.shm.buf)
+        if header[MAGIC_FIELD] != MAGIC:
+            raise ValueError(f"{name} is not a frame bus")
+        self.width, self.height = int(header[WIDTH]), int(header[HEIGHT])
+        slots = int(header[SLOTS])
+        del header
+        self.header, self.frames = _views(self.shm, slots, self.height, self.width)
+        self.last_seq = 0
+        self.skipped = 0  # frames published that this reader never saw
+
+    def read(self, dst=None):
+        """Copy the newest frame into dst (allocated if None).
+
+        Returns (seq, frame), or None if nothing new was published since the
+        last read.
+        """
+        for _ in range(3):
+            seq = int(self.header[LATEST])
+            if seq == self.last_seq:
+                return None
+            slot = seq % len(self.frames)
+            if dst is None:
+                dst = np.empty_like(self.frames[slot])
+            np.copyto(dst, self.frames[slot])
+            if self.header[SLOT_SEQS + slot] == seq:  # not reused while we copied
+                self.skipped += max(0, seq - self.last_seq - 1)
+                self.last_seq = seq
+                return seq, dst
+        return None
+
+    def wait(self, dst=None, timeout=1.0, poll=0.002):
+        """Like read(), but wait up to `timeout` seconds for a new frame."""
+        deadline = time.monotonic() + timeout
+        while True:
+            result = self.read(dst)
+            if result is not None or time.monotonic() >= deadline:
+                return result
+            time.sleep(poll)
+
+    def close(self):
+        del self.header, self.frames
+        self.shm.close()
+
+
+class MjpegServer(ThreadingHTTPServer):
+    """Serves the bus as an MJPEG stream. Each frame is encoded once for all clients."""
+
+    daemon_threads = True
+
+    def __init__(self, reader, port, quality=80):
+        super().__init__(("", port), _MjpegHandler)
+        self.reader = reader
+        self.quality = quality
+        self.jpeg = None
+        self.cond = threading.Condition()
+        threading.Thread(target=self._encode_loop, name="mjpeg-encoder", daemon=True).start()
+
+    def _encode_loop(self):
+        frame = np.empty((self.reader.height, self.reader.width, 3), dtype=np.uint8)
+        while True:
+            if self.reader.wait(frame) is None:
+                continue
+            ok, jpeg = cv2.imencode(".jpg", frame, [cv2.IMWRITE_JPEG_QUALITY, self.quality])
+            if ok:
+                with self.cond:
+                    self.jpeg = jpeg.tobytes()
+                    self.cond.notify_all()
+
+
+class _MjpegHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header("Content-Type", "multipart/x-mixed-replace; boundary=frame")
+        self.end_headers()
+        try:
+            while True:
+                with self.server.cond:
+                    self.server.cond.wait()
+                    jpeg = self.server.jpeg
+                self.wfile.write(b"--frame\r\nContent-Type: image/jpeg\r\n"
+                                 + f"Content-Length: {len(jpeg)}\r\n\r\n".encode()
+                                 + jpeg + b"\r\n")
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+    def log_message(self, format, *args):
+        pass
+
+
+def record(reader, path, fps):
+    frame = np.empty((reader.height, reader.width, 3), dtype=np.uint8)
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"mp4v"), fps,
+                             (reader.width, reader.height))
+    frames = 0
+    print(f"Recording to {path}, Ctrl-C to stop")
+    try:
+        while True:
+            if reader.wait(frame) is not None:
+                writer.write(frame)
+                frames += 1
+    except KeyboardInterrupt:
+        pass
+    finally:
+        writer.release()
+    print(f"{frames} frames recorded, {reader.skipped} skipped")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("command", choices=("serve", "record"))
+    parser.add_argument("output", nargs="?", help="video file for record")
+    parser.add_argument("--name", default=bus_name(0), help="bus to attach to")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--quality", type=int, default=80, help="MJPEG quality")
+    parser.add_argument("--fps", type=float, default=30)
+    args = parser.parse_args()
+
+    reader = FrameBusReader(args.name)
+    print(f"Attached to {args.name}: {reader.width}x{reader.height}")
+    if args.command == "record":
+        if not args.output:
+            parser.error("record needs an output file")
+        record(reader, args.output, args.fps)
+    else:
+        print(f"MJPEG stream on http://localhost:{args.port}/")
+        try:
+            MjpegServer(reader, args.port, args.quality).serve_forever()
+        except KeyboardInterrupt:
+            pass
+    reader.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,13 @@
 import math
+import time
 
 import mediapipe as mp
 import cv2
+import numpy as np
 from pathlib import Path
 
+from detector import RunningMode, next_timestamp
+
 MODEL_PATH = str(Path(__file__).parent / "hand_landmarker.task")
 
 # Hand landmark indices (see MediaPipe hand landmark model documentation).
@@ -18,6 +22,17 @@ FINGERS = {
 EXTENDED_THRESHOLD = 1.5   # tip/mcp distance ratio to count as extended
 CURLED_THRESHOLD = 1.2     # below this counts as curled
 
+# Wrist ROI crops, built from the same frame's pose landmarks.
+PoseLandmark = mp.tasks.vision.PoseLandmark
+ARMS = (
+    (PoseLandmark.LEFT_ELBOW, PoseLandmark.LEFT_WRIST),
+    (PoseLandmark.RIGHT_ELBOW, PoseLandmark.RIGHT_WRIST),
+)
+ROI_SIZE = 192              # each crop is resized to ROI_SIZE x ROI_SIZE
+ROI_SCALE = 1.6             # crop side as a multiple of forearm length
+ROI_MIN_SIDE = 96           # px, so far-away hands still get some context
+MIN_WRIST_VISIBILITY = 0.5
+
 
 def _dist(a, b):
     return math.sqrt((a.x - b.x) ** 2 + (a.y - b.y) ** 2 + (a.z - b.z) ** 2)
@@ -43,27 +58,161 @@ def _is_middle_finger(landmarks):
     return middle_extended and others_curled
 
 
+def wrist_rois(pose_results, width, height):
+    """Square pixel boxes (x1, y1, x2, y2) around each visible wrist.
+
+    The hand sits beyond the wrist, so each box is pushed out along the forearm.
+    """
+    if not pose_results or not pose_results.pose_landmarks:
+        return []
+    landmarks = pose_results.pose_landmarks[0]
+    boxes = []
+    for elbow_idx, wrist_idx in ARMS:
+        elbow, wrist = landmarks[elbow_idx], landmarks[wrist_idx]
+        if wrist.visibility is not None and wrist.visibility < MIN_WRIST_VISIBILITY:
+            continue
+        ex, ey = elbow.x * width, elbow.y * height
+        wx, wy = wrist.x * width, wrist.y * height
+        cx, cy = wx + (wx - ex) * 0.5, wy + (wy - ey) * 0.5
+        side = int(min(max(math.hypot(wx - ex, wy - ey) * ROI_SCALE, ROI_MIN_SIDE),
+                       width, height))
+        # Shift (rather than clip) boxes at the frame edge so they stay square
+        x1 = int(min(max(cx - side / 2, 0), width - side))
+        y1 = int(min(max(cy - side / 2, 0), height - side))
+        boxes.append((x1, y1, x1 + side, y1 + side))
+    return boxes
+
+
+class GestureSchedule:
+    """Decides which frames run hand detection.
+
+    Fixed mode runs every Nth frame. Adaptive mode runs whenever the frame still
+    has room in its time budget, but never skips more than max_skip frames in a row.
+    """
+
+    def __init__(self, every_n=1, adaptive=False, frame_budget=1 / 30, max_skip=6):
+        self.every_n = every_n
+        self.adaptive = adaptive
+        self.frame_budget = frame_budget
+        self.max_skip = max_skip
+        self.expected_cost = None  # moving average of recent detection times
+        self.skipped = max(every_n, max_skip)  # so the first frame always runs
+
+    def should_run(self, elapsed):
+        """`elapsed` is how much of the frame budget has already been spent."""
+        if self.adaptive:
+            run = (self.expected_cost is None
+                   or elapsed + self.expected_cost <= self.frame_budget
+                   or self.skipped >= self.max_skip)
+        else:
+            run = self.skipped >= self.every_n - 1
+        self.skipped = 0 if run else self.skipped + 1
+        return run
+
+    def record(self, cost):
+        if self.expected_cost is None:
+            self.expected_cost = cost
+        else:
+            self.expected_cost = 0.8 * self.expected_cost + 0.2 * cost
+
+
+def _any_middle_finger(results):
+    if not results.hand_landmarks:
+        return False
+    return any(_is_middle_finger(hand) for hand in results.hand_landmarks)
+
+
 class GestureDetector:
-    def __init__(self):
+    def __init__(self, every_n=1, adaptive=False, use_roi=False, live_stream=False):
+        self.live_stream = live_stream
         options = mp.tasks.vision.HandLandmarkerOptions(
             base_options=mp.tasks.BaseOptions(model_asset_path=MODEL_PATH),
-            running_mode=mp.tasks.vision.RunningMode.VIDEO,
+            running_mode=RunningMode.LIVE_STREAM if live_stream else RunningMode.VIDEO,
             num_hands=2,
+            result_callback=self._on_result if live_stream else None,
         )
         self.landmarker = mp.tasks.vision.HandLandmarker.create_from_options(options)
         self.frame_timestamp = 0
-
-    def detect_middle_finger(self, frame):
-        """Returns True if any detected hand is showing the middle finger."""
-        rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+        self.roi_timestamp = 0
+        self.schedule = GestureSchedule(every_n, adaptive)
+        self.use_roi = use_roi
+        self.roi_landmarker = None
+        if use_roi:
+            # Crops move every frame, so the ROI landmarker runs without tracking
+            # (unless LIVE_STREAM, which requires it but follows the wrists anyway)
+            roi_options = mp.tasks.vision.HandLandmarkerOptions(
+                base_options=mp.tasks.BaseOptions(model_asset_path=MODEL_PATH),
+                running_mode=RunningMode.LIVE_STREAM if live_stream else RunningMode.IMAGE,
+                num_hands=2,
+                result_callback=self._on_result if live_stream else None,
+            )
+            self.roi_landmarker = mp.tasks.vision.HandLandmarker.create_from_options(
+                roi_options)
+            self._roi_canvas = np.zeros((ROI_SIZE, 2 * ROI_SIZE, 3), dtype=np.uint8)
+        self.last_result = False
+        self._live_result = False  # set from MediaPipe's callback thread
+        self.frames = 0
+        self.runs = 0
+
+    def _on_result(self, results, output_image, timestamp_ms):
+        self._live_result = _any_middle_finger(results)
+
+    def update(self, frame, pose_results=None, elapsed=0.0, mp_image=None,
+               timestamp_ms=None):
+        """Scheduled detection. Skipped frames repeat the last answer.
+
+        `elapsed` is the time already spent on this frame, for adaptive scheduling.
+        `mp_image` is the shared inference image for full-frame detection.
+        """
+        self.frames += 1
+        if not self.schedule.should_run(elapsed):
+            return self.last_result
+        self.runs += 1
+        started = time.perf_counter()
+        boxes = []
+        if self.use_roi:
+            height, width = frame.shape[:2]
+            boxes = wrist_rois(pose_results, width, height)
+        if boxes:
+            self.last_result = self.detect_middle_finger_in_rois(frame, boxes,
+                                                                 timestamp_ms)
+        else:
+            # No pose (or ROI mode off): fall back to the full frame
+            self.last_result = self.detect_middle_finger(frame, mp_image, timestamp_ms)
+        self.schedule.record(time.perf_counter() - started)
+        return self.last_result
+
+    def detect_middle_finger_in_rois(self, frame, boxes, timestamp_ms=None):
+        """Run one detection on the wrist crops placed side by side."""
+        for i, (x1, y1, x2, y2) in enumerate(boxes):
+            self._roi_canvas[:, i * ROI_SIZE:(i + 1) * ROI_SIZE] = cv2.resize(
+                frame[y1:y2, x1:x2], (ROI_SIZE, ROI_SIZE))
+        if len(boxes) == 1:
+            self._roi_canvas[:, ROI_SIZE:] = 0
+        rgb = cv2.cvtColor(self._roi_canvas, cv2.COLOR_BGR2RGB)
         mp_image = mp.Image(image_format=mp.ImageFormat.SRGB, data=rgb)
-        self.frame_timestamp += 33
-        results = self.landmarker.detect_for_video(mp_image, self.frame_timestamp)
-
-        if not results.hand_landmarks:
-            return False
-
-        return any(_is_middle_finger(hand) for hand in results.hand_landmarks)
+        if self.live_stream:
+            self.roi_timestamp = next_timestamp(self.roi_timestamp, timestamp_ms)
+            self.roi_landmarker.detect_async(mp_image, self.roi_timestamp)
+            return self._live_result
+        return _any_middle_finger(self.roi_landmarker.detect(mp_image))
+
+    def detect_middle_finger(self, frame, mp_image=None, timestamp_ms=None):
+        """Returns True if any detected hand is showing the middle finger.
+
+        In LIVE_STREAM mode this is the newest finished answer, not this frame's.
+        """
+        if mp_image is None:
+            rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+            mp_image = mp.Image(image_format=mp.ImageFormat.SRGB, data=rgb)
+        self.frame_timestamp = next_timestamp(self.frame_timestamp, timestamp_ms)
+        if self.live_stream:
+            self.landmarker.detect_async(mp_image, self.frame_timestamp)
+            return self._live_result
+        return _any_middle_finger(
+            self.landmarker.detect_for_video(mp_image, self.frame_timestamp))
 
     def close(self):
         self.landmarker.close()
+        if self.roi_landmarker:
+            self.roi_landmarker.close()
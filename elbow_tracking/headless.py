@@ -0,0 +1,83 @@
+import statistics
+
+import cv2
+import numpy as np
+
+
+class SyntheticCapture:
+    """Stands in for cv2.VideoCapture: a moving test pattern, no camera needed.
+
+    There is no person in it, so pose inference runs but finds nothing; use a
+    recorded clip to exercise violations.
+    """
+
+    def __init__(self, width=1280, height=720, frames=300, fps=30):
+        self.width = width
+        self.height = height
+        self.frames = frames
+        self.fps = fps
+        self.position = 0
+        rng = np.random.default_rng(0)
+        self._background = rng.integers(40, 200, (height, width, 3), dtype=np.uint8)
+
+    def isOpened(self):
+        return self.position < self.frames
+
+    def read(self):
+        if self.position >= self.frames:
+            return False, None
+        frame = self._background.copy()
+        x = (self.position * 8) % (self.width - 200)
+        cv2.rectangle(frame, (x, 200), (x + 200, 500), (30, 30, 220), -1)
+        self.position += 1
+        return True, frame
+
+    def get(self, prop):
+        if prop == cv2.CAP_PROP_FPS:
+            return self.fps
+        if prop == cv2.CAP_PROP_FRAME_COUNT:
+            return self.frames
+        return 0
+
+    def set(self, prop, value):
+        return False
+
+    def release(self):
+        self.position = self.frames
+
+
+def open_source(source):
+    """A video file path, or "synthetic" / "synthetic:<frames>" for a test pattern."""
+    if source.startswith("synthetic"):
+        _, _, frames = source.partition(":")
+        return SyntheticCapture(frames=int(frames or 300))
+    cap = cv2.VideoCapture(source)
+    if not cap.isOpened():
+        raise SystemExit(f"Could not open video {source!r}")
+    return cap
+
+
+def timing_summary(seconds):
+    """Milliseconds summary for one stage over the whole run."""
+    if not seconds:
+        return {"mean_ms": 0.0, "p50_ms": 0.0, "p95_ms": 0.0, "max_ms": 0.0}
+    ms = sorted(s * 1000 for s in seconds)
+    return {
+        "mean_ms": round(statistics.fmean(ms), 3),
+        "p50_ms": round(statistics.median(ms), 3),
+        "p95_ms": round(ms[max(0, int(len(ms) * 0.95) - 1)], 3),
+        "max_ms": round(ms[-1], 3),
+    }
+
+
+def violation_spans(events):
+    """Pair ViolationDebouncer start/end events into one entry per violation."""
+    spans, starts = [], {}
+    for event in events:
+        if event["edge"] == "start":
+            starts[event["violation_id"]] = event
+            continue
+        start = starts.pop(event["violation_id"])
+        spans.append({"start_s": start["timestamp"], "end_s": event["timestamp"],
+                      "elbow": event["elbow"]})
+    return spans
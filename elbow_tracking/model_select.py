@@ -0,0 +1,146 @@
+import threading
+import time
+from pathlib import Path
+
+from detector import MODEL_VARIANTS, PoseDetector, model_path
+from pipeline import StageStats
+
+# Share of the frame budget the pose model may use; the rest is left for the
+# hand model, preprocessing and rendering.
+POSE_BUDGET_SHARE = 0.6
+WARMUP_SKIP = 5          # first detections include graph setup; not timed
+FPS_TOLERANCE = 0.1      # loop rate this far under target counts as too slow
+DOWNGRADE_AFTER = 5.0    # seconds the loop must stay too slow before switching
+CHECK_INTERVAL = 1.0
+
+
+def available_variants():
+    """Installed pose models, fastest first."""
+    return [v for v in MODEL_VARIANTS if Path(model_path(v)).exists()]
+
+
+def benchmark_variant(variant, samples, min_detection_confidence=0.8,
+                      min_tracking_confidence=0.8):
+    """Mean pose latency in ms for `variant` over `samples` (PreparedFrames)."""
+    detector = PoseDetector(min_detection_confidence, min_tracking_confidence,
+                            variant=variant)
+    latencies = []
+    try:
+        for i, prepared in enumerate(samples * 2):
+            started = time.perf_counter()
+            detector.detect(prepared.display, prepared.mp_image, i * 33)
+            if i >= WARMUP_SKIP:
+                latencies.append(time.perf_counter() - started)
+    finally:
+        detector.close()
+    return 1000 * sum(latencies) / max(1, len(latencies))
+
+
+def select_variant(samples, target_fps):
+    """Pick the most accurate pose model that fits the frame budget.
+
+    Variants are timed fastest first, stopping at the first one that doesn't
+    fit (a more accurate one would be slower still). Returns (variant,
+    {variant: ms}); falls back to the fastest installed variant.
+    """
+    variants = available_variants()
+    if not variants:
+        raise FileNotFoundError(f"No pose models found next to {model_path('full')}")
+    budget_ms = 1000 / target_fps * POSE_BUDGET_SHARE
+    chosen, timings = variants[0], {}
+    for variant in variants:
+        timings[variant] = benchmark_variant(variant, samples)
+        if timings[variant] > budget_ms:
+            break
+        chosen = variant
+    return chosen, timings
+
+
+class AdaptivePoseDetector:
+    """A PoseDetector that steps down to a faster model when the loop can't keep up.
+
+    The loop rate is how often detect() is called (in LIVE_STREAM mode, how
+    often results arrive). If it stays under the target for DOWNGRADE_AFTER
+    seconds while pose inference is taking more than its share of the frame
+    (so the camera isn't simply slow), the next faster variant is loaded on a
+    background thread and swapped in at the following detect() call.
+    """
+
+    def __init__(self, variant, target_fps, live_stream=False, zone=None,
+                 min_detection_confidence=0.8, min_tracking_confidence=0.8):
+        self.target_fps = target_fps
+        self._options = {"min_detection_confidence": min_detection_confidence,
+                         "min_tracking_confidence": min_tracking_confidence,
+                         "live_stream": live_stream, "zone": zone}
+        self._detector = PoseDetector(variant=variant, **self._options)
+        self._next = None
+        self._loading = False
+        self._failed = set()  # variants that could not be loaded
+        self.downgrades = []  # (from, to, measured fps)
+        self._reset_measurement()
+
+    def __getattr__(self, name):
+        # variant, live_stream, submitted, completed... come from the live detector
+        return getattr(self._detector, name)
+
+    def _reset_measurement(self):
+        self._stats = StageStats("pose")
+        self._slow_since = None
+        self._last_check = time.monotonic()
+        self._last_completed = self._detector.completed
+
+    def detect(self, frame, mp_image=None, timestamp_ms=None):
+        if self._next is not None:
+            old, self._detector, self._next = self._detector, self._next, None
+            old.close()
+            self._reset_measurement()
+        started = time.monotonic()
+        result = self._detector.detect(frame, mp_image, timestamp_ms)
+        self._stats.record(started)
+        if started - self._last_check >= CHECK_INTERVAL:
+            self._check(started)
+        return result
+
+    def _loop_fps(self, now):
+        if not self._detector.live_stream:
+            return self._stats.fps()
+        completed = self._detector.completed
+        fps = (completed - self._last_completed) / (now - self._last_check)
+        self._last_completed = completed
+        return fps
+
+    def _check(self, now):
+        fps = self._loop_fps(now)
+        self._last_check = now
+        pose_heavy = (self._detector.live_stream or self._stats.latency_ms()
+                      > 1000 / self.target_fps * POSE_BUDGET_SHARE)
+        if fps >= self.target_fps * (1 - FPS_TOLERANCE) or not pose_heavy:
+            self._slow_since = None
+            return
+        if self._slow_since is None:
+            self._slow_since = now
+        faster = [v for v in available_variants()
+                  if MODEL_VARIANTS.index(v) < MODEL_VARIANTS.index(self.variant)
+                  and v not in self._failed]
+        if now - self._slow_since >= DOWNGRADE_AFTER and faster and not self._loading:
+            self._loading = True
+            threading.Thread(target=self._load, args=(faster[-1], fps),
+                             name="pose-model-loader", daemon=True).start()
+
+    def _load(self, variant, fps):
+        print(f"Pose model: {self.variant} runs at {fps:.1f} fps "
+              f"(target {self.target_fps}), switching to {variant}")
+        try:
+            self._next = PoseDetector(variant=variant, **self._options)
+            self.downgrades.append((self.variant, variant, round(fps, 1)))
+        except Exception as exc:
+            # e.g. a corrupt or missing .task file: skip it, try the next one later
+            print(f"Pose model: could not load {variant} ({exc}), keeping {self.variant}")
+            self._failed.add(variant)
+        finally:
+            self._loading = False
+
+    def close(self):
+        if self._next is not None:
+            self._next.close()
+        self._detector.close()
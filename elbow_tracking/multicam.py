@@ -0,0 +1,285 @@
+import math
+import multiprocessing
+import os
+import time
+from multiprocessing import shared_memory
+
+import cv2
+import numpy as np
+import renderer
+from pipeline import MAX_READ_FAILURES, READ_RETRY_DELAY, StageStats
+from preprocess import FramePool
+from violation import check_violation
+
+# Per-worker status, one shared array of doubles each
+SEQ = 0            # frames published so far
+FPS = 1
+INFERENCE_MS = 2
+HEARTBEAT = 3      # time.time() of the last published frame
+VIOLATION = 4      # 1.0 while an elbow is past the table edge
+TABLE_EDGE = 5     # set by the supervisor on click, -1 = not calibrated
+SLOT_SEQS = 6      # then the seq of the tile in each of the two slots
+STATUS_FIELDS = 8
+WRITING = -1       # slot seq while the worker is writing into it
+
+STALL_SECONDS = 2.0    # no frame for this long counts as stalled
+STARTUP_SECONDS = 30.0  # time allowed for the first frame (model load, camera open)
+RESTART_DELAY = 2.0    # wait before restarting a dead worker
+HEALTH_PRINT_INTERVAL = 5.0
+
+
+def camera_worker(camera_index, shm_name, tile_size, status, stop, tracker_options):
+    """One camera, one process: capture, inference and overlays, then publish a tile.
+
+    Tiles go into a two-slot shared-memory buffer; SEQ says which slot is newest
+    and each slot is stamped with the seq of the tile it holds.
+    """
+    os.environ["OPENCV_LOG_LEVEL"] = "ERROR"
+    os.environ["TF_CPP_MIN_LOG_LEVEL"] = "3"
+    from app import ElbowTracker
+
+    tile_w, tile_h = tile_size
+    shm = shared_memory.SharedMemory(name=shm_name)
+    slots = np.ndarray((2, tile_h, tile_w, 3), dtype=np.uint8, buffer=shm.buf)
+    # The worker never shows the replay, so use the backend that allocates nothing
+    tracker = ElbowTracker(camera_index, pipelined=False, replay_backend="deque",
+                           **tracker_options)
+    pool = FramePool(1, tracker.inference_width)
+    prepared = pool.acquire()
+    fps = StageStats("fps")
+    inference = StageStats("inference")
+    seq = 0
+    failures = 0
+    try:
+        while not stop.is_set() and tracker.cap.isOpened():
+            started = time.monotonic()
+            success, raw = tracker.cap.read()
+            if not success:
+                # An unplugged or hung camera can stay "open" while every read
+                # fails: exit and let the supervisor reopen it
+                failures += 1
+                if failures >= MAX_READ_FAILURES:
+                    print(f"Camera {camera_index}: {failures} failed reads, exiting")
+                    break
+                time.sleep(READ_RETRY_DELAY)
+                continue
+            failures = 0
+            captured_at = time.monotonic()
+            pool.prepare(raw, prepared)
+            frame = prepared.display
+
+            edge = status[TABLE_EDGE]
+            tracker.table_edge_x = None if edge < 0 else int(edge)
+            tracker.calibrating = edge < 0
+
+            inference_started = time.monotonic()
+            timestamp_ms = int(captured_at * 1000)
+            elbows, pose_results = tracker.detector.detect(frame, prepared.mp_image,
+                                                           timestamp_ms)
+            middle_finger = tracker.gesture_detector.update(
+                frame, pose_results, time.monotonic() - captured_at, prepared.mp_image,
+                timestamp_ms)
+            inference.record(inference_started)
+            tracker.report_violation(elbows, captured_at)
+            tracker.annotate(frame, elbows, pose_results, middle_finger)
+
+            seq += 1
+            status[SLOT_SEQS + seq % 2] = WRITING
+            cv2.resize(frame, (tile_w, tile_h), dst=slots[seq % 2])
+            status[SLOT_SEQS + seq % 2] = seq
+            fps.record(started)
+            status[SEQ] = seq
+            status[FPS] = fps.fps()
+            status[INFERENCE_MS] = inference.latency_ms()
+            status[HEARTBEAT] = time.time()
+            status[VIOLATION] = float(bool(elbows)
+                                      and check_violation(elbows, tracker.table_edge_x))
+    finally:
+        tracker.close()
+        del slots
+        shm.close()
+
+
+class _Worker:
+    def __init__(self, ctx, camera_index, tile_size, tracker_options):
+        self.ctx = ctx
+        self.camera_index = camera_index
+        self.tile_size = tile_size
+        self.tracker_options = tracker_options
+        tile_w, tile_h = tile_size
+        self.shm = shared_memory.SharedMemory(create=True, size=2 * tile_h * tile_w * 3)
+        self.slots = np.ndarray((2, tile_h, tile_w, 3), dtype=np.uint8,
+                                buffer=self.shm.buf)
+        self.status = ctx.Array("d", STATUS_FIELDS, lock=False)
+        self.status[TABLE_EDGE] = -1
+        self.stop = ctx.Event()
+        self.process = None
+        self.last_seq = 0
+        self.restarts = 0
+        self.died_at = None
+
+    def start(self):
+        self.status[SEQ] = 0
+        self.status[SLOT_SEQS] = self.status[SLOT_SEQS + 1] = WRITING
+        self.status[HEARTBEAT] = time.time()
+        self.last_seq = 0
+        self.process = self.ctx.Process(
+            target=camera_worker,
+            args=(self.camera_index, self.shm.name, self.tile_size, self.status,
+                  self.stop, self.tracker_options),
+            name=f"camera-{self.camera_index}", daemon=True)
+        self.process.start()
+
+    def health(self):
+        if not self.process.is_alive():
+            return "dead"
+        if time.time() - self.status[HEARTBEAT] > STALL_SECONDS:
+            return "stalled"
+        return "ok"
+
+    def stalled_too_long(self):
+        """True once a stall has lasted another STALL_SECONDS.
+
+        A worker that has not published its first frame gets STARTUP_SECONDS.
+        """
+        limit = 2 * STALL_SECONDS if self.status[SEQ] else STARTUP_SECONDS
+        return time.time() - self.status[HEARTBEAT] >= limit
+
+    def terminate(self):
+        self.process.terminate()
+        self.process.join(timeout=5)
+        if self.process.is_alive():
+            self.process.kill()
+            self.process.join()
+
+    def copy_latest(self, dst):
+        """Copy the newest tile into dst. Returns False if nothing new was copied."""
+        for _ in range(3):
+            seq = int(self.status[SEQ])
+            if seq == self.last_seq:
+                return False
+            np.copyto(dst, self.slots[seq % 2])
+            # Seqlock check: the slot's stamp changes if the worker reused it mid-copy
+            if self.status[SLOT_SEQS + seq % 2] == seq:
+                self.last_seq = seq
+                return True
+        return False
+
+    def close(self):
+        self.stop.set()
+        if self.process is not None:
+            self.process.join(timeout=5)
+            if self.process.is_alive():
+                self.process.terminate()
+        del self.slots
+        self.shm.close()
+        self.shm.unlink()
+
+
+class MultiCameraSupervisor:
+    """Starts one tracker process per camera and shows all feeds in one window.
+
+    Workers are restarted if they die or stop publishing frames. Clicking a
+    tile sets that camera's table edge; 'r' resets all of them, 'q' quits.
+    """
+
+    def __init__(self, camera_indices, output_size, camera_size, tracker_options=None):
+        self.output_w, self.output_h = output_size
+        self.camera_w, self.camera_h = camera_size
+        count = len(camera_indices)
+        self.cols = math.ceil(math.sqrt(count))
+        self.rows = math.ceil(count / self.cols)
+        self.tile_w = self.output_w // self.cols
+        self.tile_h = min(self.output_h // self.rows,
+                          self.tile_w * self.camera_h // self.camera_w)
+        self.canvas = np.zeros((self.output_h, self.output_w, 3), dtype=np.uint8)
+        ctx = multiprocessing.get_context("spawn")  # fork is unsafe with OpenCV/MediaPipe
+        self.workers = [_Worker(ctx, index, (self.tile_w, self.tile_h),
+                                tracker_options or {})
+                        for index in camera_indices]
+        self.window_name = "Elbow Tracker - Multi-camera"
+        self.last_health_print = time.monotonic()
+
+    def tile_origin(self, i):
+        return (i % self.cols) * self.tile_w, (i // self.cols) * self.tile_h
+
+    def on_mouse(self, event, x, y, flags, param):
+        if event != cv2.EVENT_LBUTTONDOWN:
+            return
+        col, row = x // self.tile_w, y // self.tile_h
+        i = row * self.cols + col
+        if col >= self.cols or i >= len(self.workers):
+            return
+        frame_x = int((x - col * self.tile_w) * self.camera_w / self.tile_w)
+        self.workers[i].status[TABLE_EDGE] = frame_x
+        print(f"Camera {self.workers[i].camera_index}: table edge set at x={frame_x}")
+
+    def draw_tile_status(self, tile, worker):
+        health = worker.health()
+        status = worker.status
+        text = (f"Cam {worker.camera_index}  {status[FPS]:4.1f} fps  "
+                f"inference {status[INFERENCE_MS]:4.0f} ms")
+        color = renderer.GREEN if health == "ok" else renderer.RED
+        if health != "ok":
+            text += f"  {health.upper()}"
+        cv2.putText(tile, text, (10, tile.shape[0] - 12),
+                    cv2.FONT_HERSHEY_SIMPLEX, 0.6, color, 2)
+
+    def supervise(self):
+        """Restart dead or stalled workers and print a health line now and then."""
+        now = time.monotonic()
+        for worker in self.workers:
+            if worker.stop.is_set():
+                continue
+            health = worker.health()
+            if health == "stalled" and worker.stalled_too_long():
+                print(f"Camera {worker.camera_index}: no frame for "
+                      f"{time.time() - worker.status[HEARTBEAT]:.0f} s, restarting")
+                worker.terminate()
+                worker.died_at = now
+                continue
+            if health != "dead":
+                continue
+            if worker.died_at is None:
+                worker.died_at = now
+                print(f"Camera {worker.camera_index}: worker exited "
+                      f"(code {worker.process.exitcode}), restarting")
+            elif now - worker.died_at >= RESTART_DELAY:
+                worker.died_at = None
+                worker.restarts += 1
+                worker.start()
+        if now - self.last_health_print >= HEALTH_PRINT_INTERVAL:
+            print(" | ".join(
+                f"cam {w.camera_index}: {w.health()} {w.status[FPS]:.1f} fps "
+                f"{w.status[INFERENCE_MS]:.0f} ms restarts={w.restarts}"
+                for w in self.workers))
+            self.last_health_print = now
+
+    def run(self):
+        cv2.namedWindow(self.window_name, cv2.WINDOW_AUTOSIZE)
+        cv2.setMouseCallback(self.window_name, self.on_mouse)
+        print(f"Multi-camera tracker: {len(self.workers)} cameras, "
+              f"{self.cols}x{self.rows} grid of {self.tile_w}x{self.tile_h} tiles")
+        print("  Click a tile to set its table edge | 'r' to reset | 'q' to quit")
+        for worker in self.workers:
+            worker.start()
+        try:
+            while True:
+                for i, worker in enumerate(self.workers):
+                    x, y = self.tile_origin(i)
+                    tile = self.canvas[y:y + self.tile_h, x:x + self.tile_w]
+                    if worker.copy_latest(tile) or worker.health() != "ok":
+                        self.draw_tile_status(tile, worker)
+                cv2.imshow(self.window_name, self.canvas)
+                self.supervise()
+                key = cv2.waitKey(5) & 0xFF
+                if key == ord("q"):
+                    break
+                elif key == ord("r"):
+                    for worker in self.workers:
+                        worker.status[TABLE_EDGE] = -1
+                    print("Table edges reset - click each tile to set new positions")
+        finally:
+            for worker in self.workers:
+                worker.close()
+            cv2.destroyAllWindows()
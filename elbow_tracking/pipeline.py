@@ -0,0 +1,188 @@
+import collections
+import threading
+import time
+from dataclasses import dataclass
+
+STATS_WINDOW = 2.0  # seconds of samples kept for FPS / latency
+MAX_READ_FAILURES = 100  # consecutive failed camera reads before capture gives up
+READ_RETRY_DELAY = 0.01
+
+
+@dataclass
+class FramePacket:
+    seq: int
+    captured_at: float  # time.monotonic() when the camera read returned
+    prepared: object    # preprocess.PreparedFrame, borrowed from the FramePool
+
+    @property
+    def frame(self):
+        return self.prepared.display
+
+
+@dataclass
+class InferenceResult:
+    packet: FramePacket
+    elbows: object
+    pose_results: object
+    middle_finger: bool
+
+
+class LatestQueue:
+    """Single-slot queue: put() replaces whatever is waiting, get() takes the newest.
+
+    Stages never block on a slower consumer; stale items are dropped and counted,
+    and handed to `on_drop` so their buffers can go back to the pool.
+    """
+
+    def __init__(self, on_drop=None):
+        self._item = None
+        self._cond = threading.Condition()
+        self.on_drop = on_drop
+        self.dropped = 0
+
+    def put(self, item):
+        with self._cond:
+            if self._item is not None:
+                self.dropped += 1
+                if self.on_drop:
+                    self.on_drop(self._item)
+            self._item = item
+            self._cond.notify()
+
+    def get(self, timeout=None):
+        """Return the newest item, or None if nothing arrived within timeout."""
+        with self._cond:
+            if self._item is None:
+                self._cond.wait(timeout)
+            item, self._item = self._item, None
+            return item
+
+
+class StageStats:
+    """Rolling FPS and latency for one pipeline stage."""
+
+    def __init__(self, name):
+        self.name = name
+        self._samples = collections.deque()  # (finished_at, latency_seconds)
+        self._lock = threading.Lock()
+
+    def record(self, started_at, finished_at=None):
+        finished_at = time.monotonic() if finished_at is None else finished_at
+        with self._lock:
+            self._samples.append((finished_at, finished_at - started_at))
+            while self._samples and finished_at - self._samples[0][0] > STATS_WINDOW:
+                self._samples.popleft()
+
+    def fps(self):
+        with self._lock:
+            if len(self._samples) < 2:
+                return 0.0
+            span = self._samples[-1][0] - self._samples[0][0]
+            return (len(self._samples) - 1) / span if span > 0 else 0.0
+
+    def latency_ms(self):
+        with self._lock:
+            if not self._samples:
+                return 0.0
+            return 1000 * sum(lat for _, lat in self._samples) / len(self._samples)
+
+    def percentiles_ms(self, *qs):
+        """Latency percentiles (0-100) in ms over the window, nearest-rank."""
+        with self._lock:
+            latencies = sorted(lat for _, lat in self._samples)
+        if not latencies:
+            return [0.0 for _ in qs]
+        last = len(latencies) - 1
+        return [1000 * latencies[min(last, int(q / 100 * len(latencies)))] for q in qs]
+
+    def snapshot(self):
+        """FPS, mean and p50/p95/p99 latency for the HUD and telemetry."""
+        p50, p95, p99 = self.percentiles_ms(50, 95, 99)
+        return {"fps": round(self.fps(), 2), "mean_ms": round(self.latency_ms(), 3),
+                "p50_ms": round(p50, 3), "p95_ms": round(p95, 3),
+                "p99_ms": round(p99, 3), "samples": len(self._samples)}
+
+    def summary(self):
+        return f"{self.name} {self.fps():5.1f} fps {self.latency_ms():6.1f} ms"
+
+
+class CaptureThread(threading.Thread):
+    """Reads the camera as fast as it delivers and keeps only the latest frame."""
+
+    def __init__(self, cap, pool, out: LatestQueue, stop: threading.Event,
+                 stats: StageStats, read_stats: StageStats = None,
+                 prepare_stats: StageStats = None):
+        super().__init__(name="capture", daemon=True)
+        self.cap = cap
+        self.pool = pool
+        self.out = out
+        self.stop_event = stop
+        self.stats = stats
+        self.read_stats = read_stats
+        self.prepare_stats = prepare_stats
+
+    def run(self):
+        seq = failures = 0
+        while not self.stop_event.is_set() and self.cap.isOpened():
+            started = time.monotonic()
+            success, frame = self.cap.read()
+            if not success:
+                # An unplugged or hung camera can stay "open" while every read
+                # fails: back off, and stop (ending the run) if it never recovers
+                failures += 1
+                if failures >= MAX_READ_FAILURES:
+                    print(f"Capture: {failures} failed reads, stopping")
+                    return
+                time.sleep(READ_RETRY_DELAY)
+                continue
+            failures = 0
+            captured_at = time.monotonic()
+            if self.read_stats is not None:
+                self.read_stats.record(started, captured_at)
+            prepared = self.pool.acquire()
+            if prepared is None:
+                continue  # every buffer is still downstream; skip this frame
+            self.pool.prepare(frame, prepared)
+            if self.prepare_stats is not None:
+                self.prepare_stats.record(captured_at)
+            seq += 1
+            self.out.put(FramePacket(seq, captured_at, prepared))
+            self.stats.record(started)
+
+
+class InferenceThread(threading.Thread):
+    """Runs pose and gesture detection on the newest captured frame."""
+
+    def __init__(self, detector, gesture_detector, inp: LatestQueue,
+                 out: LatestQueue, stop: threading.Event, stats: StageStats,
+                 pose_stats: StageStats = None, gesture_stats: StageStats = None):
+        super().__init__(name="inference", daemon=True)
+        self.detector = detector
+        self.gesture_detector = gesture_detector
+        self.inp = inp
+        self.out = out
+        self.stop_event = stop
+        self.stats = stats
+        self.pose_stats = pose_stats
+        self.gesture_stats = gesture_stats
+
+    def run(self):
+        while not self.stop_event.is_set():
+            packet = self.inp.get(timeout=0.1)
+            if packet is None:
+                continue
+            started = time.monotonic()
+            mp_image = packet.prepared.mp_image
+            timestamp_ms = int(packet.captured_at * 1000)
+            elbows, pose_results = self.detector.detect(packet.frame, mp_image,
+                                                        timestamp_ms)
+            posed = time.monotonic()
+            if self.pose_stats is not None:
+                self.pose_stats.record(started, posed)
+            middle_finger = self.gesture_detector.update(
+                packet.frame, pose_results, posed - packet.captured_at,
+                mp_image, timestamp_ms)
+            if self.gesture_stats is not None:
+                self.gesture_stats.record(posed)
+            self.out.put(InferenceResult(packet, elbows, pose_results, middle_finger))
+            self.stats.record(started)
@@ -0,0 +1,66 @@
+import queue
+from dataclasses import dataclass
+
+import cv2
+import mediapipe as mp
+import numpy as np
+
+
+@dataclass
+class PreparedFrame:
+    display: np.ndarray = None  # flipped BGR at camera resolution; overlays go here
+    small: np.ndarray = None    # flipped BGR at inference resolution (if downscaled)
+    rgb: np.ndarray = None      # flipped RGB at inference resolution
+    mp_image: object = None     # wraps `rgb`; shared by the pose and hand landmarkers
+
+
+class FramePool:
+    """A fixed set of reusable frame buffers.
+
+    Each camera frame is flipped and colour-converted once, straight into a
+    pooled buffer, and the same inference image is handed to every landmarker.
+    Landmarks come back normalized, so detectors scale them by the display
+    frame's size and everything drawn or checked stays in display space.
+    """
+
+    def __init__(self, size=1, inference_width=None):
+        self.inference_width = inference_width
+        self._free = queue.Queue()
+        for _ in range(size):
+            self._free.put(PreparedFrame())
+
+    def acquire(self, timeout=None):
+        """Take a free buffer, or None if every buffer is still in use."""
+        try:
+            return self._free.get(timeout=timeout) if timeout else self._free.get_nowait()
+        except queue.Empty:
+            return None
+
+    def release(self, prepared):
+        self._free.put(prepared)
+
+    def inference_size(self, width, height):
+        if not self.inference_width or self.inference_width >= width:
+            return width, height
+        return self.inference_width, round(height * self.inference_width / width)
+
+    def prepare(self, raw, prepared):
+        """Flip `raw` into `prepared` and build its inference image."""
+        height, width = raw.shape[:2]
+        inf_w, inf_h = self.inference_size(width, height)
+        if prepared.display is None or prepared.display.shape != raw.shape:
+            # First use, or the camera changed resolution: allocate once
+            prepared.display = np.empty_like(raw)
+            prepared.rgb = np.empty((inf_h, inf_w, 3), dtype=np.uint8)
+            prepared.small = (np.empty((inf_h, inf_w, 3), dtype=np.uint8)
+                              if (inf_w, inf_h) != (width, height) else None)
+
+        cv2.flip(raw, 1, dst=prepared.display)
+        if prepared.small is None:
+            cv2.cvtColor(prepared.display, cv2.COLOR_BGR2RGB, dst=prepared.rgb)
+        else:
+            cv2.resize(prepared.display, (inf_w, inf_h), dst=prepared.small,
+                       interpolation=cv2.INTER_AREA)
+            cv2.cvtColor(prepared.small, cv2.COLOR_BGR2RGB, dst=prepared.rgb)
+        prepared.mp_image = mp.Image(image_format=mp.ImageFormat.SRGB, data=prepared.rgb)
+        return prepared
@@ -14,7 +14,7 @@ WHITE = (255, 255, 255)
 
 def draw_pose(frame, pose_results):
     """Draw the full MediaPipe pose skeleton."""
-    if pose_results.pose_landmarks and len(pose_results.pose_landmarks) > 0:
+    if pose_results and pose_results.pose_landmarks:
         draw_landmarks(
             frame,
             pose_results.pose_landmarks[0],
@@ -145,7 +145,11 @@ def draw_punishment(frame):
     overlay = frame.copy()
     cv2.rectangle(overlay, (0, h // 3), (w, 2 * h // 3), (0, 0, 0), -1)
     cv2.addWeighted(overlay, 0.7, frame, 0.3, 0, frame)
+    _draw_punishment_text(frame)
 
+
+def _draw_punishment_text(frame):
+    h, w = frame.shape[:2]
     text = "PUNISHMENT BONG"
     (tw, th), _ = cv2.getTextSize(text, cv2.FONT_HERSHEY_SIMPLEX, 2.5, 4)
     x = (w - tw) // 2
@@ -159,3 +163,154 @@ def draw_punishment(frame):
                 cv2.FONT_HERSHEY_SIMPLEX, 1.0, WHITE, 2)
 
 
+class _Patch:
+    """A pre-rendered overlay placed at (x, y).
+
+    Opaque patches are copied whole. Anti-aliased text is kept as the indices
+    of the pixels it touches: solid ones are assigned, edge pixels are blended
+    as roi * (1 - alpha) + colour * alpha.
+    """
+
+    def __init__(self, layer, x, y, alpha=None):
+        self.layer = layer
+        self.x = x
+        self.y = y
+        self.solid = self.edge = None
+        if alpha is not None:
+            self.solid = np.nonzero(alpha == 1)
+            self.solid_colors = layer[self.solid]
+            self.edge = np.nonzero((alpha > 0) & (alpha < 1))
+            edge_alpha = alpha[self.edge][:, None]
+            self.edge_inv_alpha = 1 - edge_alpha
+            self.edge_colors = layer[self.edge].astype(np.float32)  # premultiplied
+
+    def paste(self, frame):
+        h, w = self.layer.shape[:2]
+        roi = frame[self.y:self.y + h, self.x:self.x + w]
+        if self.solid is None:
+            roi[:] = self.layer
+            return
+        blended = roi[self.edge] * self.edge_inv_alpha + self.edge_colors
+        roi[self.edge] = np.rint(blended)
+        roi[self.solid] = self.solid_colors
+
+
+def _render_patch(width, height, draw):
+    """Run `draw` on a blank frame and keep the bounding box of what it drew.
+
+    Drawn over black, anti-aliased pixels come out as colour * alpha. Every
+    overlay colour has a 255 channel, so alpha is the brightest channel / 255.
+    """
+    layer = np.zeros((height, width, 3), dtype=np.uint8)
+    draw(layer)
+    alpha = layer.max(axis=2).astype(np.float32) / 255
+    ys, xs = np.nonzero(alpha)
+    y0, y1, x0, x1 = ys.min(), ys.max() + 1, xs.min(), xs.max() + 1
+    return _Patch(layer[y0:y1, x0:x1].copy(), x0, y0, alpha[y0:y1, x0:x1])
+
+
+def _label_patch(width, height, text):
+    """The feed label box is opaque, so it is cached as a plain pixel block."""
+    (tw, th), _ = cv2.getTextSize(text, cv2.FONT_HERSHEY_SIMPLEX, 0.8, 2)
+    pad = 6
+    box_w, box_h = tw + pad * 2 + 1, th + pad * 2 + 1
+    x = width - tw - pad * 2 - 8
+    y = height - th - pad * 2 - 8
+    scratch = np.zeros((height, width, 3), dtype=np.uint8)
+    draw_feed_label(scratch, text)
+    return _Patch(scratch[y:y + box_h, x:x + box_w].copy(), x, y)
+
+
+def stage_hud(rows, x=16, y=120):
+    """Pre-render a table of text cells on a dark box as an opaque patch.
+
+    The first column is left-aligned, the rest right-aligned. The default
+    position is just below the replay's violation banner.
+    """
+    font, scale, thickness, pad, gap = cv2.FONT_HERSHEY_SIMPLEX, 0.5, 1, 8, 16
+    sizes = [[cv2.getTextSize(cell, font, scale, thickness)[0] for cell in row]
+             for row in rows]
+    widths = [max(size[col][0] for size in sizes) for col in range(len(rows[0]))]
+    line_h = max(h for size in sizes for _, h in size) + 8
+    layer = np.zeros((len(rows) * line_h + pad * 2,
+                      sum(widths) + gap * (len(widths) - 1) + pad * 2, 3), dtype=np.uint8)
+    layer[:] = (40, 40, 40)
+    for r, row in enumerate(rows):
+        baseline = pad + (r + 1) * line_h - 6
+        color = YELLOW if r == 0 else WHITE
+        left = pad
+        for col, cell in enumerate(row):
+            offset = 0 if col == 0 else widths[col] - sizes[r][col][0]
+            cv2.putText(layer, cell, (left + offset, baseline), font, scale, color,
+                        thickness)
+            left += widths[col] + gap
+    return _Patch(layer, x, y)
+
+
+class PipCompositor:
+    """Fullscreen PiP output built into buffers allocated once.
+
+    Produces the same pixels as compose_pip / draw_buffering / draw_punishment,
+    but resizes straight into its own canvas and PiP buffers and pastes cached
+    overlays instead of re-drawing and re-measuring them every frame. The
+    returned canvas is reused: it is only valid until the next compose call.
+    """
+
+    def __init__(self, screen_w, screen_h, live_w, live_h):
+        self.screen_w = screen_w
+        self.screen_h = screen_h
+        self.live_size = (live_w, live_h)
+        self.canvas = np.zeros((screen_h, screen_w, 3), dtype=np.uint8)
+
+        pip_w = screen_w // 4
+        pip_h = int(pip_w * live_h / live_w)
+        self.pip = np.zeros((pip_h, pip_w, 3), dtype=np.uint8)
+        margin = 16
+        border = 3
+        self.pip_x = screen_w - pip_w - margin
+        self.pip_y = margin
+
+        # Drawing the outline is cheaper than pasting a cached copy of it
+        self.border_rect = ((self.pip_x - border, self.pip_y - border),
+                            (self.pip_x + pip_w + border, self.pip_y + pip_h + border),
+                            border)
+
+        self.replay_label = _label_patch(screen_w, screen_h, "REPLAY")
+        self.live_label = _label_patch(pip_w, pip_h, "LIVE")
+        self.buffering = draw_buffering(screen_w, screen_h)
+        self.replay_label.paste(self.buffering)
+        self._punishment = {}  # (h, w) -> (band rows, text patch)
+
+    def compose(self, replay_frame, live_frame, out=None):
+        """Replay (or the loading screen if None) fills the canvas, live is the PiP.
+
+        Every pixel is rewritten each call, so `out` can be any screen-sized
+        buffer (e.g. a frame bus slot) instead of the reused canvas.
+        """
+        canvas = self.canvas if out is None else out
+        if replay_frame is None:
+            np.copyto(canvas, self.buffering)
+        else:
+            cv2.resize(replay_frame, (self.screen_w, self.screen_h), dst=canvas)
+            self.replay_label.paste(canvas)
+
+        pip_h, pip_w = self.pip.shape[:2]
+        cv2.resize(live_frame, (pip_w, pip_h), dst=self.pip)
+        self.live_label.paste(self.pip)
+
+        top_left, bottom_right, thickness = self.border_rect
+        cv2.rectangle(canvas, top_left, bottom_right, WHITE, thickness)
+        canvas[self.pip_y:self.pip_y + pip_h, self.pip_x:self.pip_x + pip_w] = self.pip
+        return canvas
+
+    def draw_punishment(self, frame):
+        """Darken the middle band in place and paste the cached banner text."""
+        h, w = frame.shape[:2]
+        cached = self._punishment.get((h, w))
+        if cached is None:
+            text = _render_patch(w, h, _draw_punishment_text)
+            cached = self._punishment[(h, w)] = (slice(h // 3, 2 * h // 3 + 1), text)
+        band_rows, text = cached
+        band = frame[band_rows]  # whole rows, so a contiguous view
+        cv2.convertScaleAbs(band, dst=band, alpha=0.3)
+        text.paste(frame)
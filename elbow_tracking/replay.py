@@ -0,0 +1,214 @@
+import collections
+import math
+import queue
+import threading
+
+import cv2
+import numpy as np
+
+BACKENDS = ("ring", "jpeg", "deque")
+MIN_JPEG_QUALITY = 40
+WRITING = -1  # ring slot seq while push() is overwriting it
+
+
+class DequeReplayBuffer:
+    """Original backend: a deque of per-frame copies. Kept as a benchmark baseline."""
+
+    def __init__(self, capacity, width, height):
+        self.capacity = capacity
+        self.width = width
+        self.height = height
+        self.pushed = 0  # frames pushed so far; frame n is readable via frame_at(n)
+        self._frames = collections.deque(maxlen=capacity)
+        self._lock = threading.Lock()
+
+    def push(self, frame):
+        """Store a copy of frame. Returns its sequence number for frame_at()."""
+        if frame.shape[1] != self.width or frame.shape[0] != self.height:
+            frame = cv2.resize(frame, (self.width, self.height))
+        else:
+            frame = frame.copy()
+        with self._lock:
+            self._frames.append(frame)
+            self.pushed += 1
+            return self.pushed - 1
+
+    def is_full(self):
+        return len(self._frames) == self.capacity
+
+    def delayed_frame(self):
+        """The frame pushed `capacity` frames ago."""
+        return self._frames[0]
+
+    def frame_at(self, seq):
+        """The seq-th frame ever pushed, or None if it has aged out."""
+        with self._lock:
+            index = seq - (self.pushed - len(self._frames))
+            return self._frames[index] if 0 <= index < len(self._frames) else None
+
+    def memory_bytes(self):
+        return sum(f.nbytes for f in self._frames)
+
+    def close(self):
+        self._frames.clear()
+
+
+class RingReplayBuffer:
+    """One pre-allocated (N, H, W, 3) array written in place. No per-frame allocation."""
+
+    def __init__(self, capacity, width, height):
+        self.capacity = capacity
+        self.width = width
+        self.height = height
+        self._frames = np.zeros((capacity, height, width, 3), dtype=np.uint8)
+        self._seqs = np.full(capacity, WRITING, dtype=np.int64)  # seq held by each slot
+        self._head = 0  # next slot to overwrite == oldest frame once full
+        self._count = 0
+        self.pushed = 0
+
+    def push(self, frame):
+        slot = self._frames[self._head]
+        self._seqs[self._head] = WRITING
+        if frame.shape[1] != self.width or frame.shape[0] != self.height:
+            cv2.resize(frame, (self.width, self.height), dst=slot)
+        else:
+            np.copyto(slot, frame)
+        self._seqs[self._head] = self.pushed
+        self._head = (self._head + 1) % self.capacity
+        self._count = min(self._count + 1, self.capacity)
+        self.pushed += 1  # only after the slot is written; frame_at() relies on it
+        return self.pushed - 1
+
+    def is_full(self):
+        return self._count == self.capacity
+
+    def delayed_frame(self):
+        """The frame pushed `capacity` frames ago. A view, valid until the next push."""
+        return self._frames[self._head]
+
+    def frame_at(self, seq):
+        """Copy of the seq-th frame ever pushed, or None if it was overwritten.
+
+        Safe to call from another thread: each slot is stamped with the seq it
+        holds, and the copy is only returned if that stamp is unchanged after it.
+        """
+        slot = seq % self.capacity
+        if self._seqs[slot] != seq:
+            return None
+        frame = self._frames[slot].copy()
+        return frame if self._seqs[slot] == seq else None
+
+    def memory_bytes(self):
+        return self._frames.nbytes
+
+    def close(self):
+        pass
+
+
+class JpegReplayBuffer:
+    """JPEG-encoded frames. Encoding happens on a background thread.
+
+    push() copies the frame, because the caller's buffer is reused. If the
+    encoded frames outgrow the memory budget, quality is stepped down, at
+    most once per quarter of the buffer so older, larger frames can age out.
+    """
+
+    def __init__(self, capacity, width, height, budget_bytes=None, quality=80):
+        self.capacity = capacity
+        self.width = width
+        self.height = height
+        self.budget_bytes = budget_bytes
+        self.quality = quality
+        self._chunks = collections.deque(maxlen=capacity)
+        self._encoded_bytes = 0
+        self._since_quality_step = 0
+        self._assigned = 0  # sequence numbers handed out by push()
+        self.pushed = 0  # frames 0..pushed-1 have been encoded (or failed to)
+        self._lock = threading.Lock()
+        self._pending = queue.Queue(maxsize=capacity)
+        self._thread = threading.Thread(target=self._encode_loop, name="replay-encoder",
+                                        daemon=True)
+        self._thread.start()
+
+    def _encode_loop(self):
+        while True:
+            item = self._pending.get()
+            if item is None:
+                return
+            seq, frame = item
+            if frame.shape[1] != self.width or frame.shape[0] != self.height:
+                frame = cv2.resize(frame, (self.width, self.height))
+            ok, chunk = cv2.imencode(".jpg", frame,
+                                     [cv2.IMWRITE_JPEG_QUALITY, self.quality])
+            # A failed encode keeps its slot, so later frames keep their seq
+            chunk = chunk if ok else None
+            with self._lock:
+                if len(self._chunks) == self.capacity and self._chunks[0] is not None:
+                    self._encoded_bytes -= self._chunks[0].nbytes
+                self._chunks.append(chunk)
+                self._encoded_bytes += 0 if chunk is None else chunk.nbytes
+                self.pushed = seq + 1
+                over_budget = (self.budget_bytes is not None
+                               and self._encoded_bytes > self.budget_bytes)
+            self._since_quality_step += 1
+            if (over_budget and self.quality > MIN_JPEG_QUALITY
+                    and self._since_quality_step >= self.capacity // 4):
+                self.quality -= 5
+                self._since_quality_step = 0
+
+    def push(self, frame):
+        """Queue a copy of frame for encoding. Returns its sequence number."""
+        seq = self._assigned
+        self._assigned += 1
+        self._pending.put((seq, frame.copy()))
+        return seq
+
+    def is_full(self):
+        with self._lock:
+            return len(self._chunks) == self.capacity
+
+    def delayed_frame(self):
+        """Decode the frame pushed `capacity` frames ago (None if it failed to encode)."""
+        with self._lock:
+            chunk = self._chunks[0]
+        return None if chunk is None else cv2.imdecode(chunk, cv2.IMREAD_COLOR)
+
+    def frame_at(self, seq):
+        """Decode the frame push() numbered seq, or None if not encoded or aged out."""
+        with self._lock:
+            index = seq - (self.pushed - len(self._chunks))
+            if not 0 <= index < len(self._chunks):
+                return None
+            chunk = self._chunks[index]
+        return None if chunk is None else cv2.imdecode(chunk, cv2.IMREAD_COLOR)
+
+    def memory_bytes(self):
+        with self._lock:
+            return self._encoded_bytes
+
+    def close(self):
+        self._pending.put(None)
+        self._thread.join()
+
+
+def fit_to_budget(capacity, width, height, budget_bytes):
+    """Largest resolution (same aspect ratio) whose raw ring fits in budget_bytes."""
+    needed = capacity * width * height * 3
+    if budget_bytes is None or needed <= budget_bytes:
+        return width, height
+    scale = math.sqrt(budget_bytes / needed)
+    # Keep dimensions even so video encoders accept the frames later
+    return max(2, int(width * scale) // 2 * 2), max(2, int(height * scale) // 2 * 2)
+
+
+def create_replay_buffer(backend, capacity, width, height, budget_mb=None, quality=80):
+    """Build a replay buffer. `budget_mb` caps its memory; raw backends shrink resolution."""
+    budget_bytes = None if budget_mb is None else int(budget_mb * 1024 * 1024)
+    if backend == "jpeg":
+        return JpegReplayBuffer(capacity, width, height, budget_bytes, quality)
+    width, height = fit_to_budget(capacity, width, height, budget_bytes)
+    if backend == "ring":
+        return RingReplayBuffer(capacity, width, height)
+    if backend == "deque":
+        return DequeReplayBuffer(capacity, width, height)
+    raise ValueError(f"Unknown replay backend {backend!r}, expected one of {BACKENDS}")
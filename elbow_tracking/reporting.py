@@ -0,0 +1,184 @@
+import json
+import queue
+import threading
+import time
+import urllib.error
+import urllib.request
+import uuid
+from datetime import datetime, timezone
+from pathlib import Path
+
+from violation import crossing_elbows
+
+SEND_BATCH = 50
+SEND_INTERVAL = 1.0    # seconds between flushes while events are waiting
+MAX_BACKOFF = 30.0     # seconds between retries while the backend is down
+HTTP_TIMEOUT = 2.0
+
+
+def wall_time(monotonic_at):
+    """Convert a time.monotonic() capture time to an aware UTC datetime."""
+    return datetime.fromtimestamp(time.time() - (time.monotonic() - monotonic_at),
+                                  timezone.utc)
+
+
+class ViolationDebouncer:
+    """Turns per-frame elbow crossings into debounced start/end events.
+
+    A violation starts after `on_frames` crossing frames in a row and ends
+    after `off_frames` clear ones, so landmark jitter at the table edge does
+    not flicker. Event timestamps are the first and last crossing frames,
+    turned into event values by `clock` (default: ISO wall-clock time).
+    """
+
+    def __init__(self, on_frames=3, off_frames=6, camera=None, clock=None):
+        self.on_frames = on_frames
+        self.off_frames = off_frames
+        self.camera = camera
+        self.clock = clock or (lambda captured_at: wall_time(captured_at).isoformat())
+        self._streak = 0           # crossing frames (before start) or clear frames (after)
+        self._first_at = None
+        self._last_at = None
+        self._elbows = set()
+        self._violation_id = None
+
+    def _event(self, edge, captured_at):
+        elbows = self._elbows
+        return {"violation_id": self._violation_id, "edge": edge,
+                "timestamp": self.clock(captured_at),
+                "elbow": "both" if len(elbows) == 2 else next(iter(elbows)),
+                "camera": self.camera}
+
+    def update(self, elbows, table_edge_x, captured_at):
+        """Feed one frame. Returns a start or end event dict, or None."""
+        crossing = crossing_elbows(elbows, table_edge_x) if elbows else []
+        if self._violation_id is None:
+            if not crossing:
+                self._streak = 0
+                self._elbows.clear()
+                return None
+            if self._streak == 0:
+                self._first_at = captured_at
+            self._streak += 1
+            self._elbows.update(crossing)
+            self._last_at = captured_at
+            if self._streak < self.on_frames:
+                return None
+            self._violation_id = uuid.uuid4().hex
+            self._streak = 0
+            return self._event("start", self._first_at)
+
+        if crossing:
+            self._streak = 0
+            self._elbows.update(crossing)
+            self._last_at = captured_at
+            return None
+        self._streak += 1
+        if self._streak < self.off_frames:
+            return None
+        return self.finish()
+
+    def finish(self):
+        """End the open violation at its last crossing frame. None if none is open."""
+        if self._violation_id is None:
+            return None
+        event = self._event("end", self._last_at)
+        self._violation_id = None
+        self._streak = 0
+        self._elbows.clear()
+        return event
+
+
+class ViolationSender(threading.Thread):
+    """Posts violation events to the backend without ever blocking the caller.
+
+    emit() only enqueues. This thread batches events and POSTs them; every
+    unacknowledged event is mirrored to a JSONL spool file, so events survive
+    the backend being down and the tracker restarting.
+    """
+
+    def __init__(self, backend_url, tournament_id, game_id=None,
+                 spool_path="violation_queue.jsonl"):
+        super().__init__(name="violation-sender", daemon=True)
+        self.url = f"{backend_url.rstrip('/')}/tournaments/{tournament_id}/elbow-violations"
+        self.game_id = game_id
+        self.spool_path = Path(spool_path)
+        self.sent = 0
+        self.dropped = 0
+        self._events = queue.Queue()
+        self._stop_event = threading.Event()
+        self._pending = self._load_spool()
+
+    def _load_spool(self):
+        if not self.spool_path.exists():
+            return []
+        pending = [json.loads(line) for line in self.spool_path.read_text().splitlines()
+                   if line.strip()]
+        if pending:
+            print(f"Violation reporting: {len(pending)} unsent events from last run")
+        return pending
+
+    def _rewrite_spool(self):
+        if self._pending:
+            self.spool_path.write_text(
+                "".join(json.dumps(event) + "\n" for event in self._pending))
+        else:
+            self.spool_path.unlink(missing_ok=True)
+
+    def emit(self, event):
+        self._events.put(event)
+
+    def _post(self, events):
+        """POST one batch. Returns True when the events are settled (sent or rejected)."""
+        body = json.dumps({"game_id": self.game_id, "events": events}).encode()
+        request = urllib.request.Request(self.url, data=body, method="POST",
+                                         headers={"Content-Type": "application/json"})
+        try:
+            with urllib.request.urlopen(request, timeout=HTTP_TIMEOUT):
+                self.sent += len(events)
+                return True
+        except urllib.error.HTTPError as e:
+            if e.code >= 500 or e.code in (408, 429):
+                return False
+            # The backend will never take these (e.g. no game in progress); don't retry
+            self.dropped += len(events)
+            print(f"Violation reporting: backend rejected {len(events)} events "
+                  f"({e.code} {e.reason})")
+            return True
+        except (urllib.error.URLError, OSError):
+            return False
+
+    def run(self):
+        backoff = SEND_INTERVAL
+        next_attempt = 0.0
+        while not self._stop_event.is_set() or not self._events.empty():
+            try:
+                new = [self._events.get(timeout=SEND_INTERVAL)]
+            except queue.Empty:
+                new = []
+            while True:
+                try:
+                    new.append(self._events.get_nowait())
+                except queue.Empty:
+                    break
+            if new:
+                with self.spool_path.open("a") as spool:
+                    spool.writelines(json.dumps(event) + "\n" for event in new)
+                self._pending.extend(new)
+
+            if not self._pending or time.monotonic() < next_attempt:
+                continue
+            while self._pending:
+                batch = self._pending[:SEND_BATCH]
+                if not self._post(batch):
+                    next_attempt = time.monotonic() + backoff
+                    backoff = min(backoff * 2, MAX_BACKOFF)
+                    break
+                del self._pending[:len(batch)]
+                backoff = SEND_INTERVAL
+            self._rewrite_spool()
+
+    def close(self):
+        """Flush once more, then stop. Anything unsent stays in the spool file."""
+        self._stop_event.set()
+        self.join(timeout=HTTP_TIMEOUT + SEND_INTERVAL + 1)
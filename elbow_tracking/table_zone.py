@@ -0,0 +1,58 @@
+import math
+
+ROI_MARGIN = 200    # frame pixels kept on each side of the table edge
+ROI_PAD = 0.25      # last pose's bounding box grows by this share of its size per side
+ROI_GRID = 1 / 32   # crop edges snap to this grid so the crop doesn't jitter
+MAX_CROP_AREA = 0.8  # a crop covering more of the frame than this isn't worth it
+
+
+class TableZone:
+    """Region of interest for pose inference once the table edge is calibrated.
+
+    The crop spans the table edge +/- `margin` and the last detected pose's
+    bounding box (padded), so it follows the player while leaving out the
+    crowd. With no calibration, or no pose on the previous frame, roi()
+    returns None and the detector runs on the full frame, which is also how a
+    lost player is found again.
+    """
+
+    def __init__(self, enabled=False, margin=ROI_MARGIN, pad=ROI_PAD):
+        self.enabled = enabled
+        self.margin = margin
+        self.pad = pad
+        self.edge_x = None      # table edge in frame pixels, None until calibrated
+        self._pose_box = None   # normalized (x0, y0, x1, y1) of the last pose
+        self.cropped = 0
+        self.full_frame = 0
+
+    def roi(self, frame_width):
+        """Normalized (x0, y0, x1, y1) crop for the next frame, or None for full frame."""
+        if not self.enabled or self.edge_x is None or self._pose_box is None:
+            self.full_frame += 1
+            return None
+        x0, y0, x1, y1 = self._pose_box
+        pad_x, pad_y = (x1 - x0) * self.pad, (y1 - y0) * self.pad
+        edge = self.edge_x / frame_width
+        margin = self.margin / frame_width
+        x0 = min(x0 - pad_x, edge - margin)
+        x1 = max(x1 + pad_x, edge + margin)
+        y0, y1 = y0 - pad_y, y1 + pad_y
+        box = (max(0.0, math.floor(x0 / ROI_GRID) * ROI_GRID),
+               max(0.0, math.floor(y0 / ROI_GRID) * ROI_GRID),
+               min(1.0, math.ceil(x1 / ROI_GRID) * ROI_GRID),
+               min(1.0, math.ceil(y1 / ROI_GRID) * ROI_GRID))
+        if (box[2] - box[0]) * (box[3] - box[1]) > MAX_CROP_AREA:
+            self.full_frame += 1
+            return None
+        self.cropped += 1
+        return box
+
+    def update(self, pose_results):
+        """Follow the player: remember where the pose (in frame space) ended up."""
+        if pose_results is None or not pose_results.pose_landmarks:
+            self._pose_box = None
+            return
+        landmarks = pose_results.pose_landmarks[0]
+        xs = [min(max(lm.x, 0.0), 1.0) for lm in landmarks]
+        ys = [min(max(lm.y, 0.0), 1.0) for lm in landmarks]
+        self._pose_box = (min(xs), min(ys), max(xs), max(ys))
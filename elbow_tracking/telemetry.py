@@ -0,0 +1,59 @@
+import json
+import threading
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+TELEMETRY_INTERVAL = 1.0  # seconds between JSONL records
+HUD_REFRESH = 0.5         # seconds between HUD text updates
+
+# Per-frame stages of the tracker loop, in the order they run. "inference" and
+# "render" are the sums of their sub-stages; "end-to-end" runs from camera
+# read to the frame being on screen.
+STAGES = ("read", "prepare", "capture", "pose", "gesture", "inference",
+          "draw", "replay", "compose", "render", "display", "end-to-end")
+
+
+def hud_rows(stats):
+    """Table cells for the on-screen HUD: a header, then one row per stage."""
+    rows = [("stage", "fps", "p50 ms", "p95 ms", "p99 ms")]
+    for name, stage in stats.items():
+        snapshot = stage.snapshot()
+        rows.append((name, f"{snapshot['fps']:.1f}", f"{snapshot['p50_ms']:.1f}",
+                     f"{snapshot['p95_ms']:.1f}", f"{snapshot['p99_ms']:.1f}"))
+    return rows
+
+
+class TelemetryWriter(threading.Thread):
+    """Appends a snapshot of every stage's rolling stats to a JSONL file.
+
+    Runs on its own thread, so the camera loop only pays for the
+    StageStats.record() calls it makes anyway. `extra` is called for each
+    record and its dict merged in (dropped frame counts and the like).
+    """
+
+    def __init__(self, path, stats, extra=None, interval=TELEMETRY_INTERVAL):
+        super().__init__(name="telemetry", daemon=True)
+        self.path = Path(path)
+        self.stats = stats
+        self.extra = extra
+        self.interval = interval
+        self.records = 0
+        self._stop_event = threading.Event()
+
+    def run(self):
+        with self.path.open("a") as out:
+            while not self._stop_event.wait(self.interval):
+                record = {"time": datetime.now(timezone.utc).isoformat(),
+                          "monotonic": round(time.monotonic(), 3),
+                          "stages": {name: stage.snapshot()
+                                     for name, stage in self.stats.items()}}
+                if self.extra is not None:
+                    record.update(self.extra())
+                out.write(json.dumps(record) + "\n")
+                out.flush()
+                self.records += 1
+
+    def close(self):
+        self._stop_event.set()
+        self.join()
@@ -6,3 +6,15 @@ def check_violation(elbows: ElbowPositions, table_edge_x: int | None) -> bool:
     if table_edge_x is None:
         return False
     return elbows.right_x > table_edge_x or elbows.left_x > table_edge_x
+
+
+def crossing_elbows(elbows: ElbowPositions, table_edge_x: int | None) -> list[str]:
+    """Which elbows ("right", "left") are past the table edge."""
+    if table_edge_x is None:
+        return []
+    crossing = []
+    if elbows.right_x > table_edge_x:
+        crossing.append("right")
+    if elbows.left_x > table_edge_x:
+        crossing.append("left")
+    return crossing